@@ -35,10 +35,34 @@ if ! [[ $SEQ_MOST_RECENT_ITERATIONS =~ ^[1-9][0-9]*$ ]]; then
     exit 1
 fi
 
+SIMILARITY_CACHE_SIZE=${6:-"0"}
+
+if ! [[ $SIMILARITY_CACHE_SIZE =~ ^[0-9]+$ ]]; then
+    echo "Invalid value for SIMILARITY_CACHE_SIZE. Please provide a non-negative integer value."
+    exit 1
+fi
+
+SIMILARITY_CACHE_EVICTION=${7:-"lru"}
+
+if [[ "$SIMILARITY_CACHE_EVICTION" != "lru" && "$SIMILARITY_CACHE_EVICTION" != "row" ]]; then
+    echo "Invalid value for SIMILARITY_CACHE_EVICTION. Please provide either 'lru' or 'row'."
+    exit 1
+fi
+
+SESSION_STORE=${8:-"memory"}
+
+if [[ "$SESSION_STORE" != "memory" && "$SESSION_STORE" != "sqlite" ]]; then
+    echo "Invalid value for SESSION_STORE. Please provide either 'memory' or 'sqlite'."
+    exit 1
+fi
+
 docker compose up --no-start
 docker compose run -it --rm \
     -e SIMILARITY_FUNC="$SIMILARITY_FUNC" \
     -e PREDICTION_FUNC="$PREDICTION_FUNC" \
     -e NUM_NEIGHBORS="$NUM_NEIGHBORS_FOR_PREDICTION" \
     -e CONSENSUS_WEIGHT_DISAGREEMENT="$CONSENSUS_WEIGHT_DISAGREEMENT" \
-    -e SEQ_MOST_RECENT_ITERATIONS="$SEQ_MOST_RECENT_ITERATIONS" app
+    -e SEQ_MOST_RECENT_ITERATIONS="$SEQ_MOST_RECENT_ITERATIONS" \
+    -e SIMILARITY_CACHE_SIZE="$SIMILARITY_CACHE_SIZE" \
+    -e SIMILARITY_CACHE_EVICTION="$SIMILARITY_CACHE_EVICTION" \
+    -e SESSION_STORE="$SESSION_STORE" app
@@ -1,13 +1,16 @@
 from dataclasses import dataclass
 from pathlib import Path
 import os
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
+from app.domain.candidates.neighbor_candidate_generator import NeighborCandidateGenerator
 from app.domain.group_prediction.average_aggregation import AverageAggregation
 from app.domain.group_prediction.disagreement.average_pairwise_disagreement import AveragePairwiseDisagreement
 from app.domain.group_prediction.consensus import Consensus
 from app.domain.group_recommender import GroupRecommender
 from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
 from app.domain.prediction.mean_centered import ALL_NEIGHBORS, MeanCenteredPrediction
+from app.domain.prediction.neighbor_index import NeighborIndex
 from app.domain.prediction.prediction import Prediction
 from app.domain.sequential_group.implementation import SequentialGroupRecommenderImpl
 from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
@@ -15,16 +18,27 @@ from app.domain.sequential_group.sequential_group_recommender import SequentialG
 from app.domain.similarity.stats import Stats
 from app.domain.user_satisfaction import UserSatisfaction
 from app.result_saver.csv_result_saver import CsvResultSaver
-from app.ui.cli import start_cli_menu
+from app.ui.cli import SESSION_AVERAGE, SESSION_LEAST_MISERY, SESSION_SEQUENTIAL_HYBRID, SESSIONS, start_cli_menu
 from app.data_loader.file_data_loader import FileDataLoader
+from app.data_loader.snapshot_data_loader import SnapshotDataLoader
+from app.similarity_store.mmap_similarity_store import MmapSimilarityStore
+from app.session_store.sqlite_session_store import SqliteSessionStore
 from app.domain.dataset import Dataset
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.relevance import RelevanceProvider
+from app.domain.session_store import SessionStore
 from app.domain.recommender import PerformanceEvaluator, Recommender
-from app.domain.similarity.cached import CachedSimilarity
-from app.domain.similarity.itr import ITR
-from app.domain.similarity.jaccard import Jaccard
-from app.domain.similarity.pearson import PearsonCorrelation
+from app.domain.similarity.batch import BatchSimilarity
+from app.domain.similarity.cached import EVICTION_LRU, EVICTION_POLICIES, CachedSimilarity
+from app.domain.similarity.stored import StoredSimilarity
+from app.domain.similarity_store import SimilarityStore
+from app.domain.similarity.itr import VectorizedITR
+from app.domain.similarity.jaccard import VectorizedJaccard
+from app.domain.similarity.pearson import VectorizedPearsonCorrelation
 from app.domain.similarity.similarity import Similarity
 
+SESSION_STORE_FILENAME = "sessions.sqlite"
+
 
 @dataclass
 class SystemOptions:
@@ -33,6 +47,9 @@ class SystemOptions:
     num_neighbors: int
     consensus_weight_disagreement: float
     seq_most_recent_iterations: int
+    similarity_cache_size: int
+    similarity_cache_eviction: str
+    session_store: str
 
 def parse_system_options() -> SystemOptions:
     SIMILARITY_FUNC = os.environ.get("SIMILARITY_FUNC")
@@ -62,25 +79,54 @@ def parse_system_options() -> SystemOptions:
     except ValueError:
         SEQ_MOST_RECENT_ITERATIONS = 2
         
+    try:
+        SIMILARITY_CACHE_SIZE = max(0, int(os.environ.get("SIMILARITY_CACHE_SIZE", 0)))
+    except ValueError:
+        SIMILARITY_CACHE_SIZE = 0
+    
+    SIMILARITY_CACHE_EVICTION = os.environ.get("SIMILARITY_CACHE_EVICTION")
+    if SIMILARITY_CACHE_EVICTION not in EVICTION_POLICIES:
+        SIMILARITY_CACHE_EVICTION = EVICTION_LRU
+    
+    SESSION_STORE = os.environ.get("SESSION_STORE")
+    if SESSION_STORE not in ["memory", "sqlite"]:
+        SESSION_STORE = "memory"
+    
     system_options = SystemOptions(
         similarity_func=SIMILARITY_FUNC,
         prediction_func=PREDICTION_FUNC,
         num_neighbors=NUM_NEIGHBORS,
         consensus_weight_disagreement=CONSENSUS_WEIGHT_DISAGREEMENT,
         seq_most_recent_iterations=SEQ_MOST_RECENT_ITERATIONS,
+        similarity_cache_size=SIMILARITY_CACHE_SIZE,
+        similarity_cache_eviction=SIMILARITY_CACHE_EVICTION,
+        session_store=SESSION_STORE,
     )
     return system_options
 
-def create_similarity_functions(dataset: Dataset) -> Dict[str, Similarity]:
+def create_batch_similarities(dataset: Dataset) -> Dict[str, BatchSimilarity]:
+    return {
+        "pearson": VectorizedPearsonCorrelation(dataset),
+        "itr": VectorizedITR(dataset),
+        "jaccard": VectorizedJaccard(dataset),
+    }
+
+def create_similarity_functions(dataset: Dataset, batch_similarities: Dict[str, BatchSimilarity], store: SimilarityStore, workers: int, system_options: SystemOptions) -> Dict[str, Similarity]:
+    if system_options.similarity_cache_size > 0:
+        # Bounded in-memory cache instead of the precomputed matrices.
+        return {
+            name: CachedSimilarity(similarity, max_size=system_options.similarity_cache_size, eviction=system_options.similarity_cache_eviction)
+            for name, similarity in batch_similarities.items()
+        }
     return {
-        "pearson": CachedSimilarity(PearsonCorrelation(dataset)),
-        "itr": CachedSimilarity(ITR(dataset)),
-        "jaccard": CachedSimilarity(Jaccard(dataset)),
+        name: StoredSimilarity(dataset, similarity, store, workers=workers)
+        for name, similarity in batch_similarities.items()
     }    
     
 def main() -> None:
     DATASET_FILE_PATH = Path.cwd().parent / "resources" / "ml-latest-small" / "ratings.csv"
     RESULTS_PATH = Path.cwd().parent / "results"
+    CACHE_PATH = Path.cwd().parent / "cache"
     
     system_options = parse_system_options()
     
@@ -89,15 +135,34 @@ def main() -> None:
     print(f"Considering {f'all' if system_options.num_neighbors == ALL_NEIGHBORS else f'only {system_options.num_neighbors} most similar'} neighbors for computing predictions.")
     print(f"Using consensus with weight for disagreement: {system_options.consensus_weight_disagreement}.")
     print(f"Considering {system_options.seq_most_recent_iterations} most recent iterations for sequential group recommender.")
+    if system_options.similarity_cache_size > 0:
+        print(f"Using a similarity cache of {system_options.similarity_cache_size} entries with '{system_options.similarity_cache_eviction}' eviction.")
+    else:
+        print("Using precomputed similarity matrices.")
+    if system_options.session_store == "sqlite":
+        print(f"Keeping the recommendation sessions in '{(CACHE_PATH / SESSION_STORE_FILENAME).absolute().as_posix()}'.")
     
     print("Loading dataset...")
     
-    loader = FileDataLoader(DATASET_FILE_PATH)
+    loader = SnapshotDataLoader(
+        DATASET_FILE_PATH,
+        CACHE_PATH / "snapshots" / DATASET_FILE_PATH.parent.name,
+        FileDataLoader(DATASET_FILE_PATH),
+    )
+    start_time = time.perf_counter()
     dataset = loader.load()
+    load_time = time.perf_counter() - start_time
     
     print(f"Loaded '{DATASET_FILE_PATH.absolute().as_posix()}'.")
+    if loader.warm_start:
+        print(f"Warm start from snapshot: {load_time:.3f} seconds (cold start: {loader.cold_start_time:.3f} seconds).")
+    else:
+        print(f"Cold start: {load_time:.3f} seconds. A snapshot has been saved for the next warm starts.")
     
-    similarity_functions = create_similarity_functions(dataset)
+    workers = os.cpu_count() or 1
+    similarity_store = MmapSimilarityStore(CACHE_PATH / "similarities")
+    batch_similarities = create_batch_similarities(dataset)
+    similarity_functions = create_similarity_functions(dataset, batch_similarities, similarity_store, workers, system_options)
     chosen_similarity = similarity_functions[system_options.similarity_func]
 
     if system_options.prediction_func == "mean_centered_abs":
@@ -105,14 +170,22 @@ def main() -> None:
     else:
         USE_MEAN_CENTERED_PRED_ABSOLUTE_VALUE = False
         
-    predictor = MeanCenteredPrediction(dataset, chosen_similarity, system_options.num_neighbors, use_absolute_value=USE_MEAN_CENTERED_PRED_ABSOLUTE_VALUE)
+    # The neighbors of a user are ranked once per similarity, and shared by the predictors using it.
+    neighbor_indexes: Dict[str, Optional[NeighborIndex]] = {
+        name: NeighborIndex(dataset, similarity, system_options.num_neighbors) if system_options.num_neighbors != ALL_NEIGHBORS else None
+        for name, similarity in similarity_functions.items()
+    }
+    
+    predictor = MeanCenteredPrediction(dataset, chosen_similarity, system_options.num_neighbors, use_absolute_value=USE_MEAN_CENTERED_PRED_ABSOLUTE_VALUE, neighbor_index=neighbor_indexes[system_options.similarity_func])
     predictors_for_comparison: List[Tuple[str, Prediction]] = [
-        (name, MeanCenteredPrediction(dataset, similarity, system_options.num_neighbors, use_absolute_value=USE_MEAN_CENTERED_PRED_ABSOLUTE_VALUE))
+        (name, MeanCenteredPrediction(dataset, similarity, system_options.num_neighbors, use_absolute_value=USE_MEAN_CENTERED_PRED_ABSOLUTE_VALUE, neighbor_index=neighbor_indexes[name]))
         for name, similarity in similarity_functions.items()
     ]
     
-    stats = Stats(dataset, chosen_similarity)
-    recommender = Recommender(dataset, predictor)
+    # The matrix is computed by the batch similarity directly, in parallel blocks of rows.
+    stats = Stats(dataset, batch_similarities[system_options.similarity_func], workers=workers, store=similarity_store)
+    candidates = NeighborCandidateGenerator(dataset, chosen_similarity, neighbor_indexes[system_options.similarity_func])
+    recommender = Recommender(dataset, predictor, candidates)
     
     evaluator = PerformanceEvaluator(predictors_for_comparison, dataset)
         
@@ -122,13 +195,15 @@ def main() -> None:
     
     result_saver = CsvResultSaver(file_writer)
     
-    group_predictor_avg = AverageAggregation(dataset, predictor)
+    # The relevance of an item for a user is computed once, and shared by every group component.
+    relevance = RelevanceProvider(dataset, predictor)
+    group_predictor_avg = AverageAggregation(dataset, predictor, relevance)
     recommender_avg = GroupRecommender(dataset, group_predictor_avg, exclude_previous=False)
     
-    group_predictor_least_misery = LeastMiseryAggregation(dataset, predictor)
+    group_predictor_least_misery = LeastMiseryAggregation(dataset, predictor, relevance)
     recommender_least_misery = GroupRecommender(dataset, group_predictor_least_misery, exclude_previous=False)
     
-    disagreement = AveragePairwiseDisagreement(dataset, predictor)
+    disagreement = AveragePairwiseDisagreement(dataset, predictor, relevance)
     group_predictor_consensus = Consensus(
         group_predictor_avg,
         disagreement,
@@ -136,14 +211,20 @@ def main() -> None:
     )
     recommender_consensus = GroupRecommender(dataset, group_predictor_consensus, exclude_previous=False)
     
-    realistic_group_recommender_avg = GroupRecommender(dataset, group_predictor_avg, exclude_previous=True)
-    realistic_group_recommender_least_misery = GroupRecommender(dataset, group_predictor_least_misery, exclude_previous=True)
+    # The multi-iteration sessions survive restarts when they are kept in a session store.
+    session_store: Optional[SessionStore] = None
+    if system_options.session_store == "sqlite":
+        session_store = SqliteSessionStore(CACHE_PATH / SESSION_STORE_FILENAME)
+    recommendations_logs = {session: RecommendationsLog(dataset, session_store, session) for session in SESSIONS}
+    
+    realistic_group_recommender_avg = GroupRecommender(dataset, group_predictor_avg, exclude_previous=True, recommendations_log=recommendations_logs[SESSION_AVERAGE])
+    realistic_group_recommender_least_misery = GroupRecommender(dataset, group_predictor_least_misery, exclude_previous=True, recommendations_log=recommendations_logs[SESSION_LEAST_MISERY])
     
     sequential_group_recommender: SequentialGroupRecommender
     def get_previous_recommendations(group: List[int]) -> List[List[int]]:
         return sequential_group_recommender.get_previous_recommendations(group)
     
-    user_satisfaction = UserSatisfaction(recommender, predictor, dataset)
+    user_satisfaction = UserSatisfaction(recommender, predictor, dataset, relevance)
     sequential_group_predictor = MultiIterSequentialHybridAggregation(
         get_previous_recommendations,
         group_predictor_avg,
@@ -153,27 +234,34 @@ def main() -> None:
     )
     sequential_group_recommender = SequentialGroupRecommenderImpl(
         dataset,
-        sequential_group_predictor
+        sequential_group_predictor,
+        recommendations_logs[SESSION_SEQUENTIAL_HYBRID],
+        incremental_reranking=True,
     )
     
-    start_cli_menu(
-        dataset, 
-        stats, 
-        recommender, 
-        evaluator, 
-        predictor, 
-        chosen_similarity, 
-        result_saver, 
-        RESULTS_PATH,
-        recommender_avg,
-        recommender_least_misery,
-        recommender_consensus,
-        disagreement,
-        realistic_group_recommender_avg,
-        realistic_group_recommender_least_misery,
-        sequential_group_recommender,
-        user_satisfaction,
-    )
+    try:
+        start_cli_menu(
+            dataset, 
+            stats, 
+            recommender, 
+            evaluator, 
+            predictor, 
+            chosen_similarity, 
+            result_saver, 
+            RESULTS_PATH,
+            recommender_avg,
+            recommender_least_misery,
+            recommender_consensus,
+            disagreement,
+            realistic_group_recommender_avg,
+            realistic_group_recommender_least_misery,
+            sequential_group_recommender,
+            user_satisfaction,
+            recommendations_logs,
+        )
+    finally:
+        if session_store is not None:
+            session_store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
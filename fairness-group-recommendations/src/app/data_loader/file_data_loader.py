@@ -1,4 +1,7 @@
 from pathlib import Path
+
+import numpy as np
+
 from app.domain.data_loader import DataLoader
 from app.domain.dataset import Dataset
 
@@ -8,7 +11,7 @@ class FileDataLoader(DataLoader):
         self.__path = path
         
     def load(self) -> Dataset:
-        data = []
+        users, items, ratings = [], [], []
         with open(self.__path, 'r') as file:
             next(file)  # Ignore the header line
             for line in file:
@@ -18,9 +21,11 @@ class FileDataLoader(DataLoader):
                         user_id = int(values[0])
                         item_id = int(values[1])
                         rating = float(values[2])
-                        data.append((user_id, item_id, rating))
+                        users.append(user_id)
+                        items.append(item_id)
+                        ratings.append(rating)
                     except ValueError:
                         print(f"WARN: skipping invalid line '{line}'")
                         pass
-        dataset = Dataset(data)
+        dataset = Dataset.from_columns(np.array(users), np.array(items), np.array(ratings))
         return dataset
\ No newline at end of file
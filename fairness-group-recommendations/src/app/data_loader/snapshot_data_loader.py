@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.domain.data_loader import DataLoader
+from app.domain.dataset import ARRAY_NAMES, Dataset
+
+SNAPSHOT_FORMAT_VERSION = 1
+METADATA_FILENAME = "snapshot.json"
+
+
+class SnapshotDataLoader(DataLoader):
+    """
+    Loads a dataset from a binary snapshot of its parsed columns and prebuilt indexes.
+    
+    The snapshot is keyed on the size, modification time and hash of the source file.
+    When it is missing or stale, the dataset is loaded with the given loader (cold start)
+    and a new snapshot is written. Otherwise the arrays are memory-mapped (warm start),
+    so both parsing and index building are skipped.
+    """
+    
+    def __init__(self, source_path: Path, snapshot_path: Path, loader: DataLoader) -> None:
+        """
+        Parameters:
+        - source_path: The file the dataset is loaded from.
+        - snapshot_path: The directory where the snapshot is stored.
+        - loader: The loader used when no valid snapshot is available.
+        """
+        
+        self.__source_path = source_path
+        self.__snapshot_path = snapshot_path
+        self.__loader = loader
+        self.__warm_start = False
+        self.__cold_start_time: Optional[float] = None
+    
+    @property
+    def warm_start(self) -> bool:
+        """Whether the last load was served from the snapshot."""
+        return self.__warm_start
+    
+    @property
+    def cold_start_time(self) -> Optional[float]:
+        """Seconds needed to load the dataset without snapshot, as measured when the snapshot was written."""
+        return self.__cold_start_time
+    
+    def load(self) -> Dataset:
+        source_key = self.__get_source_key()
+        metadata = self.__read_metadata()
+        if metadata is not None and metadata["source"] == source_key:
+            self.__warm_start = True
+            self.__cold_start_time = metadata["cold_start_time"]
+            return Dataset.from_arrays({
+                name: np.load(self.__snapshot_path / f"{name}.npy", mmap_mode="r")
+                for name in ARRAY_NAMES
+            })
+        
+        start_time = time.perf_counter()
+        dataset = self.__loader.load()
+        self.__warm_start = False
+        self.__cold_start_time = time.perf_counter() - start_time
+        self.__write_snapshot(dataset, source_key, self.__cold_start_time)
+        return dataset
+    
+    def __get_source_key(self) -> Dict[str, Any]:
+        stat = os.stat(self.__source_path)
+        digest = hashlib.sha256()
+        with open(self.__source_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest(),
+        }
+    
+    def __read_metadata(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.__snapshot_path / METADATA_FILENAME, "r") as file:
+                metadata = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if metadata.get("version") != SNAPSHOT_FORMAT_VERSION:
+            return None
+        return metadata
+    
+    def __write_snapshot(self, dataset: Dataset, source_key: Dict[str, Any], cold_start_time: float) -> None:
+        self.__snapshot_path.mkdir(parents=True, exist_ok=True)
+        metadata_path = self.__snapshot_path / METADATA_FILENAME
+        # The metadata is removed first and written last, so a partially written snapshot is never used.
+        metadata_path.unlink(missing_ok=True)
+        for name, array in dataset.to_arrays().items():
+            # Replace the files instead of overwriting them, since other processes may have them memory-mapped.
+            temporary_array_path = self.__snapshot_path / f"{name}.tmp.npy"
+            np.save(temporary_array_path, np.ascontiguousarray(array))
+            os.replace(temporary_array_path, self.__snapshot_path / f"{name}.npy")
+        
+        temporary_metadata_path = metadata_path.with_suffix(".tmp")
+        with open(temporary_metadata_path, "w") as file:
+            json.dump({
+                "version": SNAPSHOT_FORMAT_VERSION,
+                "source": source_key,
+                "cold_start_time": cold_start_time,
+            }, file)
+        os.replace(temporary_metadata_path, metadata_path)
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Collection
+
+from app.domain.dataset import ItemId, UserId
+
+
+class CandidateGenerator(ABC):
+    @abstractmethod
+    def get_candidates(self, user: UserId) -> Collection[ItemId]:
+        """Returns the items whose prediction for the user can differ from the fallback score."""
+        pass
+    
+    @abstractmethod
+    def get_fallback_score(self, user: UserId) -> float:
+        """Returns the prediction of the user for every item which is not a candidate."""
+        pass
\ No newline at end of file
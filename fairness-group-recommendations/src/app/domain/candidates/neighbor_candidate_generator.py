@@ -0,0 +1,45 @@
+from typing import Collection, Optional
+
+import numpy as np
+
+from app.domain.candidates.candidate_generator import CandidateGenerator
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.prediction.neighbor_index import NeighborIndex
+from app.domain.similarity.similarity import Similarity
+
+
+class NeighborCandidateGenerator(CandidateGenerator):
+    """
+    Candidates for a neighborhood-based prediction (eg. `MeanCenteredPrediction`): the items rated by
+    at least one neighbor with a non-zero similarity. Any other item has no neighbor contributing
+    to its prediction, which is then the average rating of the user.
+    """
+    
+    def __init__(self, dataset: Dataset, similarity: Similarity, neighbor_index: Optional[NeighborIndex] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - similarity: The similarity between users.
+        - neighbor_index: The index of the most similar users used by the predictor, if it considers only them.
+          When not given, all users are considered neighbors.
+        """
+        
+        self.__dataset = dataset
+        self.__similarity = similarity
+        self.__neighbor_index = neighbor_index
+    
+    def get_candidates(self, user: UserId) -> Collection[ItemId]:
+        if self.__neighbor_index is not None:
+            neighbors = [neighbor for (neighbor, similarity) in self.__neighbor_index.get_neighbors(user) if similarity != 0]
+        else:
+            all_other_users = [neighbor for neighbor in self.__dataset.get_all_users() if neighbor != user]
+            similarities = self.__similarity.get_similarities(user, all_other_users)
+            neighbors = [neighbor for (neighbor, similarity) in zip(all_other_users, similarities.tolist()) if similarity != 0]
+        
+        # The rows of the neighbors in the rating matrix list the items they rated.
+        rows = self.__dataset.get_user_indices(neighbors)
+        columns = np.unique(self.__dataset.get_rated_matrix()[rows].indices)
+        return set(self.__dataset.get_item_ids()[columns].tolist())
+    
+    def get_fallback_score(self, user: UserId) -> float:
+        return self.__dataset.get_average_rating_by_user(user)
\ No newline at end of file
@@ -1,40 +1,91 @@
+import hashlib
 from dataclasses import dataclass
-import time
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
 
 UserId = int
 ItemId = int
 
 DataRow = Tuple[UserId, ItemId, float]
 
+ARRAY_NAMES = [
+    "user_ids", "item_ids",
+    "user_rows", "item_columns", "rating_column",
+    "csr_indptr", "csr_indices", "csr_data",
+    "csc_indptr", "csc_indices", "csc_data",
+    "user_means",
+]
+
 @dataclass
 class Dataset:
+    """
+    Collection of ratings with optimized read operations.
+    
+    Raw user and item ids are remapped to contiguous indices (users and items are sorted by id),
+    and the ratings are stored as a sparse matrix both row-wise (CSR, one row per user)
+    and column-wise (CSC, one column per item).
+    """
+    
     def __init__(self, data: List[DataRow]) -> None:
-        self.__data = data
+        user_column = np.array([user for (user, _, _) in data], dtype=np.int64)
+        item_column = np.array([item for (_, item, _) in data], dtype=np.int64)
+        rating_column = np.array([rating for (_, _, rating) in data], dtype=np.float64)
+        self.__set_columns(user_column, item_column, rating_column)
         self.__precompute()
+    
+    @classmethod
+    def from_columns(cls, user_column: np.ndarray, item_column: np.ndarray, rating_column: np.ndarray) -> "Dataset":
+        """Creates a dataset from the parsed columns of the ratings, in their original order."""
+        
+        dataset = cls.__new__(cls)
+        dataset.__set_columns(
+            np.asarray(user_column, dtype=np.int64),
+            np.asarray(item_column, dtype=np.int64),
+            np.asarray(rating_column, dtype=np.float64),
+        )
+        dataset.__precompute()
+        return dataset
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "Dataset":
+        """
+        Creates a dataset from the arrays returned by `to_arrays`, without rebuilding the indexes.
+        
+        The arrays are used as they are, so they can be read-only or memory-mapped.
+        """
         
+        dataset = cls.__new__(cls)
+        for name in ARRAY_NAMES:
+            setattr(dataset, f"_Dataset__{name}", arrays[name])
+        dataset.__precompute_positions()
+        return dataset
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Returns the parsed columns and the prebuilt indexes of the dataset."""
+        return {name: getattr(self, f"_Dataset__{name}") for name in ARRAY_NAMES}
+    
     def __len__(self) -> int:
-        return len(self.__data)
+        return len(self.__rating_column)
     
     def get_average_rating_by_user(self, user: UserId) -> float:
-        return self.__average_user_ratings[user]
+        return float(self.__user_means[self.__user_positions[user]])
     
     def get_items_rated_by_both(self, user_a: UserId, user_b: UserId) -> Dict[ItemId, Tuple[float, float]]:
-        items_rated_by_a = self.__user_ratings[user_a]
-        items_rated_by_b = self.__user_ratings[user_b]
+        items_a, ratings_a = self.__get_row(self.__user_positions[user_a])
+        items_b, ratings_b = self.__get_row(self.__user_positions[user_b])
         
-        common_items = items_rated_by_a.keys() & items_rated_by_b.keys()
+        common_items, positions_a, positions_b = np.intersect1d(items_a, items_b, assume_unique=True, return_indices=True)
         
-        result = {}
-        for item in common_items:
-            result.update({
-                item: (items_rated_by_a[item], items_rated_by_b[item]),
-            })
-        return result
+        return dict(zip(
+            self.__item_ids[common_items].tolist(),
+            zip(ratings_a[positions_a].tolist(), ratings_b[positions_b].tolist()),
+        ))
     
     def get_items_rated_by_any(self, user_a: UserId, user_b: UserId) -> Dict[ItemId, Tuple[float, float]]:
-        items_rated_by_a = self.__user_ratings[user_a]
-        items_rated_by_b = self.__user_ratings[user_b]
+        items_rated_by_a = dict(self.get_ratings_by_user(user_a))
+        items_rated_by_b = dict(self.get_ratings_by_user(user_b))
         
         all_items = items_rated_by_a.keys() | items_rated_by_b.keys()
         
@@ -46,26 +97,28 @@ class Dataset:
         return result
     
     def get_ratings_by_user(self, user: UserId) -> List[Tuple[ItemId, float]]:
-        return [(item, rating) for item, rating in self.__user_ratings[user].items()]
+        items, ratings = self.__get_row(self.__user_positions[user])
+        return list(zip(self.__item_ids[items].tolist(), ratings.tolist()))
     
     def get_users_who_rated(self, item: ItemId) -> List[Tuple[UserId, float]]:
-        if self.__item_ratings.get(item):
-            return self.__item_ratings[item]
-        
-        item_ratings = [
-            (user, rating)
-            for (user, item_id, rating) in self.__data
-            if item == item_id
-        ]
-        self.__item_ratings[item] = item_ratings
+        raters, ratings = self.get_raters(item)
+        return list(zip(raters.tolist(), ratings.tolist()))
+    
+    def get_raters(self, item: ItemId) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the users who rated the given item and their ratings, as two parallel arrays."""
         
-        return item_ratings
+        column = self.__item_positions.get(item)
+        if column is None:
+            return self.__user_ids[:0], self.__csc_data[:0]
         
+        start, end = self.__csc_indptr[column], self.__csc_indptr[column + 1]
+        return self.__user_ids[self.__csc_indices[start:end]], self.__csc_data[start:end]
+    
     def get_items_not_rated_by_user(self, user: UserId) -> List[ItemId]:
-        rated_items = set([item for (item, _) in self.get_ratings_by_user(user)])
-        all_items = set(self.get_all_items())
-        unrated_items = all_items - rated_items
-        return list(unrated_items)
+        items, _ = self.__get_row(self.__user_positions[user])
+        unrated_items = np.ones(len(self.__item_ids), dtype=bool)
+        unrated_items[items] = False
+        return self.__item_ids[unrated_items].tolist()
     
     def get_all_users(self) -> List[UserId]:
         return self.__users
@@ -73,42 +126,154 @@ class Dataset:
     def get_all_items(self) -> List[ItemId]:
         return self.__items
     
-    def __compute_average_user_ratings(self) -> Dict[UserId, float]:
-        all_users = set([user for (user, _, _) in self.__data])
-        result = {}
-        for user in all_users:
-            user_ratings = self.__user_ratings[user].values()
-            avg_rating = sum(user_ratings) / len(user_ratings)
-            result.update({user: avg_rating})
-        return result
-    
     def get_first(self, limit: int) -> List[DataRow]:
-        return self.__data[:limit]
+        return list(zip(
+            self.__user_ids[self.__user_rows[:limit]].tolist(),
+            self.__item_ids[self.__item_columns[:limit]].tolist(),
+            self.__rating_column[:limit].tolist(),
+        ))
     
     def get_rating(self, user: UserId, item: ItemId) -> float:
-        return self.__user_ratings[user].get(item, 0)
+        items, ratings = self.__get_row(self.__user_positions[user])
+        column = self.__item_positions.get(item)
+        if column is None:
+            return 0
+        
+        position = items.searchsorted(column)
+        if position < len(items) and items[position] == column:
+            return float(ratings[position])
+        return 0
     
-    def __compute_user_ratings(self) -> Dict[UserId, Dict[ItemId, float]]:
-        all_users = set([user for (user, _, _) in self.__data])
-        result = {}
-        for user in all_users:
-            user_ratings = {
-                item: rating
-                for (user_id, item, rating) in self.__data
-                if user == user_id
-            }
-            result.update({user: user_ratings})
-        return result
+    def get_user_index(self, user: UserId) -> int:
+        """Returns the row of the given user in the rating matrix. Raises KeyError for unknown users."""
+        return self.__user_positions[user]
+    
+    def get_item_index(self, item: ItemId) -> int:
+        """Returns the column of the given item in the rating matrix. Raises KeyError for unknown items."""
+        return self.__item_positions[item]
     
-    def __compute_all_users(self) -> List[UserId]:
-        return list(set([user for (user, _, _) in self.__data]))
+    def get_user_indices(self, users: Sequence[UserId]) -> np.ndarray:
+        return self.__get_indices(self.__user_ids, users)
     
-    def __compute_all_items(self) -> List[ItemId]:
-        return list(set([item for (_, item, _) in self.__data]))
+    def get_item_indices(self, items: Sequence[ItemId]) -> np.ndarray:
+        return self.__get_indices(self.__item_ids, items)
+    
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the users, items and ratings of the dataset, which changes whenever its content changes."""
+        
+        if self.__fingerprint is None:
+            digest = hashlib.sha256()
+            for array in (self.__user_ids, self.__item_ids, self.__csr_indptr, self.__csr_indices):
+                digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(self.__csr_data, dtype=np.float64).tobytes())
+            self.__fingerprint = digest.hexdigest()
+        return self.__fingerprint
+    
+    def get_user_ids(self) -> np.ndarray:
+        """Returns the ids of all users, ordered by their row in the rating matrix."""
+        return self.__user_ids
+    
+    def get_item_ids(self) -> np.ndarray:
+        """Returns the ids of all items, ordered by their column in the rating matrix."""
+        return self.__item_ids
+    
+    def get_average_ratings(self) -> np.ndarray:
+        """Returns the average rating of every user, ordered by their row in the rating matrix."""
+        return self.__user_means
+    
+    def get_rating_matrix(self) -> csr_matrix:
+        """Returns the user x item rating matrix in CSR format. Items not rated by a user are not stored."""
+        
+        if self.__csr_matrix is None:
+            self.__csr_matrix = csr_matrix(
+                (self.__csr_data, self.__csr_indices, self.__csr_indptr),
+                shape=(len(self.__user_ids), len(self.__item_ids)),
+            )
+        return self.__csr_matrix
+    
+    def get_rated_matrix(self) -> csr_matrix:
+        """Returns the binary user x item matrix in CSR format, with a 1 for every rated item."""
+        
+        if self.__rated_matrix is None:
+            self.__rated_matrix = csr_matrix(
+                (np.ones(len(self.__csr_data)), self.__csr_indices, self.__csr_indptr),
+                shape=(len(self.__user_ids), len(self.__item_ids)),
+            )
+        return self.__rated_matrix
+    
+    def get_rating_matrix_by_item(self) -> csc_matrix:
+        """Returns the user x item rating matrix in CSC format. Items not rated by a user are not stored."""
+        
+        if self.__csc_matrix is None:
+            self.__csc_matrix = csc_matrix(
+                (self.__csc_data, self.__csc_indices, self.__csc_indptr),
+                shape=(len(self.__user_ids), len(self.__item_ids)),
+            )
+        return self.__csc_matrix
+    
+    def __get_row(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.__csr_indptr[row], self.__csr_indptr[row + 1]
+        return self.__csr_indices[start:end], self.__csr_data[start:end]
+    
+    def __get_indices(self, ids: np.ndarray, values: Sequence[int]) -> np.ndarray:
+        values_array = np.asarray(values, dtype=np.int64)
+        indices = ids.searchsorted(values_array)
+        found = indices < len(ids)
+        found[found] = ids[indices[found]] == values_array[found]
+        if not found.all():
+            raise KeyError(values_array[~found][0].item())
+        return indices
+    
+    def __set_columns(self, user_column: np.ndarray, item_column: np.ndarray, rating_column: np.ndarray) -> None:
+        self.__user_column = user_column
+        self.__item_column = item_column
+        self.__rating_column = rating_column
     
     def __precompute(self) -> None:
-        self.__user_ratings = self.__compute_user_ratings()
-        self.__average_user_ratings = self.__compute_average_user_ratings()
-        self.__users = self.__compute_all_users()
-        self.__items = self.__compute_all_items()
-        self.__item_ratings: Dict[ItemId, List[Tuple[UserId, float]]] = {}
\ No newline at end of file
+        self.__user_ids, user_rows = np.unique(self.__user_column, return_inverse=True)
+        self.__item_ids, item_columns = np.unique(self.__item_column, return_inverse=True)
+        num_users, num_items = len(self.__user_ids), len(self.__item_ids)
+        index_dtype = np.int32 if max(num_users, num_items, len(user_rows)) < np.iinfo(np.int32).max else np.int64
+        
+        # The raw id columns are replaced by their (smaller) dense indices.
+        self.__user_rows = user_rows.astype(index_dtype)
+        self.__item_columns = item_columns.astype(index_dtype)
+        del self.__user_column, self.__item_column
+        
+        # Sort the ratings by (user, item). The sort is stable, so when a user rated
+        # the same item more than once only the last rating in the data is kept.
+        order = np.lexsort((self.__item_columns, self.__user_rows))
+        rows, columns = self.__user_rows[order], self.__item_columns[order]
+        is_last = np.ones(len(order), dtype=bool)
+        is_last[:-1] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+        order, rows, columns = order[is_last], rows[is_last], columns[is_last]
+        
+        ratings_per_user = np.bincount(rows, minlength=num_users)
+        
+        self.__csr_indptr = np.zeros(num_users + 1, dtype=index_dtype)
+        np.cumsum(ratings_per_user, out=self.__csr_indptr[1:])
+        self.__csr_indices = columns
+        self.__csr_data = self.__rating_column[order]
+        
+        # Users stay sorted within each item column, since the sort is stable.
+        by_item = np.argsort(columns, kind="stable")
+        self.__csc_indptr = np.zeros(num_items + 1, dtype=index_dtype)
+        np.cumsum(np.bincount(columns, minlength=num_items), out=self.__csc_indptr[1:])
+        self.__csc_indices = rows[by_item]
+        self.__csc_data = self.__csr_data[by_item]
+        
+        self.__user_means = np.bincount(rows, weights=self.__csr_data, minlength=num_users) / ratings_per_user
+        
+        self.__precompute_positions()
+    
+    def __precompute_positions(self) -> None:
+        self.__users: List[UserId] = self.__user_ids.tolist()
+        self.__items: List[ItemId] = self.__item_ids.tolist()
+        self.__user_positions: Dict[UserId, int] = {user: row for row, user in enumerate(self.__users)}
+        self.__item_positions: Dict[ItemId, int] = {item: column for column, item in enumerate(self.__items)}
+        
+        self.__csr_matrix: Optional[csr_matrix] = None
+        self.__csc_matrix: Optional[csc_matrix] = None
+        self.__rated_matrix: Optional[csr_matrix] = None
+        self.__fingerprint: Optional[str] = None
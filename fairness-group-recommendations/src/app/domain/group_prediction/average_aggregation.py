@@ -1,20 +1,56 @@
-from typing import List
-from app.domain.dataset import Dataset, ItemId
-from app.domain.group_prediction.group_prediction import Group, GroupPrediction
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.group_prediction.group_prediction import Group
+from app.domain.group_prediction.monotone_aggregation import MonotoneAggregation
 from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
-class AverageAggregation(GroupPrediction):
-    def __init__(self, dataset: Dataset, user_predictor: Prediction) -> None:
+class AverageAggregation(MonotoneAggregation):
+    def __init__(self, dataset: Dataset, user_predictor: Prediction, relevance: Optional[RelevanceProvider] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - user_predictor: The prediction function, used for the items not rated by a user.
+        - relevance: The relevances shared with the other group components. When given, it replaces
+          the lookups in the dataset and the user predictor.
+        """
+        
         self.__dataset = dataset
         self.__user_predictor = user_predictor
+        self.__relevance = relevance
     
     def get_prediction(self, group: Group, item: ItemId) -> float:
-        user_ratings: List[float] = []
-        for user in group:
-            user_rating = self.__dataset.get_rating(user, item)
-            if user_rating == 0: # User has not rated the item. Predict the value
-                user_rating = self.__user_predictor.get_prediction(user, item)
-            user_ratings.append(user_rating)
+        user_ratings: List[float] = [self.__get_relevance(user, item) for user in group]
+        
+        return sum(user_ratings) / len(group)
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        if self.__relevance is None:
+            return super().get_predictions(group, items)
+        
+        return self.aggregate(self.__relevance.get_relevance_matrix(group, items)).tolist()
+    
+    @property
+    def relevance(self) -> Optional[RelevanceProvider]:
+        return self.__relevance
+    
+    def aggregate(self, relevances: np.ndarray) -> np.ndarray:
+        # The members are added in order, as in get_prediction: numpy reductions may reorder
+        # the additions depending on the shape of the matrix, which would change the last digits.
+        total = np.zeros(relevances.shape[1:])
+        for member_relevances in relevances:
+            total += member_relevances
+        return total / len(relevances)
+    
+    def __get_relevance(self, user: UserId, item: ItemId) -> float:
+        if self.__relevance is not None:
+            return self.__relevance.get_relevance(user, item)
         
-        return sum(user_ratings) / len(group)
\ No newline at end of file
+        user_rating = self.__dataset.get_rating(user, item)
+        if user_rating == 0: # User has not rated the item. Predict the value
+            user_rating = self.__user_predictor.get_prediction(user, item)
+        return user_rating
\ No newline at end of file
@@ -1,3 +1,7 @@
+from typing import List, Sequence
+
+import numpy as np
+
 from app.domain.dataset import ItemId
 from app.domain.group_prediction.disagreement.disagreement import Disagreement
 from app.domain.group_prediction.group_prediction import Group, GroupPrediction
@@ -13,4 +17,9 @@ class Consensus(GroupPrediction):
     def get_prediction(self, group: Group, item: ItemId) -> float:
         prediction = self.__group_predictor.get_prediction(group, item)
         disagreement = self.__disagreement.get_disagreement(group, item)
-        return (self.__weight_prediction * prediction) + (self.__weight_disagreement * (1 - disagreement))
\ No newline at end of file
+        return (self.__weight_prediction * prediction) + (self.__weight_disagreement * (1 - disagreement))
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        predictions = np.asarray(self.__group_predictor.get_predictions(group, items), dtype=np.float64)
+        disagreements = np.asarray(self.__disagreement.get_disagreements(group, items), dtype=np.float64)
+        return ((self.__weight_prediction * predictions) + (self.__weight_disagreement * (1 - disagreements))).tolist()
\ No newline at end of file
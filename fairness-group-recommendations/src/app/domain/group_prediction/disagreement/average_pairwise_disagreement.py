@@ -1,30 +1,67 @@
-import itertools
-from typing import List
+from typing import List, Optional, Sequence
+
+import numpy as np
+
 from app.domain.dataset import Dataset, ItemId, UserId
 from app.domain.group_prediction.disagreement.disagreement import Disagreement
 from app.domain.group_prediction.group_prediction import Group
 from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
 class AveragePairwiseDisagreement(Disagreement):
-    def __init__(self, dataset: Dataset, predictor: Prediction) -> None:
+    """
+    The mean absolute difference between the relevances of the item for every pair of members.
+    
+    Once the relevances are sorted, each one is above the previous ones and below the next ones,
+    so the sum of the pairwise differences is a weighted sum of the relevances: the disagreement
+    takes O(n log n) operations for a group of n members instead of O(n^2).
+    """
+    
+    def __init__(self, dataset: Dataset, predictor: Prediction, relevance: Optional[RelevanceProvider] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - predictor: The prediction function, used for the items not rated by a user.
+        - relevance: The relevances shared with the other group components. When given, it replaces
+          the lookups in the dataset and the predictor.
+        """
+        
         self.__dataset = dataset
         self.__predictor = predictor
-        
+        self.__relevance = relevance
+    
     def __get_individual_relevance(self, user: UserId, item: ItemId) -> float:
+        if self.__relevance is not None:
+            return self.__relevance.get_relevance(user, item)
+        
         rating = self.__dataset.get_rating(user, item)
         if rating == 0:
             rating = self.__predictor.get_prediction(user, item)
         return rating
 
     def get_disagreement(self, group: Group, item: ItemId) -> float:
-        user_pairs = itertools.combinations(group, 2)
-        pair_disagreements: List[float] = []
-        for user_a, user_b in user_pairs:
-            rating_a = self.__get_individual_relevance(user_a, item)
-            rating_b = self.__get_individual_relevance(user_b, item)
-            pair_disagreements.append(abs(rating_a - rating_b))
-        numerator = 2 * sum(pair_disagreements)
+        relevances = sorted(self.__get_individual_relevance(user, item) for user in group)
+        group_size = len(group)
+        numerator = 2 * sum(
+            weight * relevance
+            for weight, relevance in zip(self.__get_pair_weights(group_size).tolist(), relevances)
+        )
+        denominator = group_size * (group_size - 1)
+        return numerator / denominator
+    
+    def get_disagreements(self, group: Group, items: Sequence[ItemId]) -> List[float]:
         group_size = len(group)
+        if self.__relevance is None or group_size < 2:
+            return super().get_disagreements(group, items)
+        
+        # The relevances of each item (ie. each column) are sorted at once.
+        relevances = np.sort(self.__relevance.get_relevance_matrix(group, items), axis=0)
+        numerators = 2 * (self.__get_pair_weights(group_size) @ relevances)
         denominator = group_size * (group_size - 1)
-        return numerator / denominator
\ No newline at end of file
+        return (numerators / denominator).tolist()
+    
+    def __get_pair_weights(self, group_size: int) -> np.ndarray:
+        # The i-th lowest relevance (from 0) is added in the i pairs where it is the highest,
+        # and subtracted in the group_size - 1 - i pairs where it is the lowest.
+        return 2 * np.arange(group_size) - group_size + 1
\ No newline at end of file
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Sequence
 
 from app.domain.dataset import ItemId
 from app.domain.group_prediction.group_prediction import Group
@@ -7,4 +8,8 @@ from app.domain.group_prediction.group_prediction import Group
 class Disagreement(ABC):
     @abstractmethod
     def get_disagreement(self, group: Group, item: ItemId) -> float:
-        pass
\ No newline at end of file
+        pass
+    
+    def get_disagreements(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        """Returns the disagreement of the group on each of the items, in the same order."""
+        return [self.get_disagreement(group, item) for item in items]
\ No newline at end of file
@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import FrozenSet, List, Sequence
 
 from app.domain.dataset import ItemId, UserId
 
 Group = List[UserId]
+# Identifies a group by its members, whatever their order.
+GroupKey = FrozenSet[UserId]
 
 class GroupPrediction(ABC):
     @abstractmethod
     def get_prediction(self, group: Group, item: ItemId) -> float:
-        pass
\ No newline at end of file
+        pass
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        """Returns the predicted ratings of the group for each of the items, in the same order."""
+        return [self.get_prediction(group, item) for item in items]
\ No newline at end of file
@@ -1,19 +1,51 @@
-from typing import List
-from app.domain.dataset import Dataset, ItemId
-from app.domain.group_prediction.group_prediction import Group, GroupPrediction
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.group_prediction.group_prediction import Group
+from app.domain.group_prediction.monotone_aggregation import MonotoneAggregation
 from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
-class LeastMiseryAggregation(GroupPrediction):
-    def __init__(self, dataset: Dataset, user_predictor: Prediction) -> None:
+class LeastMiseryAggregation(MonotoneAggregation):
+    def __init__(self, dataset: Dataset, user_predictor: Prediction, relevance: Optional[RelevanceProvider] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - user_predictor: The prediction function, used for the items not rated by a user.
+        - relevance: The relevances shared with the other group components. When given, it replaces
+          the lookups in the dataset and the user predictor.
+        """
+        
         self.__dataset = dataset
         self.__user_predictor = user_predictor
-        
+        self.__relevance = relevance
+    
     def get_prediction(self, group: Group, item: ItemId) -> float:
-        user_ratings: List[float] = []
-        for user in group:
-            user_rating = self.__dataset.get_rating(user, item)
-            if user_rating == 0: # User has not rated the item. Predict the value
-                user_rating = self.__user_predictor.get_prediction(user, item)
-            user_ratings.append(user_rating)
-        return min(user_ratings)
\ No newline at end of file
+        user_ratings: List[float] = [self.__get_relevance(user, item) for user in group]
+        return min(user_ratings)
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        if self.__relevance is None:
+            return super().get_predictions(group, items)
+        
+        return self.aggregate(self.__relevance.get_relevance_matrix(group, items)).tolist()
+    
+    @property
+    def relevance(self) -> Optional[RelevanceProvider]:
+        return self.__relevance
+    
+    def aggregate(self, relevances: np.ndarray) -> np.ndarray:
+        # Aggregation along the group axis.
+        return relevances.min(axis=0)
+    
+    def __get_relevance(self, user: UserId, item: ItemId) -> float:
+        if self.__relevance is not None:
+            return self.__relevance.get_relevance(user, item)
+        
+        user_rating = self.__dataset.get_rating(user, item)
+        if user_rating == 0: # User has not rated the item. Predict the value
+            user_rating = self.__user_predictor.get_prediction(user, item)
+        return user_rating
\ No newline at end of file
@@ -0,0 +1,35 @@
+from abc import abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from app.domain.group_prediction.group_prediction import Group, GroupPrediction
+from app.domain.relevance import RelevanceProvider
+
+
+class MonotoneAggregation(GroupPrediction):
+    """
+    Group predictions which aggregate the relevances of the members with a function that never decreases
+    when a relevance increases (eg. the average or the minimum).
+    
+    The top items of a group can then be found without scoring every item, see `select_top_k_by_threshold`.
+    """
+    
+    @property
+    @abstractmethod
+    def relevance(self) -> Optional[RelevanceProvider]:
+        """The relevances aggregated by the predictions, when they are provided."""
+        pass
+    
+    @abstractmethod
+    def aggregate(self, relevances: np.ndarray) -> np.ndarray:
+        """Aggregates a group x items relevance matrix into the predictions of the group for the items."""
+        pass
+    
+    def get_predictions_by_position(self, group: Group, positions: np.ndarray) -> np.ndarray:
+        """Returns the predictions of the group for the items at the given positions in `Dataset.get_all_items()`. The relevances must be provided."""
+        
+        relevance = self.relevance
+        if relevance is None:
+            raise ValueError("The predictions by position need the relevances of the aggregation.")
+        return self.aggregate(relevance.get_relevance_matrix_by_position(group, positions))
\ No newline at end of file
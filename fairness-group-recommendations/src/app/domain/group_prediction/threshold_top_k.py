@@ -0,0 +1,82 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId
+from app.domain.group_prediction.group_prediction import Group
+from app.domain.group_prediction.monotone_aggregation import MonotoneAggregation
+
+# Number of items read from the ranking of every member at the first step.
+THRESHOLD_BLOCK_SIZE = 64
+
+
+def select_top_k_by_threshold(
+        dataset: Dataset,
+        aggregation: MonotoneAggregation,
+        group: Group,
+        items: Sequence[ItemId],
+        limit: int,
+        block_size: int = THRESHOLD_BLOCK_SIZE) -> List[Tuple[ItemId, float]]:
+    """
+    Returns the `limit` items with the highest group predictions, by decreasing prediction,
+    scoring as few items as possible with the threshold algorithm (Fagin et al.).
+    
+    The rankings of the members are read in parallel, a block at a time, and the items met are scored.
+    An item not met yet is at most as relevant for each member as the last item read from its ranking,
+    so its prediction cannot exceed the aggregation of those relevances (the threshold): the search
+    stops once the selected items are all above it. Equal predictions are ordered as the given items,
+    so the result is the same as scoring every item.
+    
+    Parameters:
+    - dataset: The dataset containing the items.
+    - aggregation: The group prediction, which must be given a `RelevanceProvider`.
+    - group: The group of users.
+    - items: The items which can be recommended.
+    - limit: The number of items to return.
+    """
+    
+    relevance = aggregation.relevance
+    if relevance is None:
+        raise ValueError("The threshold algorithm needs the relevances of the aggregation.")
+    if limit <= 0 or len(group) == 0:
+        return []
+    
+    all_items = dataset.get_all_items()
+    num_items = len(all_items)
+    # Position of each item in the given items, or -1 for the items which cannot be recommended.
+    positions = np.full(num_items, -1, dtype=np.int64)
+    positions[dataset.get_item_indices(items)] = np.arange(len(items))
+    
+    relevances = [relevance.get_user_relevances(user) for user in group]
+    rankings = [relevance.get_ranking(user) for user in group]
+    
+    seen = np.zeros(num_items, dtype=bool)
+    selected_columns = np.zeros(0, dtype=np.int64)
+    selected_scores = np.zeros(0, dtype=np.float64)
+    start = 0
+    while start < num_items:
+        stop = min(start + block_size, num_items)
+        met = np.zeros(num_items, dtype=bool)
+        for ranking in rankings:
+            met[ranking[start:stop]] = True
+        met &= ~seen
+        seen |= met
+        columns = np.flatnonzero(met & (positions >= 0))
+        
+        scores = aggregation.aggregate(np.stack([member_relevances[columns] for member_relevances in relevances]))
+        selected_columns = np.concatenate([selected_columns, columns])
+        selected_scores = np.concatenate([selected_scores, scores])
+        order = np.lexsort((positions[selected_columns], -selected_scores))[:limit]
+        selected_columns, selected_scores = selected_columns[order], selected_scores[order]
+        
+        last_relevances = np.array([[member_relevances[ranking[stop - 1]]] for member_relevances, ranking in zip(relevances, rankings)])
+        threshold = aggregation.aggregate(last_relevances).item()
+        # An unseen item can tie with the last selected one only when the threshold is reached.
+        if len(selected_columns) == limit and selected_scores[-1] > threshold:
+            break
+        
+        # The blocks grow, so that a deep search (eg. large groups which barely agree) takes few steps.
+        start = stop
+        block_size *= 2
+    
+    return [(all_items[column], score) for column, score in zip(selected_columns.tolist(), selected_scores.tolist())]
\ No newline at end of file
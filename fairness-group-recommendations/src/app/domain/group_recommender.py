@@ -1,10 +1,22 @@
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 from app.domain.dataset import Dataset, ItemId
 from app.domain.group_prediction.group_prediction import Group, GroupPrediction
+from app.domain.group_prediction.monotone_aggregation import MonotoneAggregation
+from app.domain.group_prediction.threshold_top_k import select_top_k_by_threshold
 from app.domain.recommendations_log import RecommendationsLog
+from app.domain.top_k import select_top_k_indices
 
 class GroupRecommender:
-    def __init__(self, dataset: Dataset, predictor: GroupPrediction, exclude_previous: bool) -> None:
+    def __init__(
+            self,
+            dataset: Dataset,
+            predictor: GroupPrediction,
+            exclude_previous: bool,
+            use_threshold_algorithm: bool = False,
+            recommendations_log: Optional[RecommendationsLog] = None) -> None:
         """
         Initializes a GroupRecommender object.
 
@@ -12,36 +24,59 @@ class GroupRecommender:
         - dataset: The dataset containing user-item interactions.
         - predictor: The predictor used for making group recommendations.
         - exclude_previous: Flag indicating whether to exclude previous recommendations.
+        - use_threshold_algorithm: Flag indicating whether to find the top items with the threshold algorithm,
+          which stops scoring items once the top ones are known. The predictor must then be a
+          `MonotoneAggregation` with relevances.
+        - recommendations_log: The log of the previous recommendations, eg. backed by a session store.
+          When not given, a new in-memory log is used.
         """
         
+        if use_threshold_algorithm and not (isinstance(predictor, MonotoneAggregation) and predictor.relevance is not None):
+            raise ValueError("The threshold algorithm needs a monotone aggregation with relevances.")
+        
         self.__dataset = dataset
         self.__group_predictor = predictor
         self.__exclude_previous = exclude_previous
-        self.__recommendations_log = RecommendationsLog(dataset)
+        self.__use_threshold_algorithm = use_threshold_algorithm
+        self.__recommendations_log = recommendations_log if recommendations_log is not None else RecommendationsLog(dataset)
     
     def get_recommendations(self, group: Group, limit: int) -> List[Tuple[ItemId, float]]:
-        all_items = self.__filter_previously_recommended_items(group)
-        
-        recommendations = [
-            (item, self.__group_predictor.get_prediction(group, item))
-            for item in all_items
-        ]
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-        top_recommendations = recommendations[:limit]
+        if self.__use_threshold_algorithm:
+            assert isinstance(self.__group_predictor, MonotoneAggregation)
+            all_items = self.__filter_previously_recommended_items(group)
+            top_recommendations = select_top_k_by_threshold(self.__dataset, self.__group_predictor, group, all_items, limit)
+        elif isinstance(self.__group_predictor, MonotoneAggregation) and self.__group_predictor.relevance is not None:
+            # The candidates are kept as positions in the dataset items: only the top items are looked up.
+            positions = self.__get_candidate_positions(group)
+            position_predictions = self.__group_predictor.get_predictions_by_position(group, positions)
+            top_indices = select_top_k_indices(position_predictions, limit)
+            dataset_items = self.__dataset.get_all_items()
+            top_recommendations = [
+                (dataset_items[position], prediction)
+                for position, prediction in zip(positions[top_indices].tolist(), position_predictions[top_indices].tolist())
+            ]
+        else:
+            all_items = self.__filter_previously_recommended_items(group)
+            predictions = self.__group_predictor.get_predictions(group, all_items)
+            top_indices = select_top_k_indices(np.asarray(predictions, dtype=np.float64), limit)
+            top_recommendations = [(all_items[index], predictions[index]) for index in top_indices.tolist()]
         
         self.__update_previous_recommendations(group, top_recommendations)
         
         return top_recommendations
     
-    def __filter_previously_recommended_items(self, group: Group) -> Set[ItemId]:
-        all_items = set(self.__dataset.get_all_items())
+    def __filter_previously_recommended_items(self, group: Group) -> List[ItemId]:
         if self.__exclude_previous:
-            all_items = self.__recommendations_log.get_unrecommended_items(group)
-        return all_items
+            return self.__recommendations_log.get_unrecommended_items(group)
+        return self.__dataset.get_all_items()
+    
+    def __get_candidate_positions(self, group: Group) -> np.ndarray:
+        if self.__exclude_previous:
+            return self.__recommendations_log.get_unrecommended_positions(group)
+        return np.arange(len(self.__dataset.get_all_items()))
     
     def __update_previous_recommendations(self, group: Group, recommendations: List[Tuple[ItemId, float]]) -> None:
         if self.__exclude_previous:
             recommendation = set(item for item, _ in recommendations)
             self.__recommendations_log.add_recommendation(group, recommendation)
-    
-    
\ No newline at end of file
+
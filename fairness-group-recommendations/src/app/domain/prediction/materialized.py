@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.prediction.prediction import Prediction
+
+PREDICTION_BLOCK_SIZE = 32
+PREDICTION_DTYPE = np.float32
+
+# State of the worker processes which compute the prediction matrix.
+_worker_predictor: Optional[Prediction] = None
+_worker_users: Sequence[UserId] = []
+_worker_items: Sequence[ItemId] = []
+_worker_output_path: Optional[Path] = None
+
+
+class MaterializedPrediction(Prediction):
+    """
+    Predictions served from a precomputed user x item matrix, with O(1) lookups.
+    
+    Rows and columns follow the order of `Dataset.get_all_users()` and `Dataset.get_all_items()`.
+    Users and items not in the dataset raise a KeyError.
+    """
+    
+    def __init__(self, dataset: Dataset, predictions: np.ndarray) -> None:
+        """
+        Parameters:
+        - dataset: The dataset the matrix was computed on.
+        - predictions: The num_users x num_items prediction matrix. It can be memory-mapped.
+        """
+        
+        expected_shape = (len(dataset.get_all_users()), len(dataset.get_all_items()))
+        if predictions.shape != expected_shape:
+            raise ValueError(f"Expected a prediction matrix of shape {expected_shape}, got {predictions.shape}.")
+        
+        self.__dataset = dataset
+        self.__predictions = predictions
+        # Plain-array view of the values: it avoids the indexing overhead of np.memmap on single lookups.
+        self.__values = np.asarray(predictions)
+    
+    @classmethod
+    def load(cls, dataset: Dataset, path: Path) -> "MaterializedPrediction":
+        """Memory-maps a prediction matrix saved by `compute_prediction_matrix`."""
+        return cls(dataset, np.load(path, mmap_mode="r"))
+    
+    @property
+    def predictions(self) -> np.ndarray:
+        return self.__predictions
+    
+    def get_prediction(self, user: UserId, item: ItemId) -> float:
+        return self.__values.item(self.__dataset.get_user_index(user), self.__dataset.get_item_index(item))
+    
+    def get_predictions(self, user: UserId, items: Sequence[ItemId]) -> List[float]:
+        row = self.__values[self.__dataset.get_user_index(user)]
+        return row[self.__dataset.get_item_indices(items)].tolist()
+
+
+def compute_prediction_matrix(dataset: Dataset, predictor: Prediction, output_path: Optional[Path] = None, workers: int = 1) -> np.ndarray:
+    """
+    Computes the predictions of every user for every item, as a float32 num_users x num_items matrix.
+    
+    The rows are computed in blocks, which are spread over worker processes when more than one worker is used.
+    The first block is always computed in the current process, before the workers are started: whatever the
+    predictor loads on first use (eg. the matrix of a `StoredSimilarity`) is then loaded or saved only once.
+    
+    Parameters:
+    - dataset: The dataset containing the users and the items.
+    - predictor: The prediction function.
+    - output_path: When given, the matrix is written to this .npy file and returned memory-mapped,
+      instead of being kept in memory.
+    - workers: The number of processes to use.
+    """
+    
+    all_users = dataset.get_all_users()
+    all_items = dataset.get_all_items()
+    shape = (len(all_users), len(all_items))
+    blocks = [(start, min(start + PREDICTION_BLOCK_SIZE, shape[0])) for start in range(0, shape[0], PREDICTION_BLOCK_SIZE)]
+    
+    temporary_path: Optional[Path] = None
+    if output_path is None:
+        matrix = np.empty(shape, dtype=PREDICTION_DTYPE)
+    else:
+        # The file is written under a temporary name and moved in place when complete.
+        temporary_path = output_path.with_suffix(".tmp.npy")
+        matrix = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=PREDICTION_DTYPE, shape=shape)
+    
+    if workers > 1 and len(blocks) > 1:
+        start, stop = blocks[0]
+        matrix[start:stop] = _compute_rows(predictor, all_users, all_items, start, stop)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(predictor, all_users, all_items, temporary_path),
+        ) as executor:
+            for (start, stop), block in zip(blocks[1:], executor.map(_compute_rows_in_worker, *zip(*blocks[1:]))):
+                # Workers write their rows directly to the file, when there is one.
+                if block is not None:
+                    matrix[start:stop] = block
+    else:
+        for start, stop in blocks:
+            matrix[start:stop] = _compute_rows(predictor, all_users, all_items, start, stop)
+    
+    if output_path is None or temporary_path is None:
+        return matrix
+    
+    matrix.flush()
+    del matrix
+    temporary_path.replace(output_path)
+    return np.load(output_path, mmap_mode="r")
+
+
+def _compute_rows(predictor: Prediction, users: Sequence[UserId], items: Sequence[ItemId], start: int, stop: int) -> np.ndarray:
+    block = np.empty((stop - start, len(items)), dtype=PREDICTION_DTYPE)
+    for row in range(start, stop):
+        block[row - start] = predictor.get_predictions(users[row], items)
+    return block
+
+
+def _initialize_worker(predictor: Prediction, users: Sequence[UserId], items: Sequence[ItemId], output_path: Optional[Path]) -> None:
+    global _worker_predictor, _worker_users, _worker_items, _worker_output_path
+    _worker_predictor = predictor
+    _worker_users = users
+    _worker_items = items
+    _worker_output_path = output_path
+
+
+def _compute_rows_in_worker(start: int, stop: int) -> Optional[np.ndarray]:
+    assert _worker_predictor is not None
+    block = _compute_rows(_worker_predictor, _worker_users, _worker_items, start, stop)
+    if _worker_output_path is None:
+        return block
+    
+    matrix = np.load(_worker_output_path, mmap_mode="r+")
+    matrix[start:stop] = block
+    matrix.flush()
+    return None
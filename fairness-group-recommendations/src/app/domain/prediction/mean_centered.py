@@ -1,99 +1,115 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csc_matrix
+
 from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.prediction.neighbor_index import NeighborIndex
 from app.domain.prediction.prediction import Prediction
 from app.domain.similarity.similarity import Similarity
 
 
 ALL_NEIGHBORS = -1
 
+# Above this ratio between requested items and all items, the weighted sums are computed over the whole rating matrix.
+FULL_PRODUCT_RATIO = 4
+
 class MeanCenteredPrediction(Prediction):
-    def __init__(self, dataset: Dataset, similarity: Similarity, num_neighbors: int, use_absolute_value: bool) -> None:
+    def __init__(self, dataset: Dataset, similarity: Similarity, num_neighbors: int, use_absolute_value: bool, neighbor_index: Optional[NeighborIndex] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - similarity: The similarity between users.
+        - num_neighbors: The number of most similar users considered for a prediction, or ALL_NEIGHBORS.
+        - use_absolute_value: Whether to normalize by the sum of the absolute values of the similarities.
+        - neighbor_index: The index of the most similar users, which can be shared among predictors using the same similarity.
+          When not given, a new one is created (unless all neighbors are considered).
+        """
+        
         self.__dataset = dataset
         self.__similarity = similarity
         self.__num_neighbors = num_neighbors
         self.__use_absolute_value = use_absolute_value
         self.__predictions: Dict[Tuple[UserId, ItemId], float] = {}
+        if neighbor_index is None and num_neighbors != ALL_NEIGHBORS:
+            neighbor_index = NeighborIndex(dataset, similarity, num_neighbors)
+        self.__neighbor_index = neighbor_index
+        self.__item_matrices: Optional[Tuple[csc_matrix, csc_matrix]] = None
     
     def get_prediction(self, user: UserId, item: ItemId) -> float:
         if self.__predictions.get((user, item)):
             return self.__predictions[(user, item)]
         
-        closest_neighbors = self.__get_neighbors_similarities(user, item)
+        prediction = self.get_predictions(user, [item])[0]
+        self.__predictions[(user, item)] = prediction
+                
+        return prediction
+    
+    def get_predictions(self, user: UserId, items: Sequence[ItemId]) -> List[float]:
+        avg_user_rating = self.__dataset.get_average_rating_by_user(user)
         
-        neighbors_avg_ratings = [
-            self.__dataset.get_average_rating_by_user(neighbor)
-            for (neighbor, _, _) in closest_neighbors
-        ]
-        rating_differences = [
-            rating - avg_rating
-            for ((_, rating, _), avg_rating) in zip(closest_neighbors, neighbors_avg_ratings)
-        ]
+        # Items missing from the dataset have no neighbors: their prediction is the user average.
+        item_ids = self.__dataset.get_item_ids()
+        items_array = np.asarray(items, dtype=np.int64)
+        columns = np.minimum(item_ids.searchsorted(items_array), max(len(item_ids) - 1, 0))
+        known = (items_array == item_ids[columns]) if len(item_ids) > 0 else np.zeros(len(items_array), dtype=bool)
+        columns = columns[known]
         
-        avg_user_rating = self.__dataset.get_average_rating_by_user(user)
+        centered, rated = self.__get_item_matrices()
+        weights = self.__get_neighbors_weights(user, rated, columns)
         
-        if self.__use_absolute_value:
-            denominator = sum([abs(similarity) for (_, _, similarity) in closest_neighbors])
+        # Weighted sums over the neighbors who rated each item. The sums of the whole matrix are cheaper than slicing it
+        # when many items are requested; both add the terms in the same order (by neighbor index).
+        if len(columns) * FULL_PRODUCT_RATIO > centered.shape[1]:
+            numerators = (centered.T @ weights)[columns]
+            denominators = (rated.T @ (np.abs(weights) if self.__use_absolute_value else weights))[columns]
         else:
-            denominator = sum([similarity for (_, _, similarity) in closest_neighbors])
+            numerators = centered[:, columns].T @ weights
+            denominators = rated[:, columns].T @ (np.abs(weights) if self.__use_absolute_value else weights)
         
-        if denominator == 0:
-            # Here, the case is that the considered neighbors for the given item
-            # have no similarity with the considered user (ie. their tastes do not overlap in any way).
-            # Just take into account the average rating for the considered user.
-            prediction = avg_user_rating
-        else:
-            prediction = avg_user_rating + (
-                sum([
-                    similarity * rating_difference
-                    for ((_, _, similarity), rating_difference) in zip(closest_neighbors, rating_differences)
-                ])
-                
-                /
-                
-                denominator
-            )
-            
-        self.__predictions[(user, item)] = prediction
-                
-        return prediction
+        predictions = np.full(len(items_array), avg_user_rating, dtype=np.float64)
+        # When the considered neighbors have no similarity with the user (ie. their tastes
+        # do not overlap in any way), just take into account the average rating of the user.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            predictions[known] = np.where(denominators != 0, avg_user_rating + numerators / denominators, avg_user_rating)
+        
+        return predictions.tolist()
     
-    def __get_neighbors_similarities(self, user: UserId, item: ItemId) -> List[Tuple[UserId, float, float]]:
+    def __get_neighbors_weights(self, user: UserId, rated: csc_matrix, columns: np.ndarray) -> np.ndarray:
+        """Returns the similarity of the user with each neighbor considered for the given item columns (zero for the others), by user index."""
+        
+        weights = np.zeros(rated.shape[0])
         if self.__num_neighbors == ALL_NEIGHBORS:
-            # if all neighbors, return all users who rated the item
-            neighbors = self.__dataset.get_users_who_rated(item)
-            #   compute similarities for all users
-            neighbors_similarities = [
-                (
-                    neighbor,
-                    rating,
-                    self.__similarity.get_similarity(user, neighbor)
-                )
-                for (neighbor, rating) in neighbors
-            ]
-            return neighbors_similarities
+            # if all neighbors, consider all users who rated the items
+            if len(columns) * FULL_PRODUCT_RATIO > rated.shape[1]:
+                rows = np.arange(rated.shape[0])
+            else:
+                rows = np.unique(rated[:, columns].indices)
+            neighbors = self.__dataset.get_user_ids()[rows].tolist()
+            weights[rows] = self.__similarity.get_similarities(user, neighbors)
         else:
-            neighbors = [neighbor for neighbor in self.__dataset.get_all_users() if neighbor != user]
-            
-            # compute similarities for all users
-            neighbors_similarities = [
-                (
-                    neighbor, 
-                    self.__dataset.get_rating(neighbor, item), 
-                    self.__similarity.get_similarity(user, neighbor)
-                )
-                for neighbor in neighbors
-            ]
-            
-            # take the most similar users
-            neighbors_similarities.sort(key=lambda x: x[2], reverse=True)
-            closest_neighbors = neighbors_similarities[:self.__num_neighbors]
-            
-            # exclude neighbors who have not rated the item
-            closest_neighbors = [
-                (neighbor, rating, similarity)
-                for (neighbor, rating, similarity) in closest_neighbors
-                if rating != 0
-            ]
-            
-            # return the most similar users who rated the item
-            return closest_neighbors
\ No newline at end of file
+            assert self.__neighbor_index is not None
+            # take the most similar users, which are ranked once for every item
+            # (neighbors who have not rated an item have no rating in its column)
+            closest_neighbors = self.__neighbor_index.get_neighbors(user)
+            neighbors = [neighbor for (neighbor, _) in closest_neighbors]
+            rows = self.__dataset.get_user_indices(neighbors)
+            weights[rows] = [similarity for (_, similarity) in closest_neighbors]
+        return weights
+    
+    def __get_item_matrices(self) -> Tuple[csc_matrix, csc_matrix]:
+        """Returns the mean-centered ratings and the binary rated indicators, as user x item matrices in CSC format."""
+        
+        if self.__item_matrices is None:
+            ratings = self.__dataset.get_rating_matrix_by_item()
+            means = self.__dataset.get_average_ratings()
+            is_rated = np.ones(len(ratings.data))
+            if self.__num_neighbors != ALL_NEIGHBORS:
+                # the most similar neighbors are considered only if their rating is not zero
+                is_rated = (ratings.data != 0).astype(np.float64)
+            centered_data = (ratings.data - means[ratings.indices]) * is_rated
+            self.__item_matrices = (
+                csc_matrix((centered_data, ratings.indices, ratings.indptr), shape=ratings.shape),
+                csc_matrix((is_rated, ratings.indices, ratings.indptr), shape=ratings.shape),
+            )
+        return self.__item_matrices
@@ -0,0 +1,67 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.dataset import Dataset, UserId
+from app.domain.similarity.similarity import Similarity
+
+
+class NeighborIndex:
+    """
+    The most similar neighbors of each user, sorted by decreasing similarity.
+    
+    The list of a user is computed on first request and reused afterwards, since it does not depend on the item to predict.
+    Neighbors with the same similarity keep the order of `Dataset.get_all_users()`.
+    The lists are dropped when the dataset content changes (ie. its fingerprint), or when a new dataset or similarity is set.
+    """
+    
+    def __init__(self, dataset: Dataset, similarity: Similarity, num_neighbors: int) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the users.
+        - similarity: The similarity used to rank the neighbors.
+        - num_neighbors: The number of neighbors kept for each user.
+        """
+        
+        self.__dataset = dataset
+        self.__similarity = similarity
+        self.__num_neighbors = num_neighbors
+        self.__neighbors: Dict[UserId, List[Tuple[UserId, float]]] = {}
+        self.__fingerprint: Optional[str] = None
+    
+    def get_neighbors(self, user: UserId) -> List[Tuple[UserId, float]]:
+        """Returns the (neighbor, similarity) pairs of the most similar users to the given user, the user excluded."""
+        
+        fingerprint = self.__dataset.fingerprint
+        if fingerprint != self.__fingerprint:
+            self.invalidate()
+            self.__fingerprint = fingerprint
+        
+        neighbors = self.__neighbors.get(user)
+        if neighbors is None:
+            neighbors = self.__compute_neighbors(user)
+            self.__neighbors[user] = neighbors
+        return neighbors
+    
+    def set_dataset(self, dataset: Dataset) -> None:
+        self.__dataset = dataset
+        self.invalidate()
+    
+    def set_similarity(self, similarity: Similarity) -> None:
+        self.__similarity = similarity
+        self.invalidate()
+    
+    def invalidate(self, user: Optional[UserId] = None) -> None:
+        """Drops the neighbors of the given user, or of every user when no user is given."""
+        
+        if user is None:
+            self.__neighbors.clear()
+        else:
+            self.__neighbors.pop(user, None)
+    
+    def __compute_neighbors(self, user: UserId) -> List[Tuple[UserId, float]]:
+        neighbors = [neighbor for neighbor in self.__dataset.get_all_users() if neighbor != user]
+        similarities = self.__similarity.get_similarities(user, neighbors).tolist()
+        candidates = list(zip(neighbors, similarities))
+        
+        # Same result as a stable sort by decreasing similarity, truncated to the first neighbors.
+        return heapq.nlargest(self.__num_neighbors, candidates, key=lambda x: x[1])
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Sequence
 
 from app.domain.dataset import ItemId, UserId
 
@@ -6,4 +7,8 @@ from app.domain.dataset import ItemId, UserId
 class Prediction(ABC):
     @abstractmethod
     def get_prediction(self, user: UserId, item: ItemId) -> float:
-        pass
\ No newline at end of file
+        pass
+    
+    def get_predictions(self, user: UserId, items: Sequence[ItemId]) -> List[float]:
+        """Returns the predicted ratings of the given user for each of the items, in the same order."""
+        return [self.get_prediction(user, item) for item in items]
\ No newline at end of file
@@ -1,7 +1,10 @@
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set
 
-from app.domain.dataset import Dataset, ItemId
-from app.domain.group_prediction.group_prediction import Group
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.group_prediction.group_prediction import Group, GroupKey
+from app.domain.session_store import SessionStore
 
 
 class RecommendationsLog:
@@ -9,31 +12,101 @@ class RecommendationsLog:
     Collection used to log recommendations made to groups.
     
     Useful to avoid recommending the same items to the same group multiple times.
+    Groups are identified by their members, whatever their order. The items not recommended yet to a group
+    are kept as a mask over the items of the dataset, updated with each new recommendation.
+    
+    When a session store is given, the recommendations and the satisfactions are also saved in it,
+    and the history of a group is read from it the first time the group is met.
     """
     
-    def __init__(self, dataset: Dataset) -> None:
-        self.__dataset = dataset
-        self.__recommendations: Dict[str, List[Set[ItemId]]] = {}
+    def __init__(self, dataset: Dataset, store: Optional[SessionStore] = None, session: str = "") -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the items.
+        - store: The store keeping the history of the sessions, if any.
+        - session: The name of the session of the groups in the store (eg. the recommendation method).
+        """
         
+        self.__dataset = dataset
+        self.__store = store
+        self.__session = session
+        self.__recommendations: Dict[GroupKey, List[Set[ItemId]]] = {}
+        self.__unrecommended_items: Dict[GroupKey, np.ndarray] = {}
+        self.__items: Optional[np.ndarray] = None
+        self.__item_positions: Dict[ItemId, int] = {}
+    
+    @staticmethod
+    def get_group_key(group: Group) -> GroupKey:
+        return frozenset(group)
+    
     def add_recommendation(self, group: Group, recommendation: Set[ItemId]) -> None:
-        group_key = str(set(group))
-        if self.__recommendations.get(group_key):
-            self.__recommendations[group_key].append(recommendation)
-        else:
-            self.__recommendations[group_key] = [recommendation]
-    
-    def get_unrecommended_items(self, group: Group) -> Set[ItemId]:
-        group_key = str(set(group))
-        previous_recommendations = set(
-            item
-            for recommendation in self.__recommendations.get(group_key, [])
-            for item in recommendation
-        )
-        items = set(self.__dataset.get_all_items()) - previous_recommendations
-        return items
+        group_key = self.get_group_key(group)
+        recommendations = self.__get_recommendations(group_key)
+        if self.__store is not None:
+            self.__store.add_recommendation(self.__session, group_key, len(recommendations), sorted(recommendation))
+        recommendations.append(recommendation)
+        
+        unrecommended_items = self.__unrecommended_items.get(group_key)
+        if unrecommended_items is not None:
+            unrecommended_items[self.__get_positions(recommendation)] = False
+    
+    def add_satisfactions(self, group: Group, satisfactions: Dict[UserId, float]) -> None:
+        """Saves the satisfaction of the members with the last recommendation to the group, when there is a session store."""
+        
+        group_key = self.get_group_key(group)
+        recommendations = self.__get_recommendations(group_key)
+        if self.__store is not None and len(recommendations) > 0:
+            self.__store.add_satisfactions(self.__session, group_key, len(recommendations) - 1, satisfactions)
+    
+    def get_unrecommended_items(self, group: Group) -> List[ItemId]:
+        """Returns the items never recommended to the group, ordered as `Dataset.get_all_items()`."""
+        return self.__get_items()[self.get_unrecommended_positions(group)].tolist()
+    
+    def get_unrecommended_positions(self, group: Group) -> np.ndarray:
+        """
+        Returns the positions in `Dataset.get_all_items()` of the items never recommended to the group, in ascending order.
+        Unlike `get_unrecommended_items`, no list of every candidate item is built.
+        """
+        
+        group_key = self.get_group_key(group)
+        unrecommended_items = self.__unrecommended_items.get(group_key)
+        if unrecommended_items is None:
+            unrecommended_items = np.ones(len(self.__get_items()), dtype=bool)
+            for recommendation in self.__get_recommendations(group_key):
+                unrecommended_items[self.__get_positions(recommendation)] = False
+            self.__unrecommended_items[group_key] = unrecommended_items
+        
+        return np.flatnonzero(unrecommended_items)
+    
+    def get_recommended_positions(self, group: Group) -> List[int]:
+        """Returns the positions in `Dataset.get_all_items()` of the items recommended to the group, leaving out the items unknown to the dataset."""
+        
+        group_key = self.get_group_key(group)
+        return [position for recommendation in self.__get_recommendations(group_key) for position in self.__get_positions(recommendation)]
     
     def get_previous_recommendations(self, group: Group) -> List[Set[ItemId]]:
         """Note: The relative position of the items in the recommendations is not preserved."""
-        group_key = str(set(group))
-        previous_recommendations = self.__recommendations.get(group_key, [])
-        return previous_recommendations
\ No newline at end of file
+        group_key = self.get_group_key(group)
+        previous_recommendations = self.__get_recommendations(group_key)
+        return previous_recommendations
+    
+    def __get_recommendations(self, group_key: GroupKey) -> List[Set[ItemId]]:
+        recommendations = self.__recommendations.get(group_key)
+        if recommendations is None:
+            recommendations = []
+            if self.__store is not None:
+                recommendations = [set(recommendation) for recommendation in self.__store.get_recommendations(self.__session, group_key)]
+            self.__recommendations[group_key] = recommendations
+        return recommendations
+    
+    def __get_items(self) -> np.ndarray:
+        if self.__items is None:
+            all_items = self.__dataset.get_all_items()
+            self.__items = np.asarray(all_items)
+            self.__item_positions = {item: position for position, item in enumerate(all_items)}
+        return self.__items
+    
+    def __get_positions(self, items: Iterable[ItemId]) -> List[int]:
+        self.__get_items()
+        # Items unknown to the dataset were never candidates.
+        return [position for position in map(self.__item_positions.get, items) if position is not None]
\ No newline at end of file
@@ -1,23 +1,54 @@
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.domain.candidates.candidate_generator import CandidateGenerator
 from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.prediction.materialized import compute_prediction_matrix
 from app.domain.prediction.prediction import Prediction
+from app.domain.top_k import select_top_k_indices
 
     
 class Recommender: 
-    def __init__(self, dataset: Dataset, predictor: Prediction) -> None:
+    def __init__(self, dataset: Dataset, predictor: Prediction, candidates: Optional[CandidateGenerator] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - predictor: The prediction function.
+        - candidates: The generator of the items worth predicting. The other items get its fallback score
+          without calling the predictor. When not given, every item not rated by the user is predicted.
+        """
+        
         self.__dataset = dataset
         self.__predictor = predictor
+        self.__candidates = candidates
     
     def get_recommendations(self, user: UserId, limit: int) -> List[Tuple[ItemId, float]]:
         unrated_items = self.__dataset.get_items_not_rated_by_user(user)
-        predicted_ratings = [
-            (item, self.__predictor.get_prediction(user, item))
-            for item in unrated_items
-        ]
-        predicted_ratings.sort(key=lambda x: x[1], reverse=True)
+        if self.__candidates is None:
+            predicted_ratings = self.__predictor.get_predictions(user, unrated_items)
+        else:
+            predicted_ratings = self.__get_predictions_of_candidates(user, unrated_items)
         
-        return predicted_ratings[:limit]
+        top_indices = select_top_k_indices(np.asarray(predicted_ratings, dtype=np.float64), limit)
+        return [(unrated_items[index], predicted_ratings[index]) for index in top_indices.tolist()]
+    
+    def get_all_recommendations(self, user: UserId) -> List[Tuple[ItemId, float]]:
+        """Returns every item not rated by the user, by decreasing predicted rating."""
+        return self.get_recommendations(user, len(self.__dataset.get_all_items()))
+    
+    def __get_predictions_of_candidates(self, user: UserId, items: List[ItemId]) -> List[float]:
+        assert self.__candidates is not None
+        candidates = self.__candidates.get_candidates(user)
+        candidate_positions = [position for position, item in enumerate(items) if item in candidates]
+        
+        predicted_ratings = [self.__candidates.get_fallback_score(user)] * len(items)
+        candidate_predictions = self.__predictor.get_predictions(user, [items[position] for position in candidate_positions])
+        for position, prediction in zip(candidate_positions, candidate_predictions):
+            predicted_ratings[position] = prediction
+        return predicted_ratings
 
 @dataclass
 class PredictionComparison:
@@ -55,15 +86,17 @@ class PerformanceEvaluator:
     def get_comparison_by_user(self, user: UserId) -> Dict[PredictorName, Evaluation]:
         actual_ratings = self.__dataset.get_ratings_by_user(user)
         comparisons = {}
+        rated_items = [item for item, _ in actual_ratings]
         for predictor_name, predictor in self.__predictors:
+            predictions = predictor.get_predictions(user, rated_items)
             item_predictions = {
                 item:
                 ItemPrediction(
                     item=item,
-                    prediction=predictor.get_prediction(user, item),
+                    prediction=prediction,
                     actual_rating=rating,
                 )
-                for item, rating in actual_ratings
+                for (item, rating), prediction in zip(actual_ratings, predictions)
             }
             evaluation = Evaluation(item_predictions)
             comparisons.update({predictor_name: evaluation})
@@ -71,14 +104,22 @@ class PerformanceEvaluator:
     
     def get_all_predictions(self, predictor: Prediction) -> Dict[UserId, List[Tuple[ItemId, float]]]:
         all_users = self.__dataset.get_all_users()
+        all_items = self.__dataset.get_all_items()
         result = {}
         for user in all_users:
-            result[user] = [
-                (item, predictor.get_prediction(user, item))
-                for item in self.__dataset.get_all_items()
-            ]
+            result[user] = list(zip(all_items, predictor.get_predictions(user, all_items)))
         return result
     
+    def get_prediction_matrix(self, predictor: Prediction, output_path: Optional[Path] = None, workers: int = 1) -> np.ndarray:
+        """
+        Materializes the predictions of every user for every item, as a float32 num_users x num_items matrix
+        whose rows and columns follow the dataset users and items (see `compute_prediction_matrix`).
+        
+        The result can be served by a `MaterializedPrediction`.
+        """
+        
+        return compute_prediction_matrix(self.__dataset, predictor, output_path, workers)
+    
     @property
     def predictor_names(self) -> List[str]:
         return [name for (name, _) in self.__predictors]
\ No newline at end of file
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.prediction.prediction import Prediction
+
+# Number of users whose relevances are kept by default: enough for the members of any group, and a few sessions of them.
+RELEVANCE_CACHE_USERS = 256
+
+
+class RelevanceProvider:
+    """
+    The relevance of the items for each user: the rating of the user when there is one, the prediction otherwise.
+    
+    The relevances of a user are computed for every item on first request, with a single batch prediction,
+    and kept as a dense row ordered as `Dataset.get_all_items()`. Sharing a provider among the group aggregators,
+    the disagreement and the user satisfaction thus computes each relevance once, however many of them read it.
+    The rows of the least recently used users are dropped beyond `max_users`, and all of them are dropped
+    when the dataset content changes (ie. its fingerprint).
+    """
+    
+    def __init__(self, dataset: Dataset, predictor: Prediction, max_users: Optional[int] = RELEVANCE_CACHE_USERS) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the ratings.
+        - predictor: The prediction function, used for the items not rated by the user.
+        - max_users: The maximum number of users whose relevances (and rankings) are kept. They are all kept when None.
+        """
+        
+        if max_users is not None and max_users < 1:
+            raise ValueError("The maximum number of users of the cache must be positive.")
+        
+        self.__dataset = dataset
+        self.__predictor = predictor
+        self.__max_users = max_users
+        self.__relevances: OrderedDict[UserId, np.ndarray] = OrderedDict()
+        self.__rankings: Dict[UserId, np.ndarray] = {}
+        self.__fingerprint: Optional[str] = None
+    
+    def get_relevance(self, user: UserId, item: ItemId) -> float:
+        try:
+            column = self.__dataset.get_item_index(item)
+        except KeyError:
+            # Items missing from the dataset are not rated by anyone: only the predictor knows them.
+            return self.__predictor.get_prediction(user, item)
+        return self.__get_user_relevances(user).item(column)
+    
+    def get_relevances(self, user: UserId, items: Sequence[ItemId]) -> np.ndarray:
+        """Returns the relevance of each item for the user, in the same order. Raises KeyError for unknown items."""
+        return self.__get_user_relevances(user)[self.__dataset.get_item_indices(items)]
+    
+    def get_relevance_matrix(self, group: Sequence[UserId], items: Sequence[ItemId]) -> np.ndarray:
+        """Returns the len(group) x len(items) matrix of the relevances. Raises KeyError for unknown items."""
+        
+        return self.get_relevance_matrix_by_position(group, self.__dataset.get_item_indices(items))
+    
+    def get_relevance_matrix_by_position(self, group: Sequence[UserId], positions: np.ndarray) -> np.ndarray:
+        """Returns the len(group) x len(positions) matrix of the relevances of the items at the given positions in `Dataset.get_all_items()`."""
+        
+        if len(group) == 0:
+            return np.zeros((0, len(positions)))
+        return np.stack([self.__get_user_relevances(user)[positions] for user in group])
+    
+    def get_user_relevances(self, user: UserId) -> np.ndarray:
+        """Returns the relevance of every item for the user, ordered as `Dataset.get_all_items()`. The array must not be modified."""
+        return self.__get_user_relevances(user)
+    
+    def get_ranking(self, user: UserId) -> np.ndarray:
+        """
+        Returns the positions of the items in `Dataset.get_all_items()`, by decreasing relevance for the user.
+        Items with the same relevance keep their order. The array must not be modified.
+        """
+        
+        relevances = self.__get_user_relevances(user)
+        ranking = self.__rankings.get(user)
+        if ranking is None:
+            ranking = np.argsort(-relevances, kind="stable")
+            self.__rankings[user] = ranking
+        return ranking
+    
+    def invalidate(self, user: Optional[UserId] = None) -> None:
+        """Drops the relevances of the given user, or of every user when no user is given."""
+        
+        if user is None:
+            self.__relevances.clear()
+            self.__rankings.clear()
+        else:
+            self.__relevances.pop(user, None)
+            self.__rankings.pop(user, None)
+    
+    def __get_user_relevances(self, user: UserId) -> np.ndarray:
+        fingerprint = self.__dataset.fingerprint
+        if fingerprint != self.__fingerprint:
+            self.invalidate()
+            self.__fingerprint = fingerprint
+        
+        relevances = self.__relevances.get(user)
+        if relevances is not None:
+            self.__relevances.move_to_end(user)
+            return relevances
+        
+        relevances = self.__compute_user_relevances(user)
+        self.__relevances[user] = relevances
+        if self.__max_users is not None and len(self.__relevances) > self.__max_users:
+            evicted_user, _ = self.__relevances.popitem(last=False)
+            self.__rankings.pop(evicted_user, None)
+        return relevances
+    
+    def __compute_user_relevances(self, user: UserId) -> np.ndarray:
+        relevances = np.asarray(self.__predictor.get_predictions(user, self.__dataset.get_all_items()), dtype=np.float64)
+        
+        # As for a missing rating, a rating of 0 is replaced by the prediction.
+        ratings = self.__dataset.get_rating_matrix()[self.__dataset.get_user_index(user)]
+        rated = ratings.data != 0
+        relevances[ratings.indices[rated]] = ratings.data[rated]
+        return relevances
\ No newline at end of file
@@ -0,0 +1,83 @@
+from typing import Tuple
+
+import numpy as np
+
+from app.domain.group_prediction.threshold_top_k import THRESHOLD_BLOCK_SIZE
+
+
+class BlendRanking:
+    """
+    Ranks items by the blend of two score vectors, `(1 - weight) * first + weight * second`, for any weight between 0 and 1.
+    
+    Both vectors are sorted once. The top items for a weight are then found with the threshold algorithm
+    (see `select_top_k_by_threshold`): the two rankings are read in parallel, a block at a time, until no item
+    left can beat the selected ones. Since the blend never decreases when a score increases, the items read
+    are usually only a few more than the requested ones, instead of every item being scored again.
+    """
+    
+    def __init__(self, first_scores: np.ndarray, second_scores: np.ndarray, block_size: int = THRESHOLD_BLOCK_SIZE) -> None:
+        """
+        Parameters:
+        - first_scores: The first score of every item.
+        - second_scores: The second score of every item, in the same order.
+        - block_size: The number of items read from each ranking at the first step.
+        """
+        
+        self.__scores = (first_scores, second_scores)
+        self.__block_size = block_size
+        # Positions of the items by decreasing score (equal scores keep their order), and depth of each item in them.
+        self.__rankings = tuple(np.argsort(-scores, kind="stable") for scores in self.__scores)
+        depths = []
+        for ranking in self.__rankings:
+            depth = np.empty(len(ranking), dtype=np.int64)
+            depth[ranking] = np.arange(len(ranking))
+            depths.append(depth)
+        # An item is read at the smallest of its depths in the two rankings.
+        self.__first_depths = np.minimum(*depths)
+    
+    def blend(self, weight: float, positions: np.ndarray) -> np.ndarray:
+        """Returns the blended scores of the items at the given positions."""
+        first_scores, second_scores = self.__scores
+        return (1 - weight) * first_scores[positions] + weight * second_scores[positions]
+    
+    def get_top_k(self, weight: float, excluded_positions: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the positions and the blended scores of the `limit` items with the highest blended scores,
+        by decreasing score, leaving out the items at the excluded positions.
+        
+        Equal scores are ordered by position, so the result is the same as a stable sort of every blended score.
+        """
+        
+        if not 0 <= weight <= 1:
+            raise ValueError("The weight of the blend must be between 0 and 1.")
+        
+        first_scores, second_scores = self.__scores
+        first_ranking, second_ranking = self.__rankings
+        num_items = len(self.__first_depths)
+        excluded_positions = np.unique(excluded_positions)
+        selected_positions = np.zeros(0, dtype=np.int64)
+        selected_scores = np.zeros(0, dtype=np.float64)
+        start = 0
+        block_size = self.__block_size
+        while start < num_items and limit > 0:
+            stop = min(start + block_size, num_items)
+            positions = np.unique(np.concatenate([first_ranking[start:stop], second_ranking[start:stop]]))
+            # Items read in a previous block, or which cannot be recommended, are skipped.
+            positions = positions[self.__first_depths[positions] >= start]
+            positions = positions[~np.isin(positions, excluded_positions, assume_unique=True)]
+            
+            selected_positions = np.concatenate([selected_positions, positions])
+            selected_scores = np.concatenate([selected_scores, self.blend(weight, positions)])
+            order = np.lexsort((selected_positions, -selected_scores))[:limit]
+            selected_positions, selected_scores = selected_positions[order], selected_scores[order]
+            
+            # Blend of the last scores read: the scores of an item not read yet are at most these ones.
+            threshold = ((1 - weight) * first_scores[first_ranking[stop - 1]] + weight * second_scores[second_ranking[stop - 1]]).item()
+            # An item not read yet can tie with the last selected one only when the threshold is reached.
+            if len(selected_positions) == limit and selected_scores[-1] > threshold:
+                break
+            
+            start = stop
+            block_size *= 2
+        
+        return selected_positions, selected_scores
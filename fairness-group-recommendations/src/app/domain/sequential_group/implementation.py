@@ -1,25 +1,54 @@
-from typing import List, Tuple
-from app.domain.dataset import Dataset, ItemId
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.domain.dataset import Dataset, ItemId, UserId
 from app.domain.group_prediction.group_prediction import Group
 from app.domain.recommendations_log import RecommendationsLog
+from app.domain.sequential_group.blend_ranking import BlendRanking
+from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
 from app.domain.sequential_group.prediction.sequential_group_prediction import SequentialGroupPrediction
 from app.domain.sequential_group.sequential_group_recommender import SequentialGroupRecommender
+from app.domain.top_k import select_top_k_indices
 
 
 class SequentialGroupRecommenderImpl(SequentialGroupRecommender):
-    def __init__(self, dataset: Dataset, predictor: SequentialGroupPrediction) -> None:
+    def __init__(
+            self,
+            dataset: Dataset,
+            predictor: SequentialGroupPrediction,
+            recommendations_log: Optional[RecommendationsLog] = None,
+            incremental_reranking: bool = False) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the items.
+        - predictor: The sequential group prediction.
+        - recommendations_log: The log of the previous recommendations, eg. backed by a session store.
+          When not given, a new in-memory log is used.
+        - incremental_reranking: Flag indicating whether to re-rank the items of the next rounds from the average
+          and least misery predictions of the first round, since only the weight of their blend (alpha) and
+          the excluded items change between rounds. The predictor must then be a `MultiIterSequentialHybridAggregation`.
+        """
+        
+        if incremental_reranking and not isinstance(predictor, MultiIterSequentialHybridAggregation):
+            raise ValueError("The incremental re-ranking needs the sequential hybrid aggregation.")
+        
         self.__dataset = dataset
         self.__predictor = predictor
-        self.__recommendations_log = RecommendationsLog(dataset)
+        self.__recommendations_log = recommendations_log if recommendations_log is not None else RecommendationsLog(dataset)
+        self.__incremental_reranking = incremental_reranking
+        # Average and least misery predictions of every item, by group. Dropped when the dataset content changes.
+        self.__blend_rankings: Dict[Tuple[UserId, ...], BlendRanking] = {}
+        self.__fingerprint: Optional[str] = None
     
     def get_recommendations(self, group: Group, limit: int) -> List[Tuple[ItemId, float]]:
-        all_items = self.__recommendations_log.get_unrecommended_items(group)
-        item_ratings = [
-            (item, self.__predictor.get_prediction(group, item))
-            for item in all_items
-        ]
-        item_ratings.sort(key=lambda x: x[1], reverse=True)
-        top_recommendations = item_ratings[:limit]
+        top_recommendations = self.__rerank(group, limit) if self.__incremental_reranking else None
+        if top_recommendations is None:
+            all_items = self.__recommendations_log.get_unrecommended_items(group)
+            predictions = self.__predictor.get_predictions(group, all_items)
+            
+            top_indices = select_top_k_indices(np.asarray(predictions, dtype=np.float64), limit)
+            top_recommendations = [(all_items[index], predictions[index]) for index in top_indices.tolist()]
         
         self.__recommendations_log.add_recommendation(group, set(item for item, _ in top_recommendations))
         
@@ -30,4 +59,33 @@ class SequentialGroupRecommenderImpl(SequentialGroupRecommender):
             list(recommendation) 
             for recommendation in self.__recommendations_log.get_previous_recommendations(group)
         ]
-    
\ No newline at end of file
+    
+    def __rerank(self, group: Group, limit: int) -> Optional[List[Tuple[ItemId, float]]]:
+        assert isinstance(self.__predictor, MultiIterSequentialHybridAggregation)
+        alpha = self.__predictor.get_alpha(group)
+        if not 0 <= alpha <= 1:
+            # The blend may then decrease when a prediction increases: every item is scored again.
+            return None
+        
+        all_items = self.__dataset.get_all_items()
+        # Items unknown to the dataset (eg. from a session saved before the ratings changed) were never candidates.
+        excluded_positions = np.asarray(self.__recommendations_log.get_recommended_positions(group), dtype=np.int64)
+        top_positions, top_predictions = self.__get_blend_ranking(group, all_items).get_top_k(alpha, excluded_positions, limit)
+        return [(all_items[position], prediction) for position, prediction in zip(top_positions.tolist(), top_predictions.tolist())]
+    
+    def __get_blend_ranking(self, group: Group, all_items: List[ItemId]) -> BlendRanking:
+        fingerprint = self.__dataset.fingerprint
+        if fingerprint != self.__fingerprint:
+            self.__blend_rankings.clear()
+            self.__fingerprint = fingerprint
+        
+        group_key = tuple(group)
+        blend_ranking = self.__blend_rankings.get(group_key)
+        if blend_ranking is None:
+            assert isinstance(self.__predictor, MultiIterSequentialHybridAggregation)
+            blend_ranking = BlendRanking(
+                np.asarray(self.__predictor.predictor_average.get_predictions(group, all_items), dtype=np.float64),
+                np.asarray(self.__predictor.predictor_least_misery.get_predictions(group, all_items), dtype=np.float64),
+            )
+            self.__blend_rankings[group_key] = blend_ranking
+        return blend_ranking
\ No newline at end of file
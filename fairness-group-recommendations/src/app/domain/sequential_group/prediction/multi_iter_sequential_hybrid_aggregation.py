@@ -1,11 +1,22 @@
-from typing import Callable, Dict, List, Tuple
-from app.domain.dataset import ItemId
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.dataset import ItemId, UserId
 from app.domain.group_prediction.group_prediction import Group, GroupPrediction
 from app.domain.sequential_group.prediction.sequential_group_prediction import SequentialGroupPrediction
 from app.domain.user_satisfaction import UserSatisfaction
 
 
 class MultiIterSequentialHybridAggregation(SequentialGroupPrediction):
+    """
+    Weighted sum of the average and the least misery predictions, where the weight of the least misery (alpha)
+    is the disagreement between the members' satisfactions in the last iterations.
+    
+    Alpha depends on the group and on the previous recommendations only, so it is computed once per iteration
+    (ie. round) of a group, instead of once per item.
+    """
+    
     def __init__(
             self, 
             get_previous_recommendations: Callable[[Group], List[List[ItemId]]],
@@ -18,31 +29,52 @@ class MultiIterSequentialHybridAggregation(SequentialGroupPrediction):
         self.__predictor_least_misery = predictor_least_misery
         self.__user_satisfaction = user_satisfaction
         self.__iterations_to_consider = iterations_to_consider
-        
+        # Alpha of the current round: (group, number of previous recommendations) -> alpha
+        self.__round: Optional[Tuple[Tuple[Tuple[UserId, ...], int], float]] = None
+    
     def get_prediction(self, group: Group, item: ItemId) -> float:
         average_prediction = self.__predictor_average.get_prediction(group, item)
         least_misery_prediction = self.__predictor_least_misery.get_prediction(group, item)
         
+        disagreement = self.get_alpha(group)
+        prediction = (1 - disagreement) * average_prediction + disagreement * least_misery_prediction
+    
+        return prediction
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        average_predictions = np.asarray(self.__predictor_average.get_predictions(group, items), dtype=np.float64)
+        least_misery_predictions = np.asarray(self.__predictor_least_misery.get_predictions(group, items), dtype=np.float64)
+        
+        disagreement = self.get_alpha(group)
+        return ((1 - disagreement) * average_predictions + disagreement * least_misery_predictions).tolist()
+    
+    @property
+    def predictor_average(self) -> GroupPrediction:
+        return self.__predictor_average
+    
+    @property
+    def predictor_least_misery(self) -> GroupPrediction:
+        return self.__predictor_least_misery
+    
+    def get_alpha(self, group: Group) -> float:
+        """Returns the weight of the least misery prediction for the next recommendations to the group."""
+        
         group_recommendations = self.__get_previous_recommendations(group)
+        round_key = (tuple(group), len(group_recommendations))
+        if self.__round is not None and self.__round[0] == round_key:
+            return self.__round[1]
         
-        if len(group_recommendations) < self.__iterations_to_consider: # Initial iterations
-            disagreement = 0
-        else:
-            user_satisfactions: List[List[float]] = [] # for each iteration, users satisfactions
-            for group_recommendation in group_recommendations[-self.__iterations_to_consider:]:
-                iteration_user_satisfations = [
-                    self.__user_satisfaction.get_satisfaction(user, group_recommendation)
-                    for user in group
-                ]
-                user_satisfactions.append(iteration_user_satisfations)
-            
-            # Disagreement will be the maximum disagreement among the last considered iterations
-            disagreements = [
-                max(satisfactions) - min(satisfactions)
-                for satisfactions in user_satisfactions
-            ]
-            disagreement = max(disagreements)
-            
-        prediction = (1 - disagreement) * average_prediction + disagreement * least_misery_prediction
+        disagreement = self.__compute_disagreement(group, group_recommendations)
+        self.__round = (round_key, disagreement)
+        return disagreement
     
-        return prediction
\ No newline at end of file
+    def __compute_disagreement(self, group: Group, group_recommendations: List[List[ItemId]]) -> float:
+        if len(group_recommendations) < self.__iterations_to_consider: # Initial iterations
+            return 0
+        
+        # for each iteration (row), users satisfactions
+        user_satisfactions = self.__user_satisfaction.get_satisfactions(group, group_recommendations[-self.__iterations_to_consider:])
+        
+        # Disagreement will be the maximum disagreement among the last considered iterations
+        disagreements = user_satisfactions.max(axis=1) - user_satisfactions.min(axis=1)
+        return disagreements.max().item()
\ No newline at end of file
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Sequence
 
 from app.domain.dataset import ItemId
 from app.domain.group_prediction.group_prediction import Group
@@ -7,4 +8,8 @@ from app.domain.group_prediction.group_prediction import Group
 class SequentialGroupPrediction(ABC):
     @abstractmethod
     def get_prediction(self, group: Group, item: ItemId) -> float:
-        pass
\ No newline at end of file
+        pass
+    
+    def get_predictions(self, group: Group, items: Sequence[ItemId]) -> List[float]:
+        """Returns the predicted ratings of the group for each of the items, in the same order."""
+        return [self.get_prediction(group, item) for item in items]
\ No newline at end of file
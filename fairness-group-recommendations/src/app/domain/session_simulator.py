@@ -0,0 +1,141 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from app.domain.dataset import Dataset, ItemId
+from app.domain.group_prediction.group_prediction import Group
+from app.domain.group_recommender import GroupRecommender
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.sequential_group.sequential_group_recommender import SequentialGroupRecommender
+from app.domain.session_store import SessionStore
+from app.domain.user_satisfaction import UserSatisfaction
+
+SESSION_RECOMMENDATIONS_LIMIT = 10
+
+SessionRecommender = Union[GroupRecommender, SequentialGroupRecommender]
+# Creates the recommender of a session, which keeps its recommendations in the given log.
+RecommenderFactory = Callable[[RecommendationsLog], SessionRecommender]
+
+# State of the worker processes which simulate the sessions.
+_worker_simulator: Optional["SessionSimulator"] = None
+
+
+@dataclass
+class SimulatedRound:
+    session: str
+    group: Group
+    round: int
+    recommendation: List[ItemId]
+    # Satisfaction of each member with the recommendation, in the order of the group.
+    satisfactions: List[float]
+
+
+class SessionSimulator:
+    """
+    Simulates multi-iteration sessions for many groups, as commands 11 to 13 of the CLI do for a single group:
+    at each round, the group is recommended items never recommended to it before, and the satisfaction
+    of every member with them is measured.
+    
+    Sessions are independent, so they are spread over worker processes when more than one worker is used.
+    The workers are always forked, whatever the default start method: they inherit the dataset and the similarity
+    arrays, which are shared read-only when memory-mapped, instead of each receiving a pickled copy. Where fork is
+    not available (eg. Windows), the sessions are simulated in the current process.
+    Each session is saved in the session store as it goes, which makes the store a checkpoint: a session
+    found in the store is resumed after its last saved round, and its saved rounds are reported without
+    being recomputed (with their items in ascending order, since the log does not keep their ranking).
+    """
+    
+    def __init__(
+            self,
+            dataset: Dataset,
+            recommender_factories: Dict[str, RecommenderFactory],
+            user_satisfaction: UserSatisfaction,
+            store: SessionStore,
+            rounds: int,
+            limit: int = SESSION_RECOMMENDATIONS_LIMIT,
+            workers: int = 1) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the items.
+        - recommender_factories: The factory of the recommender of each session, by session name.
+          They are sent to the worker processes, so they must be picklable (eg. partial module-level functions).
+        - user_satisfaction: The satisfaction of the members with the recommendations.
+        - store: The store where the sessions are saved and resumed from.
+        - rounds: The number of rounds of every session.
+        - limit: The number of items recommended at each round.
+        - workers: The number of processes to use. Only used where processes can be forked.
+        """
+        
+        self.__dataset = dataset
+        self.__recommender_factories = recommender_factories
+        self.__user_satisfaction = user_satisfaction
+        self.__store = store
+        self.__rounds = rounds
+        self.__limit = limit
+        self.__workers = workers
+    
+    def simulate(self, groups: Sequence[Group]) -> Iterator[SimulatedRound]:
+        """Yields the rounds of every session of every group, by group then session, as soon as the sessions are over."""
+        
+        sessions = [(session, group) for group in groups for session in self.__recommender_factories]
+        if self.__workers > 1 and len(sessions) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # The workers open their own connections to the store: the current one must not be shared with them.
+            self.__store.close()
+            with ProcessPoolExecutor(
+                max_workers=self.__workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_initialize_worker,
+                initargs=(self,),
+            ) as executor:
+                for rounds in executor.map(_simulate_session_in_worker, *zip(*sessions)):
+                    yield from rounds
+        else:
+            for session, group in sessions:
+                yield from self.simulate_session(session, group)
+    
+    def simulate_session(self, session: str, group: Group) -> List[SimulatedRound]:
+        """Runs the given session of the group, resuming it from the store, and returns all its rounds."""
+        
+        recommendations_log = RecommendationsLog(self.__dataset, self.__store, session)
+        recommender = self.__recommender_factories[session](recommendations_log)
+        
+        rounds = self.__get_saved_rounds(session, group, recommendations_log)
+        for round in range(len(rounds), self.__rounds):
+            recommendation = [item for item, _ in recommender.get_recommendations(group, self.__limit)]
+            satisfactions = self.__user_satisfaction.get_satisfactions(group, [recommendation])[0].tolist()
+            recommendations_log.add_satisfactions(group, dict(zip(group, satisfactions)))
+            rounds.append(SimulatedRound(session, list(group), round, recommendation, satisfactions))
+        
+        self.__store.flush()
+        return rounds
+    
+    def __get_saved_rounds(self, session: str, group: Group, recommendations_log: RecommendationsLog) -> List[SimulatedRound]:
+        previous_recommendations = recommendations_log.get_previous_recommendations(group)[:self.__rounds]
+        if len(previous_recommendations) == 0:
+            return []
+        
+        group_key = recommendations_log.get_group_key(group)
+        saved_satisfactions = self.__store.get_satisfactions(session, group_key)
+        rounds = []
+        for round, previous_recommendation in enumerate(previous_recommendations):
+            recommendation = sorted(previous_recommendation)
+            round_satisfactions = saved_satisfactions.get(round, {})
+            if all(user in round_satisfactions for user in group):
+                satisfactions = [round_satisfactions[user] for user in group]
+            else:
+                # The session was interrupted between the recommendation and the satisfactions of this round.
+                satisfactions = self.__user_satisfaction.get_satisfactions(group, [recommendation])[0].tolist()
+                self.__store.add_satisfactions(session, group_key, round, dict(zip(group, satisfactions)))
+            rounds.append(SimulatedRound(session, list(group), round, recommendation, satisfactions))
+        return rounds
+
+
+def _initialize_worker(simulator: SessionSimulator) -> None:
+    global _worker_simulator
+    _worker_simulator = simulator
+
+
+def _simulate_session_in_worker(session: str, group: Group) -> List[SimulatedRound]:
+    assert _worker_simulator is not None
+    return _worker_simulator.simulate_session(session, group)
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence
+
+from app.domain.dataset import ItemId, UserId
+from app.domain.group_prediction.group_prediction import GroupKey
+
+
+class SessionStore(ABC):
+    """
+    History of the recommendation sessions: the items recommended to a group at each round,
+    and the satisfaction of its members with them.
+    
+    A session is identified by its name (eg. the recommendation method) and the group.
+    Writes may be buffered until `flush` is called, but are always visible to the reads of the same store.
+    """
+    
+    @abstractmethod
+    def get_recommendations(self, session: str, group: GroupKey) -> List[List[ItemId]]:
+        """Returns the recommendations made at every round of the session, in order."""
+        pass
+    
+    @abstractmethod
+    def add_recommendation(self, session: str, group: GroupKey, round: int, recommendation: Sequence[ItemId]) -> None:
+        pass
+    
+    @abstractmethod
+    def get_satisfactions(self, session: str, group: GroupKey) -> Dict[int, Dict[UserId, float]]:
+        """Returns the satisfaction of each member, by round, for the rounds where it was recorded."""
+        pass
+    
+    @abstractmethod
+    def add_satisfactions(self, session: str, group: GroupKey, round: int, satisfactions: Dict[UserId, float]) -> None:
+        pass
+    
+    def flush(self) -> None:
+        """Writes the buffered changes."""
+        pass
+    
+    def close(self) -> None:
+        self.flush()
\ No newline at end of file
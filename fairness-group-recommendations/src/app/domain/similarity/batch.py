@@ -0,0 +1,74 @@
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, UserId
+from app.domain.similarity.similarity import Similarity
+
+ROW_CACHE_SIZE = 32
+BLOCK_SIZE = 256
+
+
+class BatchSimilarity(Similarity):
+    """
+    Symmetric similarity which computes whole rows of the user similarity matrix at once.
+    
+    Rows are arrays with one column for each user in the dataset,
+    ordered as `Dataset.get_all_users()` (ie. by user index).
+    """
+    
+    def __init__(self, dataset: Dataset) -> None:
+        self.__dataset = dataset
+        self.__rows: OrderedDict[int, np.ndarray] = OrderedDict()
+    
+    @abstractmethod
+    def get_similarity_block(self, users: Sequence[UserId], others: Optional[Sequence[UserId]] = None) -> np.ndarray:
+        """
+        Returns the similarities between the given users and the other users, as a len(users) x len(others) array.
+        
+        When `others` is not given, the columns are all the users in the dataset.
+        """
+        pass
+    
+    def get_similarity_row(self, user: UserId) -> np.ndarray:
+        return self.get_similarity_block([user])[0]
+    
+    def get_similarity_matrix(self) -> np.ndarray:
+        """Returns the full num_users x num_users similarity matrix, computed in blocks of rows."""
+        
+        all_users = self.__dataset.get_all_users()
+        return np.vstack([
+            self.get_similarity_block(all_users[start:start + BLOCK_SIZE])
+            for start in range(0, len(all_users), BLOCK_SIZE)
+        ]) if all_users else np.zeros((0, 0))
+    
+    def get_similarity(self, user_a: UserId, user_b: UserId) -> float:
+        # Pairs are served from the most recently computed rows: callers usually
+        # ask for the similarities between one user and many others in a row.
+        index_a = self.__dataset.get_user_index(user_a)
+        index_b = self.__dataset.get_user_index(user_b)
+        
+        row = self.__rows.get(index_b)
+        if row is not None and index_a not in self.__rows:
+            self.__rows.move_to_end(index_b)
+            return float(row[index_a])
+        
+        return float(self.__get_cached_row(user_a, index_a)[index_b])
+    
+    def get_similarities(self, user: UserId, others: Sequence[UserId]) -> np.ndarray:
+        row = self.__get_cached_row(user, self.__dataset.get_user_index(user))
+        return row[self.__dataset.get_user_indices(others)]
+    
+    def __get_cached_row(self, user: UserId, index: int) -> np.ndarray:
+        row = self.__rows.get(index)
+        if row is not None:
+            self.__rows.move_to_end(index)
+            return row
+        
+        row = self.get_similarity_row(user)
+        self.__rows[index] = row
+        if len(self.__rows) > ROW_CACHE_SIZE:
+            self.__rows.popitem(last=False)
+        return row
@@ -1,28 +1,143 @@
-from typing import Dict, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
 from app.domain.dataset import ItemId, UserId
 from app.domain.similarity.similarity import Similarity
 
+EVICTION_LRU = "lru"
+EVICTION_USER_ROW = "row"
+EVICTION_POLICIES = [EVICTION_LRU, EVICTION_USER_ROW]
+
+MAX_PACKED_USER_ID = 2 ** 32
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: Optional[int]
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
 
 class CachedSimilarity(Similarity):
-    def __init__(self, similarity: Similarity) -> None:
+    """
+    Caches the similarities computed by another (symmetric) similarity.
+    
+    Every pair is stored once, under its canonical (min, max) key. The cache can be bounded,
+    in which case entries are evicted either one at a time, least recently used first (`EVICTION_LRU`),
+    or as whole rows of the least recently used user (`EVICTION_USER_ROW`), which suits callers
+    that compare one user with many others in a row.
+    """
+    
+    def __init__(self, similarity: Similarity, max_size: Optional[int] = None, eviction: str = EVICTION_LRU) -> None:
+        """
+        Parameters:
+        - similarity: The similarity whose values are cached.
+        - max_size: The maximum number of cached pairs. The cache is unbounded when None.
+        - eviction: The eviction policy, one of `EVICTION_POLICIES`.
+        """
+        
         super().__init__()
-        self.__similarities: Dict[Tuple[UserId, UserId], float] = {}
-        self.__similarity = similarity
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}'. Allowed values are {EVICTION_POLICIES}.")
+        if max_size is not None and max_size < 1:
+            raise ValueError("The maximum size of the cache must be positive.")
         
+        self.__similarity = similarity
+        self.__max_size = max_size
+        self.__eviction = eviction
+        # LRU policy: one entry per pair. Row policy: one row per user, holding the pairs where it is the lower id.
+        self.__similarities: OrderedDict[Hashable, float] = OrderedDict()
+        self.__rows: OrderedDict[UserId, Dict[UserId, float]] = OrderedDict()
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+    
     def get_similarity(self, user_a: ItemId, user_b: ItemId) -> float:
-        similarity = self.__similarities.get((user_a, user_b))
-        if similarity is not None:
-            return similarity
-        
-        similarity = self.__similarities.get((user_b, user_a))
+        low, high = (user_a, user_b) if user_a <= user_b else (user_b, user_a)
+        if self.__eviction == EVICTION_USER_ROW:
+            return self.__get_from_rows(low, high)
+        return self.__get_from_entries(low, high)
+    
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.__hits,
+            misses=self.__misses,
+            evictions=self.__evictions,
+            size=self.__size,
+            max_size=self.__max_size,
+        )
+    
+    def reset_stats(self) -> None:
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+    
+    @property
+    def name(self) -> str:
+        return self.__similarity.name
+    
+    def __get_from_entries(self, low: UserId, high: UserId) -> float:
+        # Non-negative ids are packed in a single int, which is cheaper to hash than a tuple.
+        key: Hashable = low * MAX_PACKED_USER_ID + high if 0 <= low and high < MAX_PACKED_USER_ID else (low, high)
+        similarity = self.__similarities.get(key)
         if similarity is not None:
+            self.__hits += 1
+            if self.__max_size is not None:
+                self.__similarities.move_to_end(key)
             return similarity
         
-        similarity = self.__similarity.get_similarity(user_a, user_b)
-        self.__similarities.update({(user_a, user_b): similarity})
+        self.__misses += 1
+        similarity = self.__similarity.get_similarity(low, high)
+        self.__similarities[key] = similarity
+        self.__size += 1
+        if self.__max_size is not None and self.__size > self.__max_size:
+            self.__similarities.popitem(last=False)
+            self.__size -= 1
+            self.__evictions += 1
+        return similarity
+    
+    def __get_from_rows(self, low: UserId, high: UserId) -> float:
+        row = self.__rows.get(low)
+        if row is not None:
+            similarity = row.get(high)
+            if self.__max_size is not None:
+                self.__rows.move_to_end(low)
+            if similarity is not None:
+                self.__hits += 1
+                return similarity
+        else:
+            row = {}
+            self.__rows[low] = row
         
+        self.__misses += 1
+        similarity = self.__similarity.get_similarity(low, high)
+        row[high] = similarity
+        self.__size += 1
+        if self.__max_size is not None:
+            self.__evict_rows(keep=low)
         return similarity
     
-    @property
-    def name(self) -> str:
-        return self.__similarity.name
\ No newline at end of file
+    def __evict_rows(self, keep: UserId) -> None:
+        assert self.__max_size is not None
+        # The row being filled is the most recently used one, so it is evicted last.
+        while self.__size > self.__max_size and len(self.__rows) > 1:
+            _, row = self.__rows.popitem(last=False)
+            self.__size -= len(row)
+            self.__evictions += len(row)
+        
+        if self.__size > self.__max_size:
+            # A single row larger than the cache: drop its oldest entries.
+            row = self.__rows[keep]
+            while self.__size > self.__max_size:
+                del row[next(iter(row))]
+                self.__size -= 1
+                self.__evictions += 1
@@ -1,4 +1,9 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
 from app.domain.dataset import Dataset, UserId
+from app.domain.similarity.batch import BatchSimilarity
 from app.domain.similarity.similarity import Similarity
 
 
@@ -13,4 +18,36 @@ class Jaccard(Similarity):
             return 0
         
         common_items = self.__dataset.get_items_rated_by_both(user_a, user_b)
-        return len(common_items) / len(union_items)
\ No newline at end of file
+        return len(common_items) / len(union_items)
+
+
+class VectorizedJaccard(BatchSimilarity):
+    """
+    Jaccard similarity computed for whole blocks of users.
+    
+    The sizes of the intersections are the co-occurrence counts given by a binary sparse matrix product,
+    whereas the sizes of the unions are derived from the number of ratings of each user.
+    """
+    
+    def __init__(self, dataset: Dataset) -> None:
+        super().__init__(dataset)
+        self.__dataset = dataset
+    
+    def get_similarity_block(self, users: Sequence[UserId], others: Optional[Sequence[UserId]] = None) -> np.ndarray:
+        rated = self.__dataset.get_rated_matrix()
+        ratings_per_user = np.diff(rated.indptr)
+        rows = self.__dataset.get_user_indices(users)
+        if others is None:
+            rated_others, ratings_per_other = rated, ratings_per_user
+        else:
+            columns = self.__dataset.get_user_indices(others)
+            rated_others, ratings_per_other = rated[columns], ratings_per_user[columns]
+        
+        intersection_sizes = (rated[rows] @ rated_others.T).toarray()
+        union_sizes = ratings_per_user[rows, np.newaxis] + ratings_per_other[np.newaxis, :] - intersection_sizes
+        
+        return np.divide(intersection_sizes, union_sizes, out=np.zeros_like(intersection_sizes), where=union_sizes != 0)
+    
+    @property
+    def name(self) -> str:
+        return Jaccard.__name__
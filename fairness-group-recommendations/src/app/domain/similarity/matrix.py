@@ -0,0 +1,106 @@
+from typing import Dict, Iterator, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.dataset import UserId
+
+
+def get_packed_offset(row: int, num_users: int) -> int:
+    """Returns the position of the first element of the given row, in a packed upper triangle."""
+    return row * num_users - row * (row - 1) // 2
+
+
+class SimilarityMatrix:
+    """
+    Symmetric user similarity matrix.
+    
+    The values are stored either as a dense num_users x num_users array,
+    or as the packed upper triangle (diagonal included), row by row,
+    which takes about half of the memory.
+    """
+    
+    def __init__(self, users: Sequence[UserId], values: np.ndarray, packed: bool) -> None:
+        """
+        Parameters:
+        - users: The users of the matrix, in the order of its rows and columns.
+        - values: The dense matrix, or the packed upper triangle when `packed` is True.
+        - packed: Whether the values are stored as a packed upper triangle.
+        """
+        
+        num_users = len(users)
+        expected_size = num_users * (num_users + 1) // 2 if packed else num_users * num_users
+        if values.size != expected_size:
+            raise ValueError(f"Expected {expected_size} values for {num_users} users, got {values.size}.")
+        
+        self.__users = list(users)
+        self.__values = values
+        self.__packed = packed
+        # Flat plain-array view of the values: it avoids the indexing overhead of np.memmap on single lookups.
+        self.__flat_values = np.asarray(values).reshape(-1)
+        self.__indices: Dict[UserId, int] = {user: index for index, user in enumerate(self.__users)}
+    
+    @property
+    def users(self) -> Sequence[UserId]:
+        return self.__users
+    
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+    
+    @property
+    def packed(self) -> bool:
+        return self.__packed
+    
+    def get_similarity(self, user_a: UserId, user_b: UserId) -> float:
+        index_a = self.__indices[user_a]
+        index_b = self.__indices[user_b]
+        if not self.__packed:
+            return self.__flat_values.item(index_a * len(self.__users) + index_b)
+        
+        row, column = min(index_a, index_b), max(index_a, index_b)
+        return self.__flat_values.item(get_packed_offset(row, len(self.__users)) + column - row)
+    
+    def get_similarities(self, user: UserId, others: Sequence[UserId]) -> np.ndarray:
+        """Returns the similarities between the given user and each of the other users, in the same order."""
+        
+        index = self.__indices[user]
+        other_indices = np.array([self.__indices[other] for other in others], dtype=np.int64)
+        num_users = len(self.__users)
+        if not self.__packed:
+            return self.__flat_values[index * num_users + other_indices]
+        
+        rows = np.minimum(index, other_indices)
+        columns = np.maximum(index, other_indices)
+        offsets = rows * num_users - rows * (rows - 1) // 2 # get_packed_offset on every row
+        return self.__flat_values[offsets + columns - rows]
+    
+    def to_dense(self) -> np.ndarray:
+        if not self.__packed:
+            return self.__values
+        
+        num_users = len(self.__users)
+        dense = np.empty((num_users, num_users), dtype=self.__values.dtype)
+        rows, columns = np.triu_indices(num_users)
+        dense[rows, columns] = self.__values
+        dense[columns, rows] = self.__values
+        return dense
+    
+    def as_dict(self) -> Mapping[Tuple[UserId, UserId], float]:
+        """Returns a read-only view of the matrix keyed by (user_a, user_b), whose values are looked up on demand."""
+        return SimilarityMatrixView(self)
+
+
+class SimilarityMatrixView(Mapping[Tuple[UserId, UserId], float]):
+    def __init__(self, matrix: SimilarityMatrix) -> None:
+        self.__matrix = matrix
+    
+    def __getitem__(self, key: Tuple[UserId, UserId]) -> float:
+        user_a, user_b = key
+        return self.__matrix.get_similarity(user_a, user_b)
+    
+    def __iter__(self) -> Iterator[Tuple[UserId, UserId]]:
+        users = self.__matrix.users
+        return ((user_a, user_b) for user_a in users for user_b in users)
+    
+    def __len__(self) -> int:
+        return len(self.__matrix.users) ** 2
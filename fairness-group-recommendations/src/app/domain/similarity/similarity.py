@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
 
 from app.domain.dataset import UserId
 
@@ -8,6 +11,10 @@ class Similarity(ABC):
     def get_similarity(self, user_a: UserId, user_b: UserId) -> float:
         pass
     
+    def get_similarities(self, user: UserId, others: Sequence[UserId]) -> np.ndarray:
+        """Returns the similarities between the given user and each of the other users, in the same order."""
+        return np.array([self.get_similarity(user, other) for other in others], dtype=np.float64)
+    
     @property
     def name(self) -> str:
         return self.__class__.__name__
\ No newline at end of file
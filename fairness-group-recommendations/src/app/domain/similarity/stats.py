@@ -1,28 +1,117 @@
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
 from app.domain.dataset import Dataset, UserId
+from app.domain.similarity.batch import BatchSimilarity
+from app.domain.similarity.matrix import SimilarityMatrix, get_packed_offset
 from app.domain.similarity.similarity import Similarity
+from app.domain.similarity_store import SimilarityStore
+from app.domain.top_k import select_top_k_indices
+
+MATRIX_BLOCK_SIZE = 64
+
+# State of the worker processes which compute the similarity matrix.
+_worker_similarity: Optional[Similarity] = None
+_worker_users: Sequence[UserId] = []
 
 
 class Stats:
-    def __init__(self, dataset: Dataset, similarity: Similarity) -> None:
+    def __init__(self, dataset: Dataset, similarity: Similarity, workers: int = 1, store: Optional[SimilarityStore] = None) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the users.
+        - similarity: The similarity function between users.
+        - workers: The number of processes used to compute the similarity matrix.
+        - store: Where the similarity matrix is saved once computed, and loaded from when already available.
+        """
+        
         self.__dataset = dataset
         self.__similarity = similarity
+        self.__workers = workers
+        self.__store = store
     
     def get_most_similar_users(self, user: UserId, limit: int) -> List[Tuple[UserId, float]]:
         all_other_users = [user_id for user_id in self.__dataset.get_all_users() if user_id != user]
+        similarities = self.__similarity.get_similarities(user, all_other_users)
         
-        user_similarities: List[Tuple[UserId, float]] = [
-            (neighbor, self.__similarity.get_similarity(user, neighbor))
-            for neighbor in all_other_users
-        ]
-        user_similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return user_similarities[:limit]
+        top_indices = select_top_k_indices(similarities, limit)
+        return [(all_other_users[index], similarities.item(index)) for index in top_indices.tolist()]
     
-    def get_user_similarity_matrix(self) -> Dict[Tuple[UserId, UserId], float]:
+    def get_similarity_matrix(self, packed: bool = False, workers: Optional[int] = None) -> SimilarityMatrix:
+        """
+        Computes the user similarity matrix.
+        
+        Since the similarity is symmetric, only the upper triangle is computed.
+        The rows are split into blocks, which are computed in parallel when more than one worker is used.
+        When a store is given, the matrix is loaded from it if available, and saved to it otherwise.
+        
+        Parameters:
+        - packed: Whether to return the packed upper triangle instead of the dense matrix.
+        - workers: The number of processes to use. Defaults to the value given to the constructor.
+        """
+        
+        if self.__store is not None:
+            stored_matrix = self.__store.load(self.__similarity.name, self.__dataset.fingerprint)
+            if stored_matrix is not None:
+                if packed or not stored_matrix.packed:
+                    return stored_matrix
+                return SimilarityMatrix(stored_matrix.users, stored_matrix.to_dense(), packed=False)
+        
         all_users = self.__dataset.get_all_users()
-        user_similarities = {}
-        for user_a in all_users:
-            for user_b in all_users:
-                user_similarities[(user_a, user_b)] = self.__similarity.get_similarity(user_a, user_b)
-        return user_similarities
\ No newline at end of file
+        num_users = len(all_users)
+        workers = self.__workers if workers is None else workers
+        
+        blocks = [(start, min(start + MATRIX_BLOCK_SIZE, num_users)) for start in range(0, num_users, MATRIX_BLOCK_SIZE)]
+        if workers > 1 and len(blocks) > 1:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_initialize_worker, initargs=(self.__similarity, all_users)
+            ) as executor:
+                segments = list(executor.map(_compute_rows_in_worker, *zip(*blocks)))
+        else:
+            segments = [_compute_rows(self.__similarity, all_users, start, stop) for start, stop in blocks]
+        
+        values = np.concatenate(segments) if segments else np.zeros(0)
+        matrix = SimilarityMatrix(all_users, values, packed=True)
+        if self.__store is not None:
+            self.__store.save(self.__similarity.name, self.__dataset.fingerprint, matrix)
+            # Use the saved copy, which the store may share between processes.
+            matrix = self.__store.load(self.__similarity.name, self.__dataset.fingerprint) or matrix
+        if packed:
+            return matrix
+        return SimilarityMatrix(all_users, matrix.to_dense(), packed=False)
+    
+    def get_user_similarity_matrix(self) -> Mapping[Tuple[UserId, UserId], float]:
+        return self.get_similarity_matrix(packed=True).as_dict()
+
+
+def _compute_rows(similarity: Similarity, users: Sequence[UserId], start: int, stop: int) -> np.ndarray:
+    """Returns the packed upper triangle of the rows from `start` (inclusive) to `stop` (exclusive)."""
+    
+    num_users = len(users)
+    segment = np.empty(get_packed_offset(stop, num_users) - get_packed_offset(start, num_users))
+    if isinstance(similarity, BatchSimilarity):
+        block = similarity.get_similarity_block(users[start:stop], users[start:])
+        for row in range(start, stop):
+            offset = get_packed_offset(row, num_users) - get_packed_offset(start, num_users)
+            segment[offset:offset + num_users - row] = block[row - start, row - start:]
+        return segment
+    
+    position = 0
+    for row in range(start, stop):
+        for column in range(row, num_users):
+            segment[position] = similarity.get_similarity(users[row], users[column])
+            position += 1
+    return segment
+
+
+def _initialize_worker(similarity: Similarity, users: Sequence[UserId]) -> None:
+    global _worker_similarity, _worker_users
+    _worker_similarity = similarity
+    _worker_users = users
+
+
+def _compute_rows_in_worker(start: int, stop: int) -> np.ndarray:
+    assert _worker_similarity is not None
+    return _compute_rows(_worker_similarity, _worker_users, start, stop)
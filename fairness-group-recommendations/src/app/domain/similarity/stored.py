@@ -0,0 +1,54 @@
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.domain.dataset import Dataset, UserId
+from app.domain.similarity.matrix import SimilarityMatrix
+from app.domain.similarity.similarity import Similarity
+from app.domain.similarity.stats import Stats
+from app.domain.similarity_store import SimilarityStore
+
+
+class StoredSimilarity(Similarity):
+    """
+    Similarity backed by the precomputed matrix of a similarity store.
+    
+    The matrix is looked up by similarity name and dataset fingerprint on first use.
+    When the store does not have it yet, it is computed with the given similarity and saved,
+    so later runs and other processes read the same matrix.
+    """
+    
+    def __init__(self, dataset: Dataset, similarity: Similarity, store: SimilarityStore, workers: int = 1) -> None:
+        """
+        Parameters:
+        - dataset: The dataset containing the users.
+        - similarity: The similarity used to compute the matrix when the store does not have it.
+        - store: The store the matrix is loaded from and saved to.
+        - workers: The number of processes used to compute the matrix.
+        """
+        
+        self.__stats = Stats(dataset, similarity, workers=workers, store=store)
+        self.__similarity = similarity
+        self.__matrix: Optional[SimilarityMatrix] = None
+    
+    def get_similarity(self, user_a: UserId, user_b: UserId) -> float:
+        return self.get_similarity_matrix().get_similarity(user_a, user_b)
+    
+    def get_similarities(self, user: UserId, others: Sequence[UserId]) -> np.ndarray:
+        return self.get_similarity_matrix().get_similarities(user, others)
+    
+    def get_similarity_matrix(self) -> SimilarityMatrix:
+        if self.__matrix is None:
+            self.__matrix = self.__stats.get_similarity_matrix(packed=True)
+        return self.__matrix
+    
+    @property
+    def name(self) -> str:
+        return self.__similarity.name
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # The matrix is not sent to other processes: they open the store themselves,
+        # so that they share its memory-mapped file instead of receiving a copy.
+        state = self.__dict__.copy()
+        state["_StoredSimilarity__matrix"] = None
+        return state
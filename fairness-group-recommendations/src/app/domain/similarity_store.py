@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.domain.similarity.matrix import SimilarityMatrix
+
+
+class SimilarityStore(ABC):
+    @abstractmethod
+    def load(self, name: str, fingerprint: str) -> Optional[SimilarityMatrix]:
+        """Returns the matrix saved for the given similarity and dataset fingerprint, or None when there is none."""
+        pass
+    
+    @abstractmethod
+    def save(self, name: str, fingerprint: str, matrix: SimilarityMatrix) -> None:
+        pass
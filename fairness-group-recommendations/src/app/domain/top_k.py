@@ -0,0 +1,75 @@
+import heapq
+from operator import itemgetter
+from typing import Callable, Iterable, List, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+def select_top_k(candidates: Iterable[Tuple[T, float]], limit: int) -> List[Tuple[T, float]]:
+    """
+    Returns the `limit` (candidate, score) pairs with the highest scores, by decreasing score.
+    
+    Candidates with the same score keep their order, so the result is the same
+    as a stable sort by decreasing score followed by `[:limit]`.
+    """
+    
+    return heapq.nlargest(limit, candidates, key=itemgetter(1))
+
+
+def select_top_k_indices(scores: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Returns the indices of the `limit` highest scores, by decreasing score.
+    
+    Equal scores are ordered by index, so the result is the same as a stable sort by decreasing score.
+    """
+    
+    num_scores = len(scores)
+    if limit <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if limit >= num_scores:
+        return np.argsort(-scores, kind="stable")
+    
+    # Partial selection of the limit-th highest score, then keep everything above it
+    # and as many of the (lowest-index) scores equal to it as needed.
+    threshold = np.partition(scores, num_scores - limit)[num_scores - limit]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:limit - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.lexsort((selected, -scores[selected]))]
+
+
+def select_top_k_bounded(candidates: Iterable[Tuple[T, float]], score: Callable[[T], float], limit: int) -> List[Tuple[T, float]]:
+    """
+    Returns the `limit` candidates with the highest scores, by decreasing score,
+    scoring as few candidates as possible.
+    
+    Parameters:
+    - candidates: (candidate, upper bound of its score) pairs.
+    - score: The scoring function. The score of a candidate must not exceed its upper bound.
+    - limit: The number of candidates to return.
+    
+    Candidates are scored by decreasing upper bound, and the search stops as soon as no remaining
+    candidate can reach the lowest selected score. Equal scores are ordered as the given candidates,
+    as in `select_top_k`.
+    """
+    
+    if limit <= 0:
+        return []
+    
+    # Min-heap of the selected candidates: the root is the worst one (lowest score, then latest position).
+    selected: List[Tuple[float, int, T]] = []
+    ranked_candidates = sorted(enumerate(candidates), key=lambda x: x[1][1], reverse=True)
+    for position, (candidate, upper_bound) in ranked_candidates:
+        if len(selected) == limit and upper_bound < selected[0][0]:
+            break
+        
+        entry = (score(candidate), -position, candidate)
+        if len(selected) < limit:
+            heapq.heappush(selected, entry)
+        elif entry[:2] > selected[0][:2]:
+            heapq.heapreplace(selected, entry)
+    
+    selected.sort(key=lambda x: x[:2], reverse=True)
+    return [(candidate, candidate_score) for candidate_score, _, candidate in selected]
@@ -1,37 +1,88 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
 from app.domain.dataset import Dataset, ItemId, UserId
+from app.domain.group_prediction.group_prediction import Group
 from app.domain.prediction.prediction import Prediction
 from app.domain.recommender import Recommender
+from app.domain.relevance import RelevanceProvider
 
 
 class UserSatisfaction:
-    def __init__(self, recommender: Recommender, prediction: Prediction, dataset: Dataset) -> None:
+    """
+    Satisfaction of a user with a group recommendation: the relevance of its items for the user,
+    divided by the relevance of the same number of items in the user's own recommendations (ie. the ideal list).
+    
+    The individual recommendations of a user are computed once, for every item, and kept as the prefix sums
+    of their predicted ratings: the ideal satisfaction is then read in O(1) for any length of recommendation.
+    """
+    
+    def __init__(self, recommender: Recommender, prediction: Prediction, dataset: Dataset, relevance: Optional[RelevanceProvider] = None) -> None:
+        """
+        Parameters:
+        - recommender: The individual recommender, giving the ideal recommendations of a user.
+        - prediction: The prediction function, used for the items not rated by a user.
+        - dataset: The dataset containing the ratings.
+        - relevance: The relevances shared with the group components. When given, it replaces
+          the lookups in the dataset and the prediction function.
+        """
+        
         self.__recommender = recommender
         self.__prediction = prediction
         self.__dataset = dataset
+        self.__relevance = relevance
         
-        self.__user_recommendations: Dict[UserId, List[Tuple[ItemId, float]]] = {}
+        # Cumulative sums of the predicted ratings of the user recommendations, by decreasing rating.
+        self.__ideal_satisfactions: Dict[UserId, np.ndarray] = {}
+    
+    def get_ideal_satisfaction(self, user: UserId, limit: int) -> float:
+        """Returns the sum of the predicted ratings of the `limit` best recommendations to the user."""
         
-    def __get_user_recommendations(self, user: UserId, limit: int) -> List[Tuple[ItemId, float]]:
         # strong assumption: user recommendations do not change
-        if not self.__user_recommendations.get(user):
-            user_recommendations = self.__recommender.get_recommendations(user, limit)
-            self.__user_recommendations[user] = user_recommendations
-        return self.__user_recommendations[user]
+        ideal_satisfactions = self.__ideal_satisfactions.get(user)
+        if ideal_satisfactions is None:
+            user_recommendations = self.__recommender.get_all_recommendations(user)
+            ideal_satisfactions = np.cumsum([rating for _, rating in user_recommendations], dtype=np.float64)
+            self.__ideal_satisfactions[user] = ideal_satisfactions
+        
+        limit = min(limit, len(ideal_satisfactions))
+        return ideal_satisfactions.item(limit - 1) if limit > 0 else 0
     
     def get_satisfaction(self, user: UserId, group_recommendation: List[ItemId]) -> float:
         # For each item in the group recommendation, get the rating of the user.
         # If the user has not rated the item, use the prediction to get the rating.
-        group_list_user_ratings = []
-        for item in group_recommendation:
-            rating = self.__dataset.get_rating(user, item)
-            if rating == 0:
-                rating = self.__prediction.get_prediction(user, item)
-            group_list_user_ratings.append(rating)
+        group_list_user_ratings = self.__get_relevances(user, group_recommendation)
         
         group_list_satisfaction = sum(group_list_user_ratings)
         
-        user_recommendations = self.__get_user_recommendations(user, len(group_recommendation))
-        user_list_satisfaction = sum([rating for _, rating in user_recommendations])
+        user_list_satisfaction = self.get_ideal_satisfaction(user, len(group_recommendation))
+        
+        return group_list_satisfaction / user_list_satisfaction
+    
+    def get_satisfactions(self, group: Group, group_recommendations: Sequence[List[ItemId]]) -> np.ndarray:
+        """Returns the satisfaction of every member (columns) with each of the group recommendations (rows)."""
+        
+        satisfactions = np.empty((len(group_recommendations), len(group)))
+        for row, group_recommendation in enumerate(group_recommendations):
+            if self.__relevance is None or len(group_recommendation) == 0:
+                satisfactions[row] = [self.get_satisfaction(user, group_recommendation) for user in group]
+                continue
+            
+            # Running sums add the items in order, as get_satisfaction does.
+            relevances = self.__relevance.get_relevance_matrix(group, group_recommendation)
+            group_list_satisfactions = np.add.accumulate(relevances, axis=1)[:, -1]
+            user_list_satisfactions = np.array([self.get_ideal_satisfaction(user, len(group_recommendation)) for user in group])
+            satisfactions[row] = group_list_satisfactions / user_list_satisfactions
+        return satisfactions
+    
+    def __get_relevances(self, user: UserId, items: List[ItemId]) -> List[float]:
+        if self.__relevance is not None:
+            return [self.__relevance.get_relevance(user, item) for item in items]
         
-        return group_list_satisfaction / user_list_satisfaction
\ No newline at end of file
+        ratings = [self.__dataset.get_rating(user, item) for item in items]
+        unrated_positions = [position for position, rating in enumerate(ratings) if rating == 0]
+        if len(unrated_positions) > 0:
+            predictions = self.__prediction.get_predictions(user, [items[position] for position in unrated_positions])
+            for position, prediction in zip(unrated_positions, predictions):
+                ratings[position] = prediction
+        return ratings
\ No newline at end of file
@@ -0,0 +1,143 @@
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.domain.dataset import ItemId, UserId
+from app.domain.group_prediction.group_prediction import GroupKey
+from app.domain.session_store import SessionStore
+
+WRITE_BATCH_SIZE = 1_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    session TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    item INTEGER NOT NULL,
+    PRIMARY KEY (session, group_key, round, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS satisfactions (
+    session TEXT NOT NULL,
+    group_key TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    user INTEGER NOT NULL,
+    satisfaction REAL NOT NULL,
+    PRIMARY KEY (session, group_key, round, user)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Stores the sessions in a SQLite database, which survives restarts and can be shared by several processes.
+    
+    The database is in WAL mode, so readers do not block the writer. Writes are buffered and committed
+    by batches of rows, in a single transaction. The primary keys index the rows by session and group,
+    which are the only lookups. Rewriting a round replaces it, so a session can be resumed from any round.
+    """
+    
+    def __init__(self, path: Path, batch_size: int = WRITE_BATCH_SIZE) -> None:
+        """
+        Parameters:
+        - path: The database file, created if needed.
+        - batch_size: The number of buffered rows which triggers a write.
+        """
+        
+        self.__path = path
+        self.__batch_size = batch_size
+        self.__connection: Optional[sqlite3.Connection] = None
+        # Buffered writes, by (session, group key, round). A round written again replaces the buffered one.
+        self.__pending_recommendations: Dict[Tuple[str, str, int], List[ItemId]] = {}
+        self.__pending_satisfactions: Dict[Tuple[str, str, int], Dict[UserId, float]] = {}
+    
+    def get_recommendations(self, session: str, group: GroupKey) -> List[List[ItemId]]:
+        self.flush()
+        rows = self.__get_connection().execute(
+            "SELECT round, item FROM recommendations WHERE session = ? AND group_key = ? ORDER BY round, position",
+            (session, self.__format_group_key(group)),
+        )
+        recommendations: Dict[int, List[ItemId]] = defaultdict(list)
+        for round, item in rows:
+            recommendations[round].append(item)
+        return [recommendations[round] for round in sorted(recommendations)]
+    
+    def add_recommendation(self, session: str, group: GroupKey, round: int, recommendation: Sequence[ItemId]) -> None:
+        round_key = (session, self.__format_group_key(group), round)
+        self.__pending_recommendations[round_key] = list(recommendation)
+        # The satisfactions were about the previous recommendation of the round.
+        self.__pending_satisfactions.pop(round_key, None)
+        self.__flush_if_full()
+    
+    def get_satisfactions(self, session: str, group: GroupKey) -> Dict[int, Dict[UserId, float]]:
+        self.flush()
+        rows = self.__get_connection().execute(
+            "SELECT round, user, satisfaction FROM satisfactions WHERE session = ? AND group_key = ? ORDER BY round, user",
+            (session, self.__format_group_key(group)),
+        )
+        satisfactions: Dict[int, Dict[UserId, float]] = defaultdict(dict)
+        for round, user, satisfaction in rows:
+            satisfactions[round][user] = satisfaction
+        return dict(satisfactions)
+    
+    def add_satisfactions(self, session: str, group: GroupKey, round: int, satisfactions: Dict[UserId, float]) -> None:
+        round_key = (session, self.__format_group_key(group), round)
+        round_satisfactions = self.__pending_satisfactions.setdefault(round_key, {})
+        round_satisfactions.update((user, float(satisfaction)) for user, satisfaction in satisfactions.items())
+        self.__flush_if_full()
+    
+    def flush(self) -> None:
+        if len(self.__pending_recommendations) == 0 and len(self.__pending_satisfactions) == 0:
+            return
+        
+        connection = self.__get_connection()
+        with connection:
+            # A round written again (eg. a resumed session) replaces the previous one, and its satisfactions.
+            rounds = sorted(self.__pending_recommendations)
+            connection.executemany("DELETE FROM recommendations WHERE session = ? AND group_key = ? AND round = ?", rounds)
+            connection.executemany("DELETE FROM satisfactions WHERE session = ? AND group_key = ? AND round = ?", rounds)
+            connection.executemany("INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?)", (
+                (session, group_key, round, position, item)
+                for (session, group_key, round), recommendation in self.__pending_recommendations.items()
+                for position, item in enumerate(recommendation)
+            ))
+            connection.executemany("INSERT OR REPLACE INTO satisfactions VALUES (?, ?, ?, ?, ?)", (
+                (session, group_key, round, user, satisfaction)
+                for (session, group_key, round), satisfactions in self.__pending_satisfactions.items()
+                for user, satisfaction in satisfactions.items()
+            ))
+        self.__pending_recommendations = {}
+        self.__pending_satisfactions = {}
+    
+    def close(self) -> None:
+        self.flush()
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections cannot be shared between processes: each process opens its own.
+        self.flush()
+        state = self.__dict__.copy()
+        state["_SqliteSessionStore__connection"] = None
+        return state
+    
+    def __flush_if_full(self) -> None:
+        num_rows = sum(map(len, self.__pending_recommendations.values())) + sum(map(len, self.__pending_satisfactions.values()))
+        if num_rows >= self.__batch_size:
+            self.flush()
+    
+    def __get_connection(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.__path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self.__connection = connection
+        return self.__connection
+    
+    def __format_group_key(self, group: GroupKey) -> str:
+        # Sorted members, so that the key of a group is always the same.
+        return ",".join(str(user) for user in sorted(group))
\ No newline at end of file
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional
+
+import numpy as np
+
+from app.domain.similarity.matrix import SimilarityMatrix
+from app.domain.similarity_store import SimilarityStore
+
+STORE_FORMAT_VERSION = 1
+METADATA_FILENAME = "matrix.json"
+
+
+class MmapSimilarityStore(SimilarityStore):
+    """
+    Stores similarity matrices as .npy files, one directory per similarity and dataset fingerprint.
+    
+    Matrices are memory-mapped when loaded, so every process reading the same matrix
+    shares the pages of the file instead of holding its own copy.
+    """
+    
+    def __init__(self, path: Path) -> None:
+        """
+        Parameters:
+        - path: The directory where the matrices are stored.
+        """
+        
+        self.__path = path
+    
+    def load(self, name: str, fingerprint: str) -> Optional[SimilarityMatrix]:
+        matrix_path = self.__get_matrix_path(name, fingerprint)
+        try:
+            with open(matrix_path / METADATA_FILENAME, "r") as file:
+                metadata = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if metadata.get("version") != STORE_FORMAT_VERSION or metadata.get("fingerprint") != fingerprint:
+            return None
+        
+        users = np.load(matrix_path / "users.npy")
+        values = np.load(matrix_path / "values.npy", mmap_mode="r")
+        return SimilarityMatrix(users.tolist(), values, packed=metadata["packed"])
+    
+    def save(self, name: str, fingerprint: str, matrix: SimilarityMatrix) -> None:
+        matrix_path = self.__get_matrix_path(name, fingerprint)
+        matrix_path.mkdir(parents=True, exist_ok=True)
+        metadata_path = matrix_path / METADATA_FILENAME
+        # The metadata is removed first and written last, so a partially written matrix is never used.
+        metadata_path.unlink(missing_ok=True)
+        arrays = {
+            "users": np.asarray(matrix.users, dtype=np.int64),
+            "values": np.ascontiguousarray(matrix.values),
+        }
+        for array_name, array in arrays.items():
+            # Replace the files instead of overwriting them, since other processes may have them memory-mapped.
+            self.__replace(matrix_path / f"{array_name}.npy", lambda file, array=array: np.save(file, array))
+        
+        metadata = {
+            "version": STORE_FORMAT_VERSION,
+            "name": name,
+            "fingerprint": fingerprint,
+            "packed": matrix.packed,
+        }
+        self.__replace(metadata_path, lambda file: file.write(json.dumps(metadata).encode()))
+    
+    def __replace(self, path: Path, write: Callable[[BinaryIO], Any]) -> None:
+        """
+        Writes a file under a temporary name of its own, then moves it in place.
+        
+        Every writer has its own temporary file, so processes saving the same matrix at once do not remove each other's files.
+        """
+        
+        descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                write(file)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+    
+    def __get_matrix_path(self, name: str, fingerprint: str) -> Path:
+        return self.__path / f"{name}-{fingerprint[:16]}"
@@ -1,15 +1,19 @@
 import os
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from app.domain.dataset import Dataset, ItemId, UserId
 from app.domain.group_prediction.disagreement.disagreement import Disagreement
 from app.domain.group_prediction.group_prediction import Group
 from app.domain.group_recommender import GroupRecommender
+from app.domain.recommendations_log import RecommendationsLog
 from app.domain.recommender import Evaluation, PerformanceEvaluator, Prediction, PredictorName, Recommender
 from app.domain.result_saver import ResultSaver
 from app.domain.sequential_group.sequential_group_recommender import SequentialGroupRecommender
+from app.domain.similarity.cached import CachedSimilarity
 from app.domain.similarity.similarity import Similarity
 from app.domain.similarity.stats import Stats
+from app.domain.similarity.stored import StoredSimilarity
+from app.domain.top_k import select_top_k
 from app.domain.user_satisfaction import UserSatisfaction
 from app.domain.utils import calculate_execution_time
 from tabulate import tabulate
@@ -17,6 +21,12 @@ from tabulate import tabulate
 
 TABLE_RESULTS_LIMIT = 10
 
+# Names of the sessions of the multi-iteration commands, under which their history is kept.
+SESSION_AVERAGE = "average"
+SESSION_LEAST_MISERY = "least_misery"
+SESSION_SEQUENTIAL_HYBRID = "sequential_hybrid"
+SESSIONS = [SESSION_AVERAGE, SESSION_LEAST_MISERY, SESSION_SEQUENTIAL_HYBRID]
+
 def start_cli_menu(
         dataset: Dataset, 
         stats: Stats, 
@@ -33,9 +43,11 @@ def start_cli_menu(
         realistic_group_recommender_avg: GroupRecommender,
         realistic_group_recommender_least_misery: GroupRecommender,
         sequential_group_recommender: SequentialGroupRecommender,
-        user_satisfaction: UserSatisfaction) -> None:
+        user_satisfaction: UserSatisfaction,
+        recommendations_logs: Optional[Dict[str, RecommendationsLog]] = None) -> None:
     
     global TABLE_RESULTS_LIMIT
+    recommendations_logs = recommendations_logs or {}
     
     display_cli_menu()
     
@@ -78,15 +90,15 @@ def start_cli_menu(
         elif choice == "11":
             group = [prompt_user_id() for _ in range(3)]
             iterations = prompt_integer("Enter number of iterations: ")
-            display_group_satisfaction(group, iterations, realistic_group_recommender_avg, user_satisfaction)
+            display_group_satisfaction(group, iterations, realistic_group_recommender_avg, user_satisfaction, recommendations_logs.get(SESSION_AVERAGE))
         elif choice == "12":
             group = [prompt_user_id() for _ in range(3)]
             iterations = prompt_integer("Enter number of iterations: ")
-            display_group_satisfaction(group, iterations, realistic_group_recommender_least_misery, user_satisfaction)
+            display_group_satisfaction(group, iterations, realistic_group_recommender_least_misery, user_satisfaction, recommendations_logs.get(SESSION_LEAST_MISERY))
         elif choice == "13":
             group = [prompt_user_id() for _ in range(3)]
             iterations = prompt_integer("Enter number of iterations: ")
-            display_group_satisfaction(group, iterations, sequential_group_recommender, user_satisfaction)
+            display_group_satisfaction(group, iterations, sequential_group_recommender, user_satisfaction, recommendations_logs.get(SESSION_SEQUENTIAL_HYBRID))
         elif choice == "101":
             compute_user_similarity_matrix(stats)
         elif choice == "102":
@@ -102,6 +114,10 @@ def start_cli_menu(
             display_similarity_between_two_users(user_a, user_b, similarity)
         elif choice == "105":
             display_prediction(user_id=prompt_user_id(), item_id=prompt_integer("Enter item id: "), predictor=predictor)
+        elif choice == "106":
+            display_similarity_cache_stats(similarity)
+        elif choice == "107":
+            save_prediction_matrix(results_output_path / f"prediction_matrix_{similarity.name}.npy", evaluator, predictor, similarity)
         elif choice == "201":
             TABLE_RESULTS_LIMIT = prompt_integer("Enter new limit: ")
             print(f"Table results limit correctly set to {TABLE_RESULTS_LIMIT}.")
@@ -145,6 +161,8 @@ def display_cli_menu() -> None:
     print("  103) Show commonly rated items between two users")
     print("  104) Show similarity between two users")
     print("  105) Predict rating for a user on an item")
+    print("  106) Show similarity cache statistics")
+    print("  107) Save the prediction matrix of all users and items")
     print(" System Options:")
     print("  201) Change table rows limit (default 10)")
     print("  202) Display system variables")
@@ -279,9 +297,24 @@ def display_prediction_comparison(user: UserId, user_items: List[Tuple[ItemId, f
 def compute_user_similarity_matrix(stats: Stats) -> None:
     print("")
     print("Calculating...")
-    user_similarity_matrix = stats.get_user_similarity_matrix()
+    user_similarity_matrix = stats.get_similarity_matrix(packed=True)
+    
+    print(f"User similarity matrix computed successfully ({len(user_similarity_matrix.users)} users, {user_similarity_matrix.values.nbytes / 1e6:.2f} MB).")
+    print("")
+
+@calculate_execution_time
+def save_prediction_matrix(output_path: Path, evaluator: PerformanceEvaluator, predictor: Prediction, similarity: Similarity) -> None:
+    if not output_path.parent.exists():
+        output_path.parent.mkdir(parents=True)
+    
+    print("")
+    print("Calculating...")
+    if isinstance(similarity, StoredSimilarity):
+        # Loaded (or computed and saved) once here, so that the workers only map it.
+        similarity.get_similarity_matrix()
+    prediction_matrix = evaluator.get_prediction_matrix(predictor, output_path, workers=os.cpu_count() or 1)
     
-    print("User similarity matrix computed successfully.")
+    print(f"Prediction matrix ({prediction_matrix.shape[0]} users x {prediction_matrix.shape[1]} items) saved to: {output_path.as_posix()}")
     print("")
     
 @calculate_execution_time
@@ -290,6 +323,19 @@ def display_similarity_between_two_users(user_a: UserId, user_b: UserId, similar
     print("")
     print(f"Similarity between user {user_a} and user {user_b} is: {sim:.8f}")
     print("")
+
+def display_similarity_cache_stats(similarity: Similarity) -> None:
+    print("")
+    if not isinstance(similarity, CachedSimilarity):
+        print("The similarity function is not cached (set SIMILARITY_CACHE_SIZE to enable the cache).")
+        print("")
+        return
+    
+    stats = similarity.stats
+    headers = ["Size", "Max size", "Hits", "Misses", "Evictions", "Hit rate"]
+    table = [[stats.size, stats.max_size, stats.hits, stats.misses, stats.evictions, f"{stats.hit_rate:.2%}"]]
+    print(tabulate(table, headers=headers, tablefmt="github"))
+    print("")
     
 def display_commonly_rated_items(user_a: UserId, user_b: UserId, dataset: Dataset) -> None:
     common_items = dataset.get_items_rated_by_both(user_a, user_b)
@@ -309,14 +355,14 @@ def save_assigment1_results(user: UserId, output_folder: Path, result_saver: Res
     
     print("")
     print("Computing similarity matrix...")
-    similarity_matrix = stats.get_user_similarity_matrix()
+    similarity_matrix = stats.get_similarity_matrix()
     user_similarity_matrix_filepath = output_folder / f"user_similarity_matrix_{similarity.name}.csv"
     result_saver.save(
         output_path=user_similarity_matrix_filepath,
         headers=["userIdA", "userIdB", "similarity"],
         rows=[
             [str(user_a), str(user_b), f"{similarity:.8f}"]
-            for (user_a, user_b), similarity in similarity_matrix.items()
+            for (user_a, user_b), similarity in similarity_matrix.as_dict().items()
         ],
     )
     print("Done.")
@@ -395,12 +441,10 @@ def display_disagreements(group: Group, item: List[ItemId], disagreement: Disagr
     print("")
     print("Calculating...")
     
-    disagreements: List[Tuple[ItemId, float]] = [
-        (item, disagreement.get_disagreement(group, item))
-        for item in item
-    ]
-    disagreements.sort(key=lambda x: x[1], reverse=True)
-    disagreements = disagreements[:limit]
+    disagreements: List[Tuple[ItemId, float]] = select_top_k(
+        zip(item, disagreement.get_disagreements(group, item)),
+        limit,
+    )
     
     headers = ["Item", "Disagreement"]
     table = [[item, disagreement] for item, disagreement in disagreements]
@@ -415,7 +459,12 @@ def display_prediction(user_id: UserId, item_id: ItemId, predictor: Prediction)
     print("")
 
 @calculate_execution_time
-def display_group_satisfaction(group: Group, iterations: int, group_recommender: Union[GroupRecommender, SequentialGroupRecommender], user_satisfaction: UserSatisfaction) -> None:
+def display_group_satisfaction(
+        group: Group,
+        iterations: int,
+        group_recommender: Union[GroupRecommender, SequentialGroupRecommender],
+        user_satisfaction: UserSatisfaction,
+        recommendations_log: Optional[RecommendationsLog] = None) -> None:
     print("")
     print("Calculating...")
     
@@ -423,10 +472,9 @@ def display_group_satisfaction(group: Group, iterations: int, group_recommender:
     table = []
     for iteration in range(iterations):
         recommendations = group_recommender.get_recommendations(group, limit=10)
-        satisfactions = []
-        for user in group:
-            satisfaction = user_satisfaction.get_satisfaction(user, [item for item, _ in recommendations])
-            satisfactions.append(satisfaction)
+        satisfactions = user_satisfaction.get_satisfactions(group, [[item for item, _ in recommendations]])[0].tolist()
+        if recommendations_log is not None:
+            recommendations_log.add_satisfactions(group, dict(zip(group, satisfactions)))
         table.append([iteration, *[f"{satisfaction:.8f}" for satisfaction in satisfactions], [item for item, _ in recommendations]])
     
     print(f"User satisfaction for group {group} over {iterations} iterations:")
@@ -0,0 +1,60 @@
+"""
+Load-time benchmark for the Dataset indexes.
+
+Builds datasets of increasing size and reports the build time per rating.
+A roughly constant time per rating shows that the build grows linearly with the number of ratings.
+
+Usage (from the `src` directory): python -m benchmark.dataset_build
+"""
+
+import random
+import time
+from typing import List
+
+from tabulate import tabulate
+
+from app.domain.dataset import Dataset, DataRow
+
+
+RATINGS_PER_USER = 165 # Same density as ml-latest-small (100k ratings, 610 users)
+RATINGS_PER_ITEM = 10
+SIZES = [25_000, 50_000, 100_000, 200_000, 400_000]
+REPETITIONS = 3
+
+
+def generate_data(num_ratings: int, seed: int = 42) -> List[DataRow]:
+    rng = random.Random(seed)
+    num_users = max(1, num_ratings // RATINGS_PER_USER)
+    num_items = max(1, num_ratings // RATINGS_PER_ITEM)
+    return [
+        (rng.randrange(num_users), rng.randrange(num_items), rng.randint(1, 10) / 2)
+        for _ in range(num_ratings)
+    ]
+
+
+def measure_build_time(data: List[DataRow]) -> float:
+    best = float("inf")
+    for _ in range(REPETITIONS):
+        start_time = time.perf_counter()
+        Dataset(data)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def main() -> None:
+    table = []
+    for num_ratings in SIZES:
+        data = generate_data(num_ratings)
+        build_time = measure_build_time(data)
+        table.append([
+            num_ratings,
+            f"{build_time:.4f}",
+            f"{build_time / num_ratings * 1e6:.3f}",
+        ])
+    
+    headers = ["Ratings", "Build time (s)", "Time per rating (us)"]
+    print(tabulate(table, headers=headers, tablefmt="github"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark of the threshold algorithm for the top-k group recommendations.
+
+Recommends the top-10 items to new random groups of increasing size, with the average and the least misery
+aggregations, scoring every item (full scan) and with the threshold algorithm. The dataset and the
+predictions are synthetic, with the size of ml-latest-small: the predicted rating of an item is its
+quality plus a user-specific deviation, so that members broadly agree on the best items.
+
+The relevances of the members are computed before the measures, as they are shared among the group components,
+but their rankings are not: the threshold algorithm sorts the relevances of a member the first time it meets them.
+Its time is given with the rankings to compute (a group never seen, as in the single recommendations of the CLI)
+and once they are cached. The sessions recommend items to the same group for several rounds, without repeating
+items, as the multi-iteration commands: their first round computes the rankings.
+
+Usage (from the `src` directory): python -m benchmark.group_top_k
+"""
+
+import random
+import time
+from typing import Callable, List
+
+import numpy as np
+from tabulate import tabulate
+
+from app.domain.dataset import DataRow, Dataset
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.group_recommender import GroupRecommender
+from app.domain.prediction.materialized import MaterializedPrediction
+from app.domain.relevance import RelevanceProvider
+
+
+NUM_USERS = 610
+NUM_ITEMS = 9_724
+RATINGS_PER_USER = 165
+GROUP_SIZES = [2, 5, 20, 100]
+LIMIT = 10
+REPETITIONS = 5
+SESSION_ROUNDS = 10
+
+
+def generate_data(seed: int = 42) -> List[DataRow]:
+    rng = random.Random(seed)
+    return [
+        (user, item, rng.randint(1, 10) / 2)
+        for user in range(NUM_USERS)
+        for item in rng.sample(range(NUM_ITEMS), RATINGS_PER_USER)
+    ]
+
+
+def generate_predictions(dataset: Dataset, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    shape = (len(dataset.get_all_users()), len(dataset.get_all_items()))
+    item_quality = rng.normal(3.5, 0.6, size=shape[1])
+    return np.clip(item_quality + rng.normal(0, 0.5, size=shape), 0.5, 5)
+
+
+def measure(function: Callable[[], object]) -> float:
+    start_time = time.perf_counter()
+    function()
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    dataset = Dataset(generate_data())
+    predictor = MaterializedPrediction(dataset, generate_predictions(dataset))
+    
+    rng = random.Random(42)
+    aggregation_types = [("Average", AverageAggregation), ("Least misery", LeastMiseryAggregation)]
+    table = []
+    for name, aggregation_type in aggregation_types:
+        for group_size in GROUP_SIZES:
+            times = np.zeros((REPETITIONS, 5))
+            for repetition in range(REPETITIONS):
+                group = rng.sample(dataset.get_all_users(), group_size)
+                # New relevances for every measure, so that the rankings of the members are never cached.
+                def create_recommender(exclude_previous: bool, use_threshold_algorithm: bool) -> GroupRecommender:
+                    relevance = RelevanceProvider(dataset, predictor)
+                    for user in group:
+                        relevance.get_user_relevances(user)
+                    return GroupRecommender(dataset, aggregation_type(dataset, predictor, relevance), exclude_previous, use_threshold_algorithm)
+                
+                full_scan = create_recommender(exclude_previous=False, use_threshold_algorithm=False)
+                threshold = create_recommender(exclude_previous=False, use_threshold_algorithm=True)
+                full_scan_session = create_recommender(exclude_previous=True, use_threshold_algorithm=False)
+                threshold_session = create_recommender(exclude_previous=True, use_threshold_algorithm=True)
+                assert full_scan.get_recommendations(group, LIMIT) == create_recommender(exclude_previous=False, use_threshold_algorithm=True).get_recommendations(group, LIMIT)
+                
+                times[repetition] = [
+                    measure(lambda: full_scan.get_recommendations(group, LIMIT)),
+                    measure(lambda: threshold.get_recommendations(group, LIMIT)),
+                    measure(lambda: threshold.get_recommendations(group, LIMIT)),
+                    measure(lambda: [full_scan_session.get_recommendations(group, LIMIT) for _ in range(SESSION_ROUNDS)]) / SESSION_ROUNDS,
+                    measure(lambda: [threshold_session.get_recommendations(group, LIMIT) for _ in range(SESSION_ROUNDS)]) / SESSION_ROUNDS,
+                ]
+            
+            full_scan_time, threshold_time, cached_threshold_time, full_scan_session_time, threshold_session_time = np.median(times, axis=0)
+            table.append([
+                name,
+                group_size,
+                f"{full_scan_time * 1e3:.2f}",
+                f"{threshold_time * 1e3:.2f} ({full_scan_time / threshold_time:.1f}x)",
+                f"{cached_threshold_time * 1e3:.2f} ({full_scan_time / cached_threshold_time:.1f}x)",
+                f"{full_scan_session_time * 1e3:.2f}",
+                f"{threshold_session_time * 1e3:.2f} ({full_scan_session_time / threshold_session_time:.1f}x)",
+            ])
+    
+    headers = [
+        "Aggregation",
+        "Group size",
+        "Full scan (ms)",
+        "Threshold, new group (ms)",
+        "Threshold, cached rankings (ms)",
+        f"Session full scan (ms/round, {SESSION_ROUNDS} rounds)",
+        "Session threshold (ms/round)",
+    ]
+    print(tabulate(table, headers=headers, tablefmt="github"))
+
+
+if __name__ == "__main__":
+    main()
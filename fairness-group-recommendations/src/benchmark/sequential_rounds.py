@@ -0,0 +1,77 @@
+"""
+Benchmark of the incremental re-ranking of the sequential group recommendations.
+
+Recommends the top-10 items to random groups of increasing size for several rounds, with the sequential hybrid
+aggregation, scoring every item not recommended yet at every round (full rescoring) and re-ranking the average
+and least misery predictions kept from the first round (`SequentialGroupRecommenderImpl(..., incremental_reranking=True)`).
+The dataset and the predictions are synthetic, as in `benchmark.group_top_k`. The relevances and the ideal
+satisfactions of the members are computed before the measures, as they are shared among the group components.
+
+Usage (from the `src` directory): python -m benchmark.sequential_rounds
+"""
+
+import random
+import time
+from typing import List, Tuple
+
+from tabulate import tabulate
+
+from app.domain.dataset import Dataset, ItemId
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.group_prediction import Group
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.prediction.materialized import MaterializedPrediction
+from app.domain.prediction.prediction import Prediction
+from app.domain.recommender import Recommender
+from app.domain.relevance import RelevanceProvider
+from app.domain.sequential_group.implementation import SequentialGroupRecommenderImpl
+from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
+from app.domain.user_satisfaction import UserSatisfaction
+from benchmark.group_top_k import generate_data, generate_predictions
+
+
+GROUP_SIZES = [2, 5, 20, 100]
+ROUNDS = 20
+LIMIT = 10
+
+
+def run_session(dataset: Dataset, predictor: Prediction, relevance: RelevanceProvider, user_satisfaction: UserSatisfaction, group: Group, incremental_reranking: bool) -> Tuple[float, List[List[Tuple[ItemId, float]]]]:
+    sequential_predictor = MultiIterSequentialHybridAggregation(
+        lambda group: recommender.get_previous_recommendations(group),
+        AverageAggregation(dataset, predictor, relevance),
+        LeastMiseryAggregation(dataset, predictor, relevance),
+        user_satisfaction,
+        iterations_to_consider=2,
+    )
+    recommender = SequentialGroupRecommenderImpl(dataset, sequential_predictor, incremental_reranking=incremental_reranking)
+    
+    start_time = time.perf_counter()
+    recommendations = [recommender.get_recommendations(group, LIMIT) for _ in range(ROUNDS)]
+    return time.perf_counter() - start_time, recommendations
+
+
+def main() -> None:
+    dataset = Dataset(generate_data())
+    predictor = MaterializedPrediction(dataset, generate_predictions(dataset))
+    relevance = RelevanceProvider(dataset, predictor)
+    user_satisfaction = UserSatisfaction(Recommender(dataset, predictor), predictor, dataset, relevance)
+    for user in dataset.get_all_users():
+        relevance.get_ranking(user)
+        user_satisfaction.get_ideal_satisfaction(user, LIMIT)
+    
+    rng = random.Random(42)
+    table = []
+    for group_size in GROUP_SIZES:
+        group = rng.sample(dataset.get_all_users(), group_size)
+        full_rescoring_time, full_rescoring_recommendations = run_session(dataset, predictor, relevance, user_satisfaction, group, incremental_reranking=False)
+        reranking_time, reranking_recommendations = run_session(dataset, predictor, relevance, user_satisfaction, group, incremental_reranking=True)
+        assert full_rescoring_recommendations == reranking_recommendations
+        
+        table.append([group_size, f"{full_rescoring_time / ROUNDS * 1e3:.2f}", f"{reranking_time / ROUNDS * 1e3:.2f}", f"{full_rescoring_time / reranking_time:.1f}x"])
+    
+    headers = ["Group size", "Full rescoring (ms/round)", "Incremental re-ranking (ms/round)", "Speedup"]
+    print(tabulate(table, headers=headers, tablefmt="github"))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
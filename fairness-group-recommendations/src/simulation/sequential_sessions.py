@@ -0,0 +1,172 @@
+"""
+Bulk simulation of multi-iteration sessions.
+
+Runs the sessions of commands 11 to 13 (average and least misery without repeated items, and the sequential
+hybrid aggregation) for every group of a group list file, in parallel worker processes. The dataset snapshot
+and the similarity matrix are memory-mapped, and the workers are forked, so they share them read-only instead
+of holding a copy. Where processes cannot be forked (eg. Windows), the sessions run in the main process.
+The satisfaction of every member at every round is streamed to a CSV file, as the sessions are over.
+
+The sessions are saved in a SQLite checkpoint: when a simulation is interrupted, running it again resumes
+every session after its last saved round. A checkpoint only makes sense with the options it was created with.
+
+The group list file has one group per line, as user ids separated by spaces or commas.
+Empty lines and lines starting with '#' are ignored.
+
+Usage (from the `src` directory): python -m simulation.sequential_sessions GROUPS_FILE [--rounds ROUNDS] [--workers WORKERS] ...
+"""
+
+import argparse
+import csv
+import os
+import time
+from functools import partial
+from pathlib import Path
+from typing import List
+
+from app.data_loader.file_data_loader import FileDataLoader
+from app.data_loader.snapshot_data_loader import SnapshotDataLoader
+from app.domain.candidates.neighbor_candidate_generator import NeighborCandidateGenerator
+from app.domain.dataset import Dataset, ItemId
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.group_prediction import Group, GroupPrediction
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.group_recommender import GroupRecommender
+from app.domain.prediction.mean_centered import ALL_NEIGHBORS, MeanCenteredPrediction
+from app.domain.prediction.neighbor_index import NeighborIndex
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.recommender import Recommender
+from app.domain.relevance import RelevanceProvider
+from app.domain.sequential_group.implementation import SequentialGroupRecommenderImpl
+from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
+from app.domain.session_simulator import SESSION_RECOMMENDATIONS_LIMIT, SessionSimulator
+from app.domain.similarity.itr import VectorizedITR
+from app.domain.similarity.jaccard import VectorizedJaccard
+from app.domain.similarity.pearson import VectorizedPearsonCorrelation
+from app.domain.similarity.stored import StoredSimilarity
+from app.domain.user_satisfaction import UserSatisfaction
+from app.session_store.sqlite_session_store import SqliteSessionStore
+from app.similarity_store.mmap_similarity_store import MmapSimilarityStore
+from app.ui.cli import SESSION_AVERAGE, SESSION_LEAST_MISERY, SESSION_SEQUENTIAL_HYBRID
+
+
+DATASET_FILE_PATH = Path.cwd().parent / "resources" / "ml-latest-small" / "ratings.csv"
+RESULTS_PATH = Path.cwd().parent / "results"
+CACHE_PATH = Path.cwd().parent / "cache"
+
+SIMILARITIES = {
+    "pearson": VectorizedPearsonCorrelation,
+    "itr": VectorizedITR,
+    "jaccard": VectorizedJaccard,
+}
+
+
+def create_group_recommender(dataset: Dataset, predictor: GroupPrediction, recommendations_log: RecommendationsLog) -> GroupRecommender:
+    return GroupRecommender(dataset, predictor, exclude_previous=True, recommendations_log=recommendations_log)
+
+
+def create_sequential_group_recommender(
+        dataset: Dataset,
+        predictor_average: GroupPrediction,
+        predictor_least_misery: GroupPrediction,
+        user_satisfaction: UserSatisfaction,
+        iterations_to_consider: int,
+        recommendations_log: RecommendationsLog) -> SequentialGroupRecommenderImpl:
+    def get_previous_recommendations(group: Group) -> List[List[ItemId]]:
+        return [list(recommendation) for recommendation in recommendations_log.get_previous_recommendations(group)]
+    
+    predictor = MultiIterSequentialHybridAggregation(
+        get_previous_recommendations,
+        predictor_average,
+        predictor_least_misery,
+        user_satisfaction,
+        iterations_to_consider=iterations_to_consider,
+    )
+    return SequentialGroupRecommenderImpl(dataset, predictor, recommendations_log, incremental_reranking=True)
+
+
+def read_groups(path: Path) -> List[Group]:
+    groups = []
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            groups.append([int(user) for user in line.replace(",", " ").split()])
+    return groups
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulates multi-iteration sessions for every group of a group list file.")
+    parser.add_argument("groups_file", type=Path, help="The group list file, with one group of user ids per line.")
+    parser.add_argument("--rounds", type=int, default=10, help="The number of rounds of every session.")
+    parser.add_argument("--limit", type=int, default=SESSION_RECOMMENDATIONS_LIMIT, help="The number of items recommended at each round.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="The number of worker processes.")
+    parser.add_argument("--similarity", choices=list(SIMILARITIES), default="pearson")
+    parser.add_argument("--prediction", choices=["mean_centered_abs", "mean_centered_no_abs"], default="mean_centered_abs")
+    parser.add_argument("--neighbors", type=int, default=ALL_NEIGHBORS, help="The number of neighbors of the predictions, -1 for all of them.")
+    parser.add_argument("--seq-most-recent-iterations", type=int, default=2, help="The iterations considered by the sequential hybrid aggregation.")
+    parser.add_argument("--output", type=Path, help="The CSV file of the satisfactions (default: results/<groups file name>-satisfactions.csv).")
+    parser.add_argument("--checkpoint", type=Path, help="The SQLite checkpoint of the sessions (default: cache/simulations/<groups file name>.sqlite).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    output_path: Path = arguments.output or RESULTS_PATH / f"{arguments.groups_file.stem}-satisfactions.csv"
+    checkpoint_path: Path = arguments.checkpoint or CACHE_PATH / "simulations" / f"{arguments.groups_file.stem}.sqlite"
+    groups = read_groups(arguments.groups_file)
+    
+    dataset = SnapshotDataLoader(
+        DATASET_FILE_PATH,
+        CACHE_PATH / "snapshots" / DATASET_FILE_PATH.parent.name,
+        FileDataLoader(DATASET_FILE_PATH),
+    ).load()
+    similarity = StoredSimilarity(dataset, SIMILARITIES[arguments.similarity](dataset), MmapSimilarityStore(CACHE_PATH / "similarities"), workers=arguments.workers)
+    # Loaded (or computed and saved) once here, so that the workers only map it.
+    similarity.get_similarity_matrix()
+    
+    neighbor_index = NeighborIndex(dataset, similarity, arguments.neighbors) if arguments.neighbors != ALL_NEIGHBORS else None
+    predictor = MeanCenteredPrediction(dataset, similarity, arguments.neighbors, use_absolute_value=arguments.prediction == "mean_centered_abs", neighbor_index=neighbor_index)
+    relevance = RelevanceProvider(dataset, predictor)
+    recommender = Recommender(dataset, predictor, NeighborCandidateGenerator(dataset, similarity, neighbor_index))
+    user_satisfaction = UserSatisfaction(recommender, predictor, dataset, relevance)
+    group_predictor_avg = AverageAggregation(dataset, predictor, relevance)
+    group_predictor_least_misery = LeastMiseryAggregation(dataset, predictor, relevance)
+    recommender_factories = {
+        SESSION_AVERAGE: partial(create_group_recommender, dataset, group_predictor_avg),
+        SESSION_LEAST_MISERY: partial(create_group_recommender, dataset, group_predictor_least_misery),
+        SESSION_SEQUENTIAL_HYBRID: partial(
+            create_sequential_group_recommender,
+            dataset,
+            group_predictor_avg,
+            group_predictor_least_misery,
+            user_satisfaction,
+            arguments.seq_most_recent_iterations,
+        ),
+    }
+    
+    store = SqliteSessionStore(checkpoint_path)
+    simulator = SessionSimulator(dataset, recommender_factories, user_satisfaction, store, arguments.rounds, arguments.limit, arguments.workers)
+    
+    print(f"Simulating {len(recommender_factories)} sessions of {arguments.rounds} rounds for {len(groups)} groups, with {arguments.workers} workers...")
+    print(f"Checkpoint: '{checkpoint_path.absolute().as_posix()}'.")
+    start_time = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["session", "group", "round", "user", "satisfaction"])
+        # The saved rounds of resumed sessions are reported again, so the file is always complete.
+        for simulated_round in simulator.simulate(groups):
+            group = " ".join(str(user) for user in simulated_round.group)
+            writer.writerows(
+                [simulated_round.session, group, simulated_round.round, user, satisfaction]
+                for user, satisfaction in zip(simulated_round.group, simulated_round.satisfactions)
+            )
+    store.close()
+    
+    print(f"Saved the satisfactions to '{output_path.absolute().as_posix()}' in {time.perf_counter() - start_time:.3f} seconds.")
+
+
+if __name__ == "__main__":
+    main()
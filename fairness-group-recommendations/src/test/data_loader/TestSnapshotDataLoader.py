@@ -0,0 +1,53 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from app.data_loader.file_data_loader import FileDataLoader
+from app.data_loader.snapshot_data_loader import SnapshotDataLoader
+
+
+class TestSnapshotDataLoader(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_path = Path(self.directory.name) / "ratings.csv"
+        self.snapshot_path = Path(self.directory.name) / "snapshot"
+        self.source_path.write_text("userId,movieId,rating,timestamp\n1,1,4.0,0\n1,2,3.0,0\n2,1,5.0,0\n")
+    
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+    
+    def create_loader(self) -> SnapshotDataLoader:
+        return SnapshotDataLoader(self.source_path, self.snapshot_path, FileDataLoader(self.source_path))
+    
+    def test_load_from_snapshot_after_first_load(self) -> None:
+        loader = self.create_loader()
+        cold_dataset = loader.load()
+        self.assertFalse(loader.warm_start)
+        
+        loader = self.create_loader()
+        warm_dataset = loader.load()
+        self.assertTrue(loader.warm_start)
+        self.assertIsNotNone(loader.cold_start_time)
+        
+        self.assertEqual(len(cold_dataset), len(warm_dataset))
+        self.assertEqual(cold_dataset.get_first(3), warm_dataset.get_first(3))
+        self.assertEqual(cold_dataset.get_all_users(), warm_dataset.get_all_users())
+        self.assertEqual(cold_dataset.get_users_who_rated(1), warm_dataset.get_users_who_rated(1))
+        self.assertEqual(3.5, warm_dataset.get_average_rating_by_user(1))
+        self.assertEqual(3, warm_dataset.get_rating(1, 2))
+    
+    def test_reload_source_when_it_changes(self) -> None:
+        self.create_loader().load()
+        
+        self.source_path.write_text("userId,movieId,rating,timestamp\n1,1,2.0,0\n")
+        loader = self.create_loader()
+        dataset = loader.load()
+        
+        self.assertFalse(loader.warm_start)
+        self.assertEqual(2, dataset.get_rating(1, 1))
+        
+        loader = self.create_loader()
+        dataset = loader.load()
+        
+        self.assertTrue(loader.warm_start)
+        self.assertEqual(2, dataset.get_rating(1, 1))
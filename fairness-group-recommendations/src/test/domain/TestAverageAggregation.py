@@ -1,9 +1,12 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+import numpy as np
+
 from app.domain.group_prediction.average_aggregation import AverageAggregation
 from app.domain.dataset import Dataset
 from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
 class TestAverageAggregation(TestCase):
@@ -27,4 +30,29 @@ class TestAverageAggregation(TestCase):
         prediction = group_predictor.get_prediction(group, item)
         
         self.assertEqual(3.5, prediction)
-        
\ No newline at end of file
+    
+    def test_get_prediction_with_relevance(self) -> None:
+        relevance = Mock(spec=RelevanceProvider)
+        relevance.get_relevance.side_effect = [3, 4] # relevance of the item for users 1 and 2
+        dataset = Mock(spec=Dataset)
+        user_predictor = Mock(spec=Prediction)
+        group_predictor = AverageAggregation(dataset, user_predictor, relevance)
+        
+        prediction = group_predictor.get_prediction([1, 2], 1)
+        
+        self.assertEqual(3.5, prediction)
+        dataset.get_rating.assert_not_called()
+        user_predictor.get_prediction.assert_not_called()
+    
+    def test_get_predictions(self) -> None:
+        relevance = Mock(spec=RelevanceProvider)
+        relevance.get_relevance_matrix.return_value = np.array([
+            [3, 1], # user 1
+            [4, 3], # user 2
+        ])
+        group_predictor = AverageAggregation(Mock(spec=Dataset), Mock(spec=Prediction), relevance)
+        
+        predictions = group_predictor.get_predictions([1, 2], [10, 20])
+        
+        self.assertEqual([3.5, 2], predictions)
+        relevance.get_relevance_matrix.assert_called_once_with([1, 2], [10, 20])
\ No newline at end of file
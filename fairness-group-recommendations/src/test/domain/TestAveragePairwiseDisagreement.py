@@ -0,0 +1,44 @@
+import itertools
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.group_prediction.disagreement.average_pairwise_disagreement import AveragePairwiseDisagreement
+from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
+
+
+class TestAveragePairwiseDisagreement(TestCase):
+    def test_get_disagreement(self) -> None:
+        """
+        Scenario:
+        - Users 1 and 3 rated the item with 4 and 1.
+        - User 2 has not rated the item, its prediction is 2.
+        - Pair differences are 2, 3 and 1, whose mean is 2.
+        """
+        dataset = Mock(spec=Dataset)
+        dataset.get_rating.side_effect = [4, 0, 1]
+        predictor = Mock(spec=Prediction)
+        predictor.get_prediction.return_value = 2
+        disagreement = AveragePairwiseDisagreement(dataset, predictor)
+        
+        self.assertEqual(2, disagreement.get_disagreement([1, 2, 3], 1))
+        predictor.get_prediction.assert_called_once_with(2, 1)
+    
+    def test_get_disagreements(self) -> None:
+        group = list(range(1, 9))
+        items = [10, 20, 30, 40]
+        relevances = np.random.default_rng(42).uniform(0.5, 5, size=(len(group), len(items)))
+        relevance = Mock(spec=RelevanceProvider)
+        relevance.get_relevance_matrix.return_value = relevances
+        relevance.get_relevance.side_effect = lambda user, item: relevances[group.index(user), items.index(item)]
+        disagreement = AveragePairwiseDisagreement(Mock(spec=Dataset), Mock(spec=Prediction), relevance)
+        
+        expected = [
+            np.mean([abs(a - b) for a, b in itertools.combinations(relevances[:, column], 2)])
+            for column in range(len(items))
+        ]
+        np.testing.assert_allclose(expected, disagreement.get_disagreements(group, items))
+        np.testing.assert_allclose(expected, [disagreement.get_disagreement(group, item) for item in items])
\ No newline at end of file
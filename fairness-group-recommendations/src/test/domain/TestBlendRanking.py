@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.domain.sequential_group.blend_ranking import BlendRanking
+
+
+class TestBlendRanking(TestCase):
+    def setUp(self) -> None:
+        # Scores rounded to make ties frequent
+        rng = np.random.default_rng(42)
+        self.first_scores = np.round(rng.uniform(0.5, 5, size=200), 1)
+        self.second_scores = np.round(np.minimum(self.first_scores, rng.uniform(0.5, 5, size=200)), 1)
+        self.blend_ranking = BlendRanking(self.first_scores, self.second_scores, block_size=2)
+    
+    def test_get_top_k(self) -> None:
+        excluded_positions = np.array([5, 17, 17, 42, 100, 199])
+        for weight in [0, 0.25, 0.5, 1]:
+            for limit in [1, 10, 50, 300]:
+                # Same items, same order among ties, as blending every score
+                scores = (1 - weight) * self.first_scores + weight * self.second_scores
+                order = [position for position in np.argsort(-scores, kind="stable").tolist() if position not in excluded_positions][:limit]
+                
+                top_positions, top_scores = self.blend_ranking.get_top_k(weight, excluded_positions, limit)
+                
+                self.assertEqual(order, top_positions.tolist())
+                self.assertEqual(scores[order].tolist(), top_scores.tolist())
+    
+    def test_get_top_k_with_weight_out_of_bounds(self) -> None:
+        with self.assertRaises(ValueError):
+            self.blend_ranking.get_top_k(1.5, np.zeros(0, dtype=np.int64), 10)
\ No newline at end of file
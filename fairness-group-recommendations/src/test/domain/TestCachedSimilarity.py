@@ -1,7 +1,7 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
-from app.domain.similarity.cached import CachedSimilarity
+from app.domain.similarity.cached import EVICTION_LRU, EVICTION_USER_ROW, CacheStats, CachedSimilarity
 from app.domain.similarity.similarity import Similarity
 
 class TestCachedSimilarity(TestCase):
@@ -13,3 +13,47 @@ class TestCachedSimilarity(TestCase):
         cached_similarity = CachedSimilarity(similarity=similarity)
         
         self.assertEqual(similarity_name, cached_similarity.name)
+    
+    def test_symmetric_pairs_are_cached_once(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarity.return_value = 0.5
+        cached_similarity = CachedSimilarity(similarity=similarity)
+        
+        self.assertEqual(0.5, cached_similarity.get_similarity(1, 2))
+        self.assertEqual(0.5, cached_similarity.get_similarity(2, 1))
+        
+        similarity.get_similarity.assert_called_once_with(1, 2)
+        self.assertEqual(CacheStats(hits=1, misses=1, evictions=0, size=1, max_size=None), cached_similarity.stats)
+        self.assertEqual(0.5, cached_similarity.stats.hit_rate)
+    
+    def test_lru_eviction(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarity.side_effect = lambda user_a, user_b: user_a + user_b
+        cached_similarity = CachedSimilarity(similarity=similarity, max_size=2, eviction=EVICTION_LRU)
+        
+        cached_similarity.get_similarity(1, 2)
+        cached_similarity.get_similarity(1, 3)
+        cached_similarity.get_similarity(2, 1) # (1, 2) becomes the most recently used pair
+        cached_similarity.get_similarity(1, 4) # evicts (1, 3)
+        cached_similarity.get_similarity(1, 2)
+        cached_similarity.get_similarity(3, 1)
+        
+        self.assertEqual(CacheStats(hits=2, misses=4, evictions=2, size=2, max_size=2), cached_similarity.stats)
+    
+    def test_user_row_eviction(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarity.side_effect = lambda user_a, user_b: user_a + user_b
+        cached_similarity = CachedSimilarity(similarity=similarity, max_size=3, eviction=EVICTION_USER_ROW)
+        
+        cached_similarity.get_similarity(1, 2)
+        cached_similarity.get_similarity(1, 3)
+        cached_similarity.get_similarity(2, 3)
+        cached_similarity.get_similarity(2, 4) # evicts the whole row of user 1
+        
+        self.assertEqual(CacheStats(hits=0, misses=4, evictions=2, size=2, max_size=3), cached_similarity.stats)
+        self.assertEqual(5, cached_similarity.get_similarity(3, 2))
+        self.assertEqual(3, cached_similarity.get_similarity(2, 1))
+        self.assertEqual(CacheStats(hits=1, misses=5, evictions=2, size=3, max_size=3), cached_similarity.stats)
+    
+    def test_unknown_eviction_policy(self) -> None:
+        self.assertRaises(ValueError, lambda: CachedSimilarity(similarity=Mock(spec=Similarity), eviction="fifo"))
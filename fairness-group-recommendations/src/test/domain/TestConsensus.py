@@ -0,0 +1,28 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from app.domain.group_prediction.consensus import Consensus
+from app.domain.group_prediction.disagreement.disagreement import Disagreement
+from app.domain.group_prediction.group_prediction import GroupPrediction
+
+
+class TestConsensus(TestCase):
+    def test_get_prediction(self) -> None:
+        group_predictor = Mock(spec=GroupPrediction)
+        group_predictor.get_prediction.return_value = 4
+        disagreement = Mock(spec=Disagreement)
+        disagreement.get_disagreement.return_value = 0.5
+        consensus = Consensus(group_predictor, disagreement, weight_disagreement=0.25)
+        
+        self.assertEqual(0.75 * 4 + 0.25 * 0.5, consensus.get_prediction([1, 2], 1))
+    
+    def test_get_predictions(self) -> None:
+        group_predictor = Mock(spec=GroupPrediction)
+        group_predictor.get_predictions.return_value = [4, 2]
+        disagreement = Mock(spec=Disagreement)
+        disagreement.get_disagreements.return_value = [0.5, 1]
+        consensus = Consensus(group_predictor, disagreement, weight_disagreement=0.25)
+        
+        self.assertEqual([0.75 * 4 + 0.25 * 0.5, 0.75 * 2], consensus.get_predictions([1, 2], [1, 2]))
+        group_predictor.get_prediction.assert_not_called()
+        disagreement.get_disagreement.assert_not_called()
\ No newline at end of file
@@ -144,4 +144,53 @@ class TestDataset(TestCase):
         
         self.assertEqual(5, dataset.get_rating(1, 1))
         self.assertEqual(1, dataset.get_rating(2, 1))
-        self.assertEqual(0, dataset.get_rating(1, 3))
\ No newline at end of file
+        self.assertEqual(0, dataset.get_rating(1, 3))
+        
+    def test_get_raters(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 5),
+            (1, 2, 4),
+            
+            (2, 1, 1),
+        ])
+        
+        raters, ratings = dataset.get_raters(item=1)
+        self.assertEqual([1, 2], raters.tolist())
+        self.assertEqual([5, 1], ratings.tolist())
+        
+        raters, ratings = dataset.get_raters(item=3)
+        self.assertEqual([], raters.tolist())
+        self.assertEqual([], ratings.tolist())
+        
+    def test_get_rating_matrix(self) -> None:
+        dataset = Dataset(data=[
+            (10, 7, 5),
+            (10, 3, 4),
+            
+            (20, 7, 1),
+        ])
+        
+        # Users and items are remapped to contiguous indices, sorted by id
+        self.assertEqual(1, dataset.get_user_index(20))
+        self.assertEqual(0, dataset.get_item_index(3))
+        self.assertEqual([1, 0], dataset.get_item_indices([7, 3]).tolist())
+        self.assertRaises(KeyError, dataset.get_user_indices, [10, 30])
+        
+        expected_matrix = [
+            [4, 5],
+            [0, 1],
+        ]
+        self.assertEqual(expected_matrix, dataset.get_rating_matrix().toarray().tolist())
+        self.assertEqual(expected_matrix, dataset.get_rating_matrix_by_item().toarray().tolist())
+        
+    def test_last_rating_is_kept_for_duplicated_rows(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 5),
+            (1, 2, 2),
+            (1, 1, 3),
+        ])
+        
+        self.assertEqual(3, dataset.get_rating(1, 1))
+        self.assertEqual(2.5, dataset.get_average_rating_by_user(1))
+        self.assertEqual([(1, 3)], dataset.get_users_who_rated(item=1))
+        self.assertEqual(3, len(dataset))
@@ -2,8 +2,11 @@ from unittest import TestCase
 from unittest.mock import Mock
 
 from app.domain.dataset import Dataset
+from app.domain.group_prediction.average_aggregation import AverageAggregation
 from app.domain.group_prediction.group_prediction import GroupPrediction
 from app.domain.group_recommender import GroupRecommender
+from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
 class TestGroupRecommender(TestCase):
@@ -21,7 +24,7 @@ class TestGroupRecommender(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_all_items.return_value = all_items
         group_predictor = Mock(spec=GroupPrediction)
-        group_predictor.get_prediction.side_effect = group_predictions
+        group_predictor.get_predictions.side_effect = [group_predictions]
         recommender = GroupRecommender(dataset, group_predictor, exclude_previous=False)
         
         expected_recommendations = [(2, 5), (1, 4), (3, 1)]
@@ -35,7 +38,7 @@ class TestGroupRecommender(TestCase):
         )
         
         dataset.get_all_items.return_value = all_items
-        group_predictor.get_prediction.side_effect = group_predictions
+        group_predictor.get_predictions.side_effect = [group_predictions]
         # Recommendations do not change unless specified
         recommendations = recommender.get_recommendations(group, limit=n_recommendations)
         self.assertEqual(
@@ -52,17 +55,36 @@ class TestGroupRecommender(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_all_items.return_value = all_items
         group_predictor = Mock(spec=GroupPrediction)
-        group_predictor.get_prediction.side_effect = group_predictions
+        group_predictor.get_predictions.side_effect = [group_predictions]
         recommender = GroupRecommender(dataset, group_predictor, exclude_previous=True)
         
         recommender.get_recommendations(group, limit=n_recommendations)
         
         dataset.get_all_items.return_value = all_items
-        group_predictor.get_prediction.side_effect = [1, 1] # As before, Item 4 and 5 will have the same rating.
+        group_predictor.get_predictions.side_effect = [[1, 1]] # As before, Item 4 and 5 will have the same rating.
         recommendations = recommender.get_recommendations(group, limit=n_recommendations)
         
         expected_recommendations = [(4, 1), (5, 1)]
         self.assertEqual(
             expected_recommendations,
             recommendations,
-        )
\ No newline at end of file
+        )
+    
+    def test_threshold_algorithm_needs_monotone_aggregation(self) -> None:
+        with self.assertRaises(ValueError):
+            GroupRecommender(Mock(spec=Dataset), Mock(spec=GroupPrediction), exclude_previous=False, use_threshold_algorithm=True)
+    
+    def test_get_recommendations_by_position_with_relevances(self) -> None:
+        dataset = Dataset([(user, item, 1 + (user + item) % 5) for user in range(3) for item in range(0, 40, 3)])
+        user_predictor = Mock(spec=Prediction)
+        user_predictor.get_prediction.side_effect = lambda user, item: 0.5 + (user * 7 + item) % 9 / 2
+        user_predictor.get_predictions.side_effect = lambda user, items: [0.5 + (user * 7 + item) % 9 / 2 for item in items]
+        # The first recommender scores lists of items, the second one the positions of the items in the dataset
+        recommender = GroupRecommender(dataset, AverageAggregation(dataset, user_predictor), exclude_previous=True)
+        position_recommender = GroupRecommender(dataset, AverageAggregation(dataset, user_predictor, RelevanceProvider(dataset, user_predictor)), exclude_previous=True)
+        
+        for _ in range(3):
+            expected_recommendations = recommender.get_recommendations([2, 0], limit=4)
+            recommendations = position_recommender.get_recommendations([2, 0], limit=4)
+            self.assertEqual(expected_recommendations, recommendations)
+            self.assertIsInstance(recommendations[0][0], int)
\ No newline at end of file
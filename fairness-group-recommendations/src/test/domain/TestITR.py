@@ -1,8 +1,9 @@
+import random
 from unittest import TestCase
 from unittest.mock import Mock
 
 from app.domain.dataset import Dataset
-from app.domain.similarity.itr import ITR
+from app.domain.similarity.itr import ITR, VectorizedITR
 
 
 class TestITR(TestCase):
@@ -58,4 +59,45 @@ class TestITR(TestCase):
         
     def test_name(self) -> None:
         itr = ITR(dataset=Mock())
-        self.assertEqual(ITR.__name__, itr.name)
\ No newline at end of file
+        self.assertEqual(ITR.__name__, itr.name)
+        
+class TestVectorizedITR(TestCase):
+    def test_same_results_as_scalar_implementation(self) -> None:
+        rng = random.Random(0)
+        dataset = Dataset(data=[
+            (user, item, rng.randint(0, 10) / 2) # Zero ratings included, as in the ITR paper
+            for user in range(20)
+            for item in range(30)
+            if rng.random() < 0.3
+        ])
+        scalar = ITR(dataset)
+        vectorized = VectorizedITR(dataset)
+        
+        matrix = vectorized.get_similarity_matrix()
+        
+        users = dataset.get_all_users()
+        for index_a, user_a in enumerate(users):
+            for index_b, user_b in enumerate(users):
+                self.assertAlmostEqual(scalar.get_similarity(user_a, user_b), matrix[index_a, index_b], 12)
+    
+    def test_get_similarity(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 4),
+            (1, 2, 3),
+            (1, 3, 5),
+            (1, 4, 4),
+            (1, 5, 2),
+            
+            (2, 1, 5),
+            (2, 2, 1),
+            (2, 3, 0),
+            (2, 4, 0),
+            (2, 5, 4),
+        ])
+        vectorized = VectorizedITR(dataset)
+        
+        self.assertAlmostEqual(0.523748 * 0.024244, vectorized.get_similarity(1, 2), 5)
+        
+    def test_name(self) -> None:
+        itr = VectorizedITR(dataset=Mock())
+        self.assertEqual(ITR.__name__, itr.name)
@@ -2,7 +2,7 @@ from unittest import TestCase
 from unittest.mock import Mock
 
 from app.domain.dataset import Dataset
-from app.domain.similarity.jaccard import Jaccard
+from app.domain.similarity.jaccard import Jaccard, VectorizedJaccard
 
 
 class TestJaccardSimilarity(TestCase):
@@ -26,4 +26,45 @@ class TestJaccardSimilarity(TestCase):
     
     def test_name(self) -> None:
         itr = Jaccard(dataset=Mock())
-        self.assertEqual(Jaccard.__name__, itr.name)
\ No newline at end of file
+        self.assertEqual(Jaccard.__name__, itr.name)
+        
+class TestVectorizedJaccard(TestCase):
+    def test_get_similarity(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 1),
+            (1, 2, 4),
+            
+            (2, 1, 5),
+            (2, 2, 4),
+            
+            (3, 1, 5),
+            
+            (4, 3, 5),
+        ])
+        
+        jaccard = VectorizedJaccard(dataset)
+        self.assertEqual(1, jaccard.get_similarity(user_a=1, user_b=2))
+        self.assertEqual(0.5, jaccard.get_similarity(user_a=1, user_b=3))
+        self.assertEqual(0, jaccard.get_similarity(user_a=1, user_b=4))
+        
+    def test_get_similarity_matrix(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 1),
+            (1, 2, 4),
+            
+            (2, 2, 4),
+            (2, 3, 4),
+            (2, 4, 4),
+        ])
+        
+        jaccard = VectorizedJaccard(dataset)
+        expected_matrix = [
+            [1, 0.25],
+            [0.25, 1],
+        ]
+        self.assertEqual(expected_matrix, jaccard.get_similarity_matrix().tolist())
+        self.assertEqual(expected_matrix[1], jaccard.get_similarity_row(2).tolist())
+    
+    def test_name(self) -> None:
+        jaccard = VectorizedJaccard(dataset=Mock())
+        self.assertEqual(Jaccard.__name__, jaccard.name)
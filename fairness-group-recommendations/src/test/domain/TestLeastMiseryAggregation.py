@@ -1,9 +1,12 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+import numpy as np
+
 from app.domain.dataset import Dataset
 from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
 from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
 
 
 class TestAverageAggregation(TestCase):
@@ -27,4 +30,16 @@ class TestAverageAggregation(TestCase):
         prediction = group_predictor.get_prediction(group, item)
         
         self.assertEqual(3, prediction)
-        
\ No newline at end of file
+    
+    def test_get_predictions(self) -> None:
+        relevance = Mock(spec=RelevanceProvider)
+        relevance.get_relevance_matrix.return_value = np.array([
+            [3, 1], # user 1
+            [4, 3], # user 2
+        ])
+        group_predictor = LeastMiseryAggregation(Mock(spec=Dataset), Mock(spec=Prediction), relevance)
+        
+        predictions = group_predictor.get_predictions([1, 2], [10, 20])
+        
+        self.assertEqual([3, 1], predictions)
+        relevance.get_relevance_matrix.assert_called_once_with([1, 2], [10, 20])
\ No newline at end of file
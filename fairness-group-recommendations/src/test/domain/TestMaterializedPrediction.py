@@ -0,0 +1,76 @@
+import random
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.prediction.materialized import MaterializedPrediction, compute_prediction_matrix
+from app.domain.prediction.mean_centered import ALL_NEIGHBORS, MeanCenteredPrediction
+from app.domain.similarity.matrix import SimilarityMatrix
+from app.domain.similarity.pearson import VectorizedPearsonCorrelation
+from app.domain.similarity.stored import StoredSimilarity
+from app.similarity_store.mmap_similarity_store import MmapSimilarityStore
+
+
+class SaveCountingStore(MmapSimilarityStore):
+    """Records every save in a file, so that the saves of other processes are counted too."""
+    
+    def __init__(self, path: Path, saves_path: Path) -> None:
+        super().__init__(path)
+        self.saves_path = saves_path
+    
+    def save(self, name: str, fingerprint: str, matrix: SimilarityMatrix) -> None:
+        with open(self.saves_path, "a") as file:
+            file.write(f"{name}\n")
+        super().save(name, fingerprint, matrix)
+
+
+class TestMaterializedPrediction(TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        self.dataset = Dataset(data=[
+            (user, item, rng.randint(1, 10) / 2)
+            for user in range(80)
+            for item in range(25)
+            if rng.random() < 0.3
+        ])
+        self.predictor = MeanCenteredPrediction(self.dataset, VectorizedPearsonCorrelation(self.dataset), ALL_NEIGHBORS, use_absolute_value=True)
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+    
+    def test_same_predictions_as_predictor(self) -> None:
+        materialized = MaterializedPrediction(self.dataset, compute_prediction_matrix(self.dataset, self.predictor))
+        
+        items = self.dataset.get_all_items()
+        for user in self.dataset.get_all_users()[::9]:
+            expected_predictions = self.predictor.get_predictions(user, items)
+            np.testing.assert_allclose(expected_predictions, materialized.get_predictions(user, items), rtol=1e-6)
+            self.assertAlmostEqual(expected_predictions[3], materialized.get_prediction(user, items[3]), 5)
+    
+    def test_parallel_computation_to_file(self) -> None:
+        output_path = Path(self.directory.name) / "predictions.npy"
+        
+        matrix = compute_prediction_matrix(self.dataset, self.predictor, output_path, workers=2)
+        materialized = MaterializedPrediction.load(self.dataset, output_path)
+        
+        self.assertIsInstance(materialized.predictions, np.memmap)
+        np.testing.assert_array_equal(compute_prediction_matrix(self.dataset, self.predictor), matrix)
+        np.testing.assert_array_equal(matrix, materialized.predictions)
+    
+    def test_parallel_computation_saves_stored_similarity_once(self) -> None:
+        directory = Path(self.directory.name)
+        store = SaveCountingStore(directory / "similarities", directory / "saves.txt")
+        similarity = StoredSimilarity(self.dataset, VectorizedPearsonCorrelation(self.dataset), store, workers=2)
+        predictor = MeanCenteredPrediction(self.dataset, similarity, ALL_NEIGHBORS, use_absolute_value=True)
+        
+        matrix = compute_prediction_matrix(self.dataset, predictor, directory / "predictions.npy", workers=2)
+        
+        self.assertEqual(1, len((directory / "saves.txt").read_text().splitlines()))
+        np.testing.assert_allclose(compute_prediction_matrix(self.dataset, self.predictor), matrix, rtol=1e-6)
+    
+    def test_wrong_shape(self) -> None:
+        self.assertRaises(ValueError, lambda: MaterializedPrediction(self.dataset, np.zeros((2, 2))))
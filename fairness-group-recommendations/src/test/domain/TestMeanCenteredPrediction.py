@@ -1,14 +1,50 @@
 from unittest import TestCase
 from unittest.mock import Mock
+
+import numpy as np
+
 from app.domain.prediction.mean_centered import ALL_NEIGHBORS, MeanCenteredPrediction
+from app.domain.similarity.pearson import PearsonCorrelation
 from app.domain.similarity.similarity import Similarity
-from app.domain.dataset import Dataset
+from app.domain.dataset import Dataset, ItemId, UserId
+
+def get_loop_prediction(dataset: Dataset, similarity: Similarity, num_neighbors: int, use_absolute_value: bool, user: UserId, item: ItemId) -> float:
+    """Reference prediction, computed one neighbor at a time as MeanCenteredPrediction did before it was vectorized."""
+    if num_neighbors == ALL_NEIGHBORS:
+        closest_neighbors = [
+            (neighbor, rating, similarity.get_similarity(user, neighbor))
+            for (neighbor, rating) in dataset.get_users_who_rated(item)
+        ]
+    else:
+        neighbors_similarities = [
+            (neighbor, dataset.get_rating(neighbor, item), similarity.get_similarity(user, neighbor))
+            for neighbor in dataset.get_all_users()
+            if neighbor != user
+        ]
+        neighbors_similarities.sort(key=lambda x: x[2], reverse=True)
+        closest_neighbors = [
+            (neighbor, rating, neighbor_similarity)
+            for (neighbor, rating, neighbor_similarity) in neighbors_similarities[:num_neighbors]
+            if rating != 0
+        ]
+    
+    avg_user_rating = dataset.get_average_rating_by_user(user)
+    if use_absolute_value:
+        denominator = sum([abs(neighbor_similarity) for (_, _, neighbor_similarity) in closest_neighbors])
+    else:
+        denominator = sum([neighbor_similarity for (_, _, neighbor_similarity) in closest_neighbors])
+    if denominator == 0:
+        return avg_user_rating
+    return avg_user_rating + sum([
+        neighbor_similarity * (rating - dataset.get_average_rating_by_user(neighbor))
+        for (neighbor, rating, neighbor_similarity) in closest_neighbors
+    ]) / denominator
 
 class TestMeanCenteredPrediction(TestCase):
     def test_get_prediction(self) -> None:
         # test: neighbors with average=0 and similarity=1. Should return the average rating for the user
         similarity = Mock(spec=Similarity)
-        similarity.get_similarity.side_effect = [1]
+        similarity.get_similarities.side_effect = [np.array([1])]
         predictor = MeanCenteredPrediction(
             dataset=Dataset([
                 (1, 1, 5),
@@ -28,7 +64,7 @@ class TestMeanCenteredPrediction(TestCase):
         
         # test: filter only the first neighbor with similarity=1
         similarity = Mock(spec=Similarity)
-        similarity.get_similarity.side_effect = [1, 0.5]
+        similarity.get_similarities.side_effect = [np.array([1, 0.5])]
         predictor = MeanCenteredPrediction(
             dataset=Dataset([
                 (1, 1, 5),
@@ -50,7 +86,7 @@ class TestMeanCenteredPrediction(TestCase):
         
     def test_get_prediction_considering_most_similar_neighbors(self) -> None:
         similarity = Mock(spec=Similarity)
-        similarity.get_similarity.side_effect = [0.8, 1] # user 3 has the highest similarity
+        similarity.get_similarities.side_effect = [np.array([0.8, 1])] # user 3 has the highest similarity
         num_neighbors = 1
         predictor = MeanCenteredPrediction(
             dataset=Dataset([
@@ -70,7 +106,7 @@ class TestMeanCenteredPrediction(TestCase):
             predictor.get_prediction(user=1, item=3)
         )
         
-        similarity.get_similarity.side_effect = [0.8, 1] # user 3 has the highest similarity
+        similarity.get_similarities.side_effect = [np.array([0.8, 1])] # user 3 has the highest similarity
         predictor = MeanCenteredPrediction(
             dataset=Dataset([
                 (1, 1, 5),
@@ -88,6 +124,35 @@ class TestMeanCenteredPrediction(TestCase):
             5 + (5 - 3), # average of user 1 + (rating of user 3 for item 2 - average of user 3)
             predictor.get_prediction(user=1, item=2)
         )
-        
-        
-        
\ No newline at end of file
+    
+    def test_get_predictions(self) -> None:
+        dataset = Dataset([
+            (1, 1, 5),
+            (1, 2, 3),
+            (1, 3, 4),
+            
+            (2, 1, 3),
+            (2, 2, 1),
+            (2, 4, 3),
+            
+            (3, 1, 4),
+            (3, 3, 4),
+            (3, 4, 5),
+            
+            (4, 2, 1),
+            (4, 3, 5),
+            (4, 4, 2),
+        ])
+        items = [4, 2, 42, 1] # item 42 is not in the dataset
+        for num_neighbors in [ALL_NEIGHBORS, 2]:
+            for use_absolute_value in [True, False]:
+                predictor = MeanCenteredPrediction(dataset, PearsonCorrelation(dataset), num_neighbors, use_absolute_value)
+                
+                predictions = predictor.get_predictions(user=1, items=items)
+                
+                self.assertEqual(len(items), len(predictions))
+                self.assertEqual(dataset.get_average_rating_by_user(1), predictions[2])
+                for item, prediction in zip(items, predictions):
+                    if item != 42:
+                        expected = get_loop_prediction(dataset, PearsonCorrelation(dataset), num_neighbors, use_absolute_value, user=1, item=item)
+                        self.assertAlmostEqual(expected, prediction, 12)
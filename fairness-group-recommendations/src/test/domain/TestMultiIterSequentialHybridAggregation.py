@@ -3,6 +3,8 @@ from unittest import TestCase
 from unittest.mock import ANY, Mock
 from parameterized import parameterized
 
+import numpy as np
+
 from app.domain.dataset import ItemId
 from app.domain.group_prediction.group_prediction import Group, GroupPrediction
 from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
@@ -10,6 +12,11 @@ from app.domain.sequential_group.sequential_group_recommender import SequentialG
 from app.domain.user_satisfaction import UserSatisfaction
 
 
+def mock_satisfactions(user_satisfaction: Mock, satisfactions: List[float]) -> None:
+    """Mocks the satisfactions of the users (in order) at each iteration (in order)."""
+    user_satisfaction.get_satisfactions.side_effect = lambda group, recommendations: np.reshape(satisfactions, (len(recommendations), len(group)))
+
+
 class TestSequentialGroupPrediction(TestCase):
     @parameterized.expand([
         (
@@ -102,7 +109,7 @@ class TestSequentialGroupPrediction(TestCase):
         group_predictor_least_misery = Mock(spec=GroupPrediction)
         group_predictor_least_misery.get_prediction.return_value = least_misery_prediction
         user_satisfaction = Mock(spec=UserSatisfaction)
-        user_satisfaction.get_satisfaction.side_effect = user_satisfactions
+        mock_satisfactions(user_satisfaction, user_satisfactions)
         predictor = MultiIterSequentialHybridAggregation(
             get_previous_recommendations=lambda _: previous_recommendations,
             predictor_average=group_predictor_avg,
@@ -164,7 +171,7 @@ class TestSequentialGroupPrediction(TestCase):
         group_predictor_least_misery = Mock(spec=GroupPrediction)
         group_predictor_least_misery.get_prediction.return_value = least_misery_prediction
         user_satisfaction = Mock(spec=UserSatisfaction)
-        user_satisfaction.get_satisfaction.side_effect = user_satisfactions
+        mock_satisfactions(user_satisfaction, user_satisfactions)
         predictor = MultiIterSequentialHybridAggregation(
             get_previous_recommendations=lambda _: previous_recommendations,
             predictor_average=group_predictor_avg,
@@ -237,7 +244,7 @@ class TestSequentialGroupPrediction(TestCase):
         group_predictor_least_misery = Mock(spec=GroupPrediction)
         group_predictor_least_misery.get_prediction.return_value = least_misery_prediction
         user_satisfaction = Mock(spec=UserSatisfaction)
-        user_satisfaction.get_satisfaction.side_effect = user_satisfactions
+        mock_satisfactions(user_satisfaction, user_satisfactions)
         predictor = MultiIterSequentialHybridAggregation(
             get_previous_recommendations=lambda _: previous_recommendations,
             predictor_average=group_predictor_avg,
@@ -250,4 +257,32 @@ class TestSequentialGroupPrediction(TestCase):
             expected_prediction,
             predictor.get_prediction(group, item),
             places=10
-        )
\ No newline at end of file
+        )
+    
+    def test_get_predictions_should_compute_disagreement_once_per_iteration(self) -> None:
+        previous_recommendations: List[List[ItemId]] = [[1, 2]]
+        group_predictor_avg = Mock(spec=GroupPrediction)
+        group_predictor_avg.get_predictions.return_value = [4.2, 3]
+        group_predictor_least_misery = Mock(spec=GroupPrediction)
+        group_predictor_least_misery.get_predictions.return_value = [1.2, 2]
+        user_satisfaction = Mock(spec=UserSatisfaction)
+        mock_satisfactions(user_satisfaction, [0.5, 1]) # Disagreement is 0.5
+        predictor = MultiIterSequentialHybridAggregation(
+            get_previous_recommendations=lambda _: previous_recommendations,
+            predictor_average=group_predictor_avg,
+            predictor_least_misery=group_predictor_least_misery,
+            user_satisfaction=user_satisfaction,
+            iterations_to_consider=1,
+        )
+        
+        self.assertEqual([(4.2 * 0.5) + (1.2 * 0.5), (3 * 0.5) + (2 * 0.5)], predictor.get_predictions([1, 2], [3, 4]))
+        
+        group_predictor_avg.get_prediction.return_value = 4.2
+        group_predictor_least_misery.get_prediction.return_value = 1.2
+        self.assertEqual((4.2 * 0.5) + (1.2 * 0.5), predictor.get_prediction([1, 2], 3))
+        self.assertEqual(1, user_satisfaction.get_satisfactions.call_count)
+        
+        # A new iteration changes the disagreement
+        previous_recommendations.append([3, 4])
+        mock_satisfactions(user_satisfaction, [1, 1])
+        self.assertEqual(4.2, predictor.get_prediction([1, 2], 3))
\ No newline at end of file
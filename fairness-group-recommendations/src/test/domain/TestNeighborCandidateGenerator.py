@@ -0,0 +1,44 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.domain.candidates.neighbor_candidate_generator import NeighborCandidateGenerator
+from app.domain.dataset import Dataset
+from app.domain.prediction.neighbor_index import NeighborIndex
+from app.domain.similarity.similarity import Similarity
+
+
+class TestNeighborCandidateGenerator(TestCase):
+    def setUp(self) -> None:
+        self.dataset = Dataset([
+            (1, 1, 4),
+            (1, 2, 2),
+            (2, 1, 5),
+            (2, 3, 3),
+            (3, 4, 1),
+            (4, 5, 2),
+        ])
+    
+    def test_get_candidates(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarities.return_value = np.array([0.5, 0, -0.5]) # similarities of user 1 with users 2, 3, 4
+        generator = NeighborCandidateGenerator(self.dataset, similarity)
+        
+        # Items rated by users 2 and 4, user 3 not being similar
+        self.assertEqual({1, 3, 5}, set(generator.get_candidates(1)))
+        similarity.get_similarities.assert_called_once_with(1, [2, 3, 4])
+    
+    def test_get_candidates_with_neighbor_index(self) -> None:
+        similarity = Mock(spec=Similarity)
+        neighbor_index = Mock(spec=NeighborIndex)
+        neighbor_index.get_neighbors.return_value = [(3, 1), (2, 0)]
+        generator = NeighborCandidateGenerator(self.dataset, similarity, neighbor_index)
+        
+        self.assertEqual({4}, set(generator.get_candidates(1)))
+        similarity.get_similarities.assert_not_called()
+    
+    def test_get_fallback_score(self) -> None:
+        generator = NeighborCandidateGenerator(self.dataset, Mock(spec=Similarity))
+        
+        self.assertEqual(3, generator.get_fallback_score(1))
\ No newline at end of file
@@ -0,0 +1,60 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.prediction.neighbor_index import NeighborIndex
+from app.domain.similarity.pearson import PearsonCorrelation, VectorizedPearsonCorrelation
+from app.domain.similarity.similarity import Similarity
+
+
+class TestNeighborIndex(TestCase):
+    def setUp(self) -> None:
+        self.dataset = Dataset([
+            (1, 1, 5),
+            (2, 1, 5),
+            (3, 1, 1),
+            (4, 1, 2),
+        ])
+    
+    def test_get_neighbors(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarities.return_value = np.array([0.5, 1, 0.5]) # similarities of user 1 with users 2, 3, 4
+        index = NeighborIndex(self.dataset, similarity, num_neighbors=2)
+        
+        neighbors = index.get_neighbors(1)
+        
+        # Ties keep the order of the users in the dataset
+        self.assertEqual([(3, 1), (2, 0.5)], neighbors)
+        self.assertEqual(neighbors, index.get_neighbors(1))
+        similarity.get_similarities.assert_called_once_with(1, [2, 3, 4]) # computed only once
+    
+    def test_invalidate(self) -> None:
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarities.side_effect = [np.array([0.5, 1, 0.5]), np.array([0.5, 0.5, 1])]
+        index = NeighborIndex(self.dataset, similarity, num_neighbors=1)
+        self.assertEqual([(3, 1)], index.get_neighbors(1))
+        
+        index.invalidate(1)
+        
+        self.assertEqual([(4, 1)], index.get_neighbors(1))
+    
+    def test_neighbors_are_recomputed_when_dataset_or_similarity_change(self) -> None:
+        dataset = Dataset([
+            (1, 1, 5), (1, 2, 3), (1, 3, 4),
+            (2, 1, 3), (2, 2, 1), (2, 3, 2),
+            (3, 1, 1), (3, 2, 5), (3, 3, 1),
+        ])
+        index = NeighborIndex(dataset, VectorizedPearsonCorrelation(dataset), num_neighbors=1)
+        self.assertEqual(2, index.get_neighbors(1)[0][0])
+        
+        similarity = Mock(spec=Similarity)
+        similarity.get_similarities.return_value = np.array([0, 1])
+        index.set_similarity(similarity)
+        self.assertEqual([(3, 1)], index.get_neighbors(1))
+        
+        changed_dataset = Dataset([(1, 1, 5), (1, 2, 3), (2, 1, 3), (2, 2, 4), (3, 1, 5), (3, 2, 3)])
+        index.set_similarity(PearsonCorrelation(changed_dataset))
+        index.set_dataset(changed_dataset)
+        self.assertEqual(3, index.get_neighbors(1)[0][0])
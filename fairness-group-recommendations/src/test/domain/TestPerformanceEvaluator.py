@@ -1,6 +1,8 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+import numpy as np
+
 from app.domain.dataset import Dataset
 from app.domain.recommender import PerformanceEvaluator, Prediction, PredictionComparison
 
@@ -15,9 +17,9 @@ class TestPerformanceEvaluator(TestCase):
             (user, 4, 5),
         ])
         predictor_a = Mock(spec=Prediction)
-        predictor_a.get_prediction.side_effect = [4, 3, 2, 5]
+        predictor_a.get_predictions.side_effect = [[4, 3, 2, 5]]
         predictor_b = Mock(spec=Prediction)
-        predictor_b.get_prediction.side_effect = [1, 1, 4, 1]
+        predictor_b.get_predictions.side_effect = [[1, 1, 4, 1]]
         evaluator = PerformanceEvaluator([("A", predictor_a), ("B", predictor_b)], dataset)
         
         evaluations = evaluator.get_comparison_by_user(user=1)
@@ -43,16 +45,12 @@ class TestPerformanceEvaluator(TestCase):
             (2, 2, 2),
         ])
         predictor = Mock(spec=Prediction)
-        predictor.get_prediction.side_effect = [
+        predictor.get_predictions.side_effect = [
             # Second movie is better suited for user 1
-            1,
-            2,
-            5,
+            [1, 2, 5],
             
             # First movie is better suited for user 2
-            5,
-            1,
-            4,
+            [5, 1, 4],
         ]
         
         evaluator = PerformanceEvaluator([("A", predictor)], dataset)
@@ -63,4 +61,19 @@ class TestPerformanceEvaluator(TestCase):
                 2: [(1, 5), (2, 1), (3, 4)],
             },
             evaluator.get_all_predictions(predictor)
-        )
\ No newline at end of file
+        )
+    
+    def test_get_prediction_matrix(self) -> None:
+        dataset = Dataset(data=[
+            (1, 1, 5),
+            (1, 2, 4),
+            (2, 3, 1),
+        ])
+        predictor = Mock(spec=Prediction)
+        predictor.get_predictions.side_effect = [[1, 2, 5], [5, 1, 4]]
+        evaluator = PerformanceEvaluator([("A", predictor)], dataset)
+        
+        matrix = evaluator.get_prediction_matrix(predictor)
+        
+        self.assertEqual(np.float32, matrix.dtype)
+        self.assertEqual([[1, 2, 5], [5, 1, 4]], matrix.tolist())
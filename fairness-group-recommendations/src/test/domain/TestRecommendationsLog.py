@@ -0,0 +1,71 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from app.domain.dataset import Dataset
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.session_store import SessionStore
+
+
+class TestRecommendationsLog(TestCase):
+    def setUp(self) -> None:
+        self.dataset = Mock(spec=Dataset)
+        self.dataset.get_all_items.return_value = [1, 2, 3, 4, 5]
+    
+    def test_get_unrecommended_items(self) -> None:
+        log = RecommendationsLog(self.dataset)
+        self.assertEqual([1, 2, 3, 4, 5], log.get_unrecommended_items([1, 2]))
+        
+        log.add_recommendation([1, 2], {4, 1})
+        self.assertEqual([2, 3, 5], log.get_unrecommended_items([1, 2]))
+        
+        log.add_recommendation([1, 2], {5})
+        self.assertEqual([2, 3], log.get_unrecommended_items([1, 2]))
+        # Other groups are not affected
+        self.assertEqual([1, 2, 3, 4, 5], log.get_unrecommended_items([1, 3]))
+    
+    def test_get_unrecommended_items_of_group_logged_before(self) -> None:
+        log = RecommendationsLog(self.dataset)
+        log.add_recommendation([1, 2], {4, 1})
+        log.add_recommendation([1, 2], {2, 6}) # unknown item
+        
+        self.assertEqual([3, 5], log.get_unrecommended_items([1, 2]))
+    
+    def test_get_unrecommended_positions(self) -> None:
+        log = RecommendationsLog(self.dataset)
+        log.add_recommendation([1, 2], {4, 1})
+        
+        self.assertEqual([1, 2, 4], log.get_unrecommended_positions([2, 1]).tolist())
+        self.assertEqual([0, 1, 2, 3, 4], log.get_unrecommended_positions([1, 3]).tolist())
+    
+    def test_get_recommended_positions(self) -> None:
+        log = RecommendationsLog(self.dataset)
+        log.add_recommendation([1, 2], {4, 1})
+        log.add_recommendation([1, 2], {6}) # unknown item
+        
+        self.assertEqual([0, 3], sorted(log.get_recommended_positions([2, 1])))
+        self.assertEqual([], log.get_recommended_positions([1, 3]))
+    
+    def test_groups_are_identified_by_their_members(self) -> None:
+        log = RecommendationsLog(self.dataset)
+        log.add_recommendation([1, 2, 300], {3})
+        log.add_recommendation([300, 1, 2], {5})
+        
+        self.assertEqual([{3}, {5}], log.get_previous_recommendations([2, 300, 1]))
+        self.assertEqual([1, 2, 4], log.get_unrecommended_items([2, 1, 300]))
+    
+    def test_history_is_read_from_and_saved_to_store(self) -> None:
+        store = Mock(spec=SessionStore)
+        store.get_recommendations.return_value = [[4, 1]]
+        log = RecommendationsLog(self.dataset, store, "average")
+        
+        self.assertEqual([{1, 4}], log.get_previous_recommendations([2, 1]))
+        self.assertEqual([2, 3, 5], log.get_unrecommended_items([1, 2]))
+        store.get_recommendations.assert_called_once_with("average", frozenset([1, 2]))
+        
+        log.add_recommendation([1, 2], {5, 2})
+        store.add_recommendation.assert_called_once_with("average", frozenset([1, 2]), 1, [2, 5])
+        self.assertEqual([3], log.get_unrecommended_items([1, 2]))
+        
+        log.add_satisfactions([1, 2], {1: 0.5, 2: 1})
+        store.add_satisfactions.assert_called_once_with("average", frozenset([1, 2]), 1, {1: 0.5, 2: 1})
+        store.get_recommendations.assert_called_once()
\ No newline at end of file
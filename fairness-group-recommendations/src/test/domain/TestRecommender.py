@@ -1,6 +1,7 @@
 from unittest import TestCase
 from unittest.mock import Mock
 
+from app.domain.candidates.candidate_generator import CandidateGenerator
 from app.domain.dataset import Dataset
 from app.domain.prediction.prediction import Prediction
 from app.domain.recommender import Recommender
@@ -11,14 +12,41 @@ class TestRecommender(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_items_not_rated_by_user.return_value = [1, 2]
         predictor = Mock(spec=Prediction)
-        predictor.get_prediction.side_effect = [
+        predictor.get_predictions.side_effect = [[
             # Second movie is better suited for user
             1,
             5
-        ]
+        ]]
         recommender = Recommender(dataset, predictor)
         
         self.assertEqual(
             [(2, 5), (1, 1)],
             recommender.get_recommendations(user=0, limit=2)
-        )
\ No newline at end of file
+        )
+    
+    def test_get_recommendations_with_candidates(self) -> None:
+        dataset = Mock(spec=Dataset)
+        dataset.get_items_not_rated_by_user.return_value = [1, 2, 3]
+        predictor = Mock(spec=Prediction)
+        predictor.get_predictions.side_effect = [[1, 5]]
+        candidates = Mock(spec=CandidateGenerator)
+        candidates.get_candidates.return_value = {1, 3}
+        candidates.get_fallback_score.return_value = 3
+        recommender = Recommender(dataset, predictor, candidates)
+        
+        self.assertEqual(
+            [(3, 5), (2, 3), (1, 1)],
+            recommender.get_recommendations(user=0, limit=3)
+        )
+        # Only the candidates are predicted
+        predictor.get_predictions.assert_called_once_with(0, [1, 3])
+    
+    def test_get_all_recommendations(self) -> None:
+        dataset = Mock(spec=Dataset)
+        dataset.get_all_items.return_value = [1, 2, 3, 4]
+        dataset.get_items_not_rated_by_user.return_value = [1, 2, 4]
+        predictor = Mock(spec=Prediction)
+        predictor.get_predictions.side_effect = [[1, 5, 3]]
+        recommender = Recommender(dataset, predictor)
+        
+        self.assertEqual([(2, 5), (4, 3), (1, 1)], recommender.get_all_recommendations(user=0))
\ No newline at end of file
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
+
+
+class TestRelevanceProvider(TestCase):
+    def setUp(self) -> None:
+        self.dataset = Dataset([
+            (1, 10, 4),
+            (2, 10, 5),
+            (2, 20, 1),
+            (3, 30, 2),
+        ])
+        self.predictor = Mock(spec=Prediction)
+        self.predictor.get_predictions.side_effect = lambda user, items: [user + 0.5] * len(items)
+        self.relevance = RelevanceProvider(self.dataset, self.predictor)
+    
+    def test_get_relevance(self) -> None:
+        self.assertEqual(4, self.relevance.get_relevance(1, 10)) # rated
+        self.assertEqual(1.5, self.relevance.get_relevance(1, 20)) # predicted
+        self.assertEqual(1.5, self.relevance.get_relevance(1, 30))
+        
+        # The relevances of a user are predicted at once, for every item
+        self.predictor.get_predictions.assert_called_once_with(1, [10, 20, 30])
+    
+    def test_get_relevance_of_unknown_item(self) -> None:
+        self.predictor.get_prediction.return_value = 3
+        
+        self.assertEqual(3, self.relevance.get_relevance(1, 40))
+        self.predictor.get_prediction.assert_called_once_with(1, 40)
+    
+    def test_get_relevance_matrix(self) -> None:
+        matrix = self.relevance.get_relevance_matrix([1, 2], [20, 10])
+        
+        np.testing.assert_array_equal([[1.5, 4], [1, 5]], matrix)
+        self.assertEqual(2, self.predictor.get_predictions.call_count)
+        
+        # Relevances are computed once per user
+        np.testing.assert_array_equal([5, 2.5], self.relevance.get_relevances(2, [10, 30]))
+        self.assertEqual(2, self.predictor.get_predictions.call_count)
+    
+    def test_get_ranking(self) -> None:
+        # Relevances of user 2: 5, 1 (rated) and 2.5 (predicted)
+        np.testing.assert_array_equal([0, 2, 1], self.relevance.get_ranking(2))
+    
+    def test_invalidate(self) -> None:
+        self.relevance.get_relevance(1, 10)
+        self.relevance.invalidate(1)
+        self.relevance.get_relevance(1, 10)
+        
+        self.assertEqual(2, self.predictor.get_predictions.call_count)
+    
+    def test_least_recently_used_users_are_dropped(self) -> None:
+        relevance = RelevanceProvider(self.dataset, self.predictor, max_users=2)
+        relevance.get_ranking(1)
+        relevance.get_relevance(2, 10)
+        relevance.get_relevance(1, 10) # user 1 is used again, so user 2 is dropped first
+        relevance.get_relevance(3, 10)
+        self.assertEqual(3, self.predictor.get_predictions.call_count)
+        
+        relevance.get_relevance(1, 10)
+        self.assertEqual(3, self.predictor.get_predictions.call_count)
+        relevance.get_relevance(2, 10)
+        self.assertEqual(4, self.predictor.get_predictions.call_count)
+        
+        # The ranking of a dropped user is dropped too, and computed again from its new relevances
+        self.predictor.get_predictions.side_effect = lambda user, items: [10.0] * len(items)
+        relevance.get_relevance(3, 10)
+        np.testing.assert_array_equal([1, 2, 0], relevance.get_ranking(1))
+    
+    def test_wrong_max_users(self) -> None:
+        self.assertRaises(ValueError, lambda: RelevanceProvider(self.dataset, self.predictor, max_users=0))
\ No newline at end of file
@@ -1,10 +1,20 @@
-from typing import List
+from typing import List, Optional
 from unittest import TestCase
 from unittest.mock import Mock
 
+import numpy as np
+
 from app.domain.dataset import Dataset, ItemId
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.prediction.materialized import MaterializedPrediction
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.relevance import RelevanceProvider
 from app.domain.sequential_group.implementation import SequentialGroupRecommenderImpl
+from app.domain.sequential_group.prediction.multi_iter_sequential_hybrid_aggregation import MultiIterSequentialHybridAggregation
 from app.domain.sequential_group.prediction.sequential_group_prediction import SequentialGroupPrediction
+from app.domain.session_store import SessionStore
+from app.domain.user_satisfaction import UserSatisfaction
 
 
 class TestSequentialGroupRecommenderImpl(TestCase):
@@ -18,7 +28,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_all_items.return_value = all_items
         predictor = Mock(spec=SequentialGroupPrediction)
-        predictor.get_prediction.side_effect = item_predictions
+        predictor.get_predictions.side_effect = [item_predictions]
         recommender = SequentialGroupRecommenderImpl(dataset, predictor)
         
         self.assertEqual(
@@ -35,7 +45,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_all_items.return_value = all_items
         predictor = Mock(spec=SequentialGroupPrediction)
-        predictor.get_prediction.side_effect = item_predictions
+        predictor.get_predictions.side_effect = [item_predictions]
         recommender = SequentialGroupRecommenderImpl(dataset, predictor)
         
         recommender.get_recommendations(group, limit=n_top_recommendations)
@@ -43,7 +53,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         remaining_item_predictions = [4.5, 1, 4.8]
         expected_recommendations = [(4, 4.8), (2, 4.5)]
         dataset.get_all_items.return_value = all_items
-        predictor.get_prediction.side_effect = remaining_item_predictions
+        predictor.get_predictions.side_effect = [remaining_item_predictions]
         
         self.assertEqual(
             expected_recommendations,
@@ -53,7 +63,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         dataset.get_all_items.return_value = all_items
         remaining_item_predictions = [1]
         expected_recommendations = [(3, 1)]
-        predictor.get_prediction.side_effect = remaining_item_predictions
+        predictor.get_predictions.side_effect = [remaining_item_predictions]
         
         self.assertEqual(
             expected_recommendations,
@@ -70,7 +80,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         dataset = Mock(spec=Dataset)
         dataset.get_all_items.return_value = all_items
         predictor = Mock(spec=SequentialGroupPrediction)
-        predictor.get_prediction.side_effect = item_predictions
+        predictor.get_predictions.side_effect = [item_predictions]
         recommender = SequentialGroupRecommenderImpl(dataset, predictor)
         
         recommender.get_recommendations(group, limit=n_top_recommendations)
@@ -82,7 +92,7 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         
         dataset.get_all_items.return_value = all_items
         remaining_item_predictions = [4.5, 1, 4.8]
-        predictor.get_prediction.side_effect = remaining_item_predictions
+        predictor.get_predictions.side_effect = [remaining_item_predictions]
         recommender.get_recommendations(group, limit=n_top_recommendations)
         
         self.assertEqual(
@@ -91,11 +101,73 @@ class TestSequentialGroupRecommenderImpl(TestCase):
         )
         
         dataset.get_all_items.return_value = all_items
-        remaining_item_predictions = [4.5, 1, 4.8]
-        predictor.get_prediction.side_effect = remaining_item_predictions
+        remaining_item_predictions = [1]
+        predictor.get_predictions.side_effect = [remaining_item_predictions]
         recommender.get_recommendations(group, limit=n_top_recommendations)
         
         self.assertEqual(
             expected_previous_recommendations,
             recommender.get_previous_recommendations(group)
-        )
\ No newline at end of file
+        )
+    
+    def create_sequential_hybrid_recommender(self, incremental_reranking: bool, satisfactions: List[np.ndarray], store: Optional[SessionStore] = None) -> SequentialGroupRecommenderImpl:
+        """
+        Sequential hybrid recommender over 4 users and 40 items, where each item is rated by a single user.
+        The predictions only take 10 values, so that many items tie on the average and on the least misery,
+        and the two rankings differ. `satisfactions` are the satisfactions of the members with each round,
+        and `store` keeps the history of the session, if given.
+        """
+        
+        dataset = Dataset([(item % 4, item, 1 + item % 5) for item in range(40)])
+        predictions = np.array([[0.5 + (user * 7 + item * 3) % 10 / 2 for item in range(40)] for user in range(4)])
+        predictor = MaterializedPrediction(dataset, predictions)
+        relevance = RelevanceProvider(dataset, predictor)
+        user_satisfaction = Mock(spec=UserSatisfaction)
+        user_satisfaction.get_satisfactions.side_effect = satisfactions
+        sequential_predictor = MultiIterSequentialHybridAggregation(
+            lambda group: recommender.get_previous_recommendations(group),
+            AverageAggregation(dataset, predictor, relevance),
+            LeastMiseryAggregation(dataset, predictor, relevance),
+            user_satisfaction,
+            iterations_to_consider=1,
+        )
+        recommendations_log = RecommendationsLog(dataset, store, "sequential_hybrid")
+        recommender = SequentialGroupRecommenderImpl(dataset, sequential_predictor, recommendations_log, incremental_reranking=incremental_reranking)
+        return recommender
+    
+    def test_incremental_reranking(self) -> None:
+        """
+        Scenario:
+        - Five rounds of 7 items for a group of three users.
+        - After the first round, alpha is 0.3, 1 and 0.75, then 1.5 (satisfaction above 1), where the blend is not monotone
+          and every item is scored again.
+        - The recommendations are the ones of a recommender scoring every item at every round, ties included.
+        """
+        group = [3, 0, 2]
+        satisfactions = [np.array([[0.5, 0.8, 0.6]]), np.array([[0, 1, 0.5]]), np.array([[0.25, 1, 0.5]]), np.array([[0, 1.5, 1]])]
+        
+        recommender = self.create_sequential_hybrid_recommender(incremental_reranking=False, satisfactions=satisfactions)
+        expected_recommendations = [recommender.get_recommendations(group, limit=7) for _ in range(5)]
+        recommender = self.create_sequential_hybrid_recommender(incremental_reranking=True, satisfactions=satisfactions)
+        
+        self.assertEqual(expected_recommendations, [recommender.get_recommendations(group, limit=7) for _ in range(5)])
+    
+    def test_incremental_reranking_with_item_unknown_to_dataset(self) -> None:
+        # Session saved before the ratings changed: item 999 is not in the dataset anymore
+        def create_store() -> SessionStore:
+            store = Mock(spec=SessionStore)
+            store.get_recommendations.return_value = [[999, 5]]
+            return store
+        
+        satisfactions = [np.array([[0.5, 0.8, 0.6]])]
+        recommender = self.create_sequential_hybrid_recommender(incremental_reranking=False, satisfactions=satisfactions, store=create_store())
+        expected_recommendations = recommender.get_recommendations([3, 0, 2], limit=3)
+        recommender = self.create_sequential_hybrid_recommender(incremental_reranking=True, satisfactions=satisfactions, store=create_store())
+        
+        recommendations = recommender.get_recommendations([3, 0, 2], limit=3)
+        self.assertEqual(expected_recommendations, recommendations)
+        self.assertNotIn(5, [item for item, _ in recommendations])
+    
+    def test_incremental_reranking_needs_sequential_hybrid_aggregation(self) -> None:
+        with self.assertRaises(ValueError):
+            SequentialGroupRecommenderImpl(Mock(spec=Dataset), Mock(spec=SequentialGroupPrediction), incremental_reranking=True)
\ No newline at end of file
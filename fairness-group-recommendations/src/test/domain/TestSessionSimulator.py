@@ -0,0 +1,109 @@
+import random
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.group_prediction import GroupPrediction
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.group_recommender import GroupRecommender
+from app.domain.prediction.materialized import MaterializedPrediction
+from app.domain.recommendations_log import RecommendationsLog
+from app.domain.recommender import Recommender
+from app.domain.relevance import RelevanceProvider
+from app.domain.session_simulator import SessionSimulator, SimulatedRound
+from app.domain.user_satisfaction import UserSatisfaction
+from app.session_store.sqlite_session_store import SqliteSessionStore
+
+
+def create_recommender(dataset: Dataset, predictor: GroupPrediction, recommendations_log: RecommendationsLog) -> GroupRecommender:
+    return GroupRecommender(dataset, predictor, exclude_previous=True, recommendations_log=recommendations_log)
+
+
+class TestSessionSimulator(TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        self.dataset = Dataset(data=[
+            (user, item, rng.randint(1, 10) / 2)
+            for user in range(20)
+            for item in range(60)
+            if rng.random() < 0.2 or item == user
+        ])
+        predictions = np.random.default_rng(0).uniform(0.5, 5, size=(20, 60))
+        predictor = MaterializedPrediction(self.dataset, predictions)
+        relevance = RelevanceProvider(self.dataset, predictor)
+        self.user_satisfaction = UserSatisfaction(Recommender(self.dataset, predictor), predictor, self.dataset, relevance)
+        self.recommender_factories = {
+            "average": partial(create_recommender, self.dataset, AverageAggregation(self.dataset, predictor, relevance)),
+            "least_misery": partial(create_recommender, self.dataset, LeastMiseryAggregation(self.dataset, predictor, relevance)),
+        }
+        self.groups = [[1, 2, 3], [4, 5], [3, 2, 1, 6]]
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+    
+    def simulate(self, store_name: str, rounds: int, workers: int = 1) -> List[SimulatedRound]:
+        store = SqliteSessionStore(Path(self.directory.name) / store_name)
+        simulator = SessionSimulator(self.dataset, self.recommender_factories, self.user_satisfaction, store, rounds, limit=5, workers=workers)
+        simulated_rounds = list(simulator.simulate(self.groups))
+        store.close()
+        return simulated_rounds
+    
+    def test_sessions_recommend_new_items(self) -> None:
+        simulated_rounds = self.simulate("sessions.sqlite", rounds=4)
+        
+        self.assertEqual(len(self.groups) * 2 * 4, len(simulated_rounds))
+        self.assertEqual(
+            [(session, group, round) for group in self.groups for session in ["average", "least_misery"] for round in range(4)],
+            [(simulated_round.session, simulated_round.group, simulated_round.round) for simulated_round in simulated_rounds],
+        )
+        for session_rounds in zip(*[iter(simulated_rounds)] * 4):
+            recommended_items = [item for simulated_round in session_rounds for item in simulated_round.recommendation]
+            self.assertEqual(20, len(set(recommended_items)))
+        for simulated_round in simulated_rounds:
+            expected_satisfactions = self.user_satisfaction.get_satisfactions(simulated_round.group, [simulated_round.recommendation])[0]
+            self.assertEqual(expected_satisfactions.tolist(), simulated_round.satisfactions)
+    
+    def test_parallel_simulation(self) -> None:
+        self.assertEqual(self.simulate("serial.sqlite", rounds=3), self.simulate("parallel.sqlite", rounds=3, workers=2))
+    
+    def test_simulation_in_current_process_without_fork(self) -> None:
+        expected_rounds = self.simulate("serial.sqlite", rounds=3)
+        
+        with patch("multiprocessing.get_all_start_methods", return_value=["spawn"]), patch("app.domain.session_simulator.ProcessPoolExecutor") as executor:
+            simulated_rounds = self.simulate("parallel.sqlite", rounds=3, workers=2)
+        
+        executor.assert_not_called()
+        self.assertEqual(expected_rounds, simulated_rounds)
+    
+    def test_resume_sessions_from_store(self) -> None:
+        first_rounds = self.simulate("sessions.sqlite", rounds=2)
+        resumed_rounds = self.simulate("sessions.sqlite", rounds=4)
+        expected_rounds = self.simulate("other_sessions.sqlite", rounds=4)
+        
+        # The saved rounds are reported again, with the items in ascending order
+        self.assertEqual([simulated_round.satisfactions for simulated_round in first_rounds], [simulated_round.satisfactions for simulated_round in resumed_rounds if simulated_round.round < 2])
+        for resumed_round, expected_round in zip(resumed_rounds, expected_rounds):
+            self.assertEqual(set(expected_round.recommendation), set(resumed_round.recommendation))
+            self.assertEqual(expected_round.satisfactions, resumed_round.satisfactions)
+    
+    def test_resume_round_without_satisfactions(self) -> None:
+        store = SqliteSessionStore(Path(self.directory.name) / "sessions.sqlite")
+        store.add_recommendation("average", frozenset([1, 2, 3]), 0, [7, 8])
+        simulator = SessionSimulator(self.dataset, self.recommender_factories, self.user_satisfaction, store, rounds=2, limit=5)
+        
+        simulated_rounds = simulator.simulate_session("average", [3, 1, 2])
+        
+        self.assertEqual([7, 8], simulated_rounds[0].recommendation)
+        expected_satisfactions = self.user_satisfaction.get_satisfactions([3, 1, 2], [[7, 8]])[0].tolist()
+        self.assertEqual(expected_satisfactions, simulated_rounds[0].satisfactions)
+        self.assertEqual(dict(zip([3, 1, 2], expected_satisfactions)), store.get_satisfactions("average", frozenset([1, 2, 3]))[0])
+        self.assertNotIn(7, simulated_rounds[1].recommendation)
+        store.close()
\ No newline at end of file
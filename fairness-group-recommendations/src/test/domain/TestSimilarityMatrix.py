@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.domain.similarity.matrix import SimilarityMatrix
+
+
+class TestSimilarityMatrix(TestCase):
+    def test_packed_matrix(self) -> None:
+        matrix = SimilarityMatrix(
+            users=[1, 2, 3],
+            values=np.array([
+                1, 0.5, 0,
+                   1, -1,
+                       1,
+            ]),
+            packed=True,
+        )
+        
+        self.assertEqual(0.5, matrix.get_similarity(1, 2))
+        self.assertEqual(0.5, matrix.get_similarity(2, 1))
+        self.assertEqual(-1, matrix.get_similarity(3, 2))
+        self.assertEqual(1, matrix.get_similarity(3, 3))
+        self.assertEqual([[1, 0.5, 0], [0.5, 1, -1], [0, -1, 1]], matrix.to_dense().tolist())
+    
+    def test_as_dict(self) -> None:
+        matrix = SimilarityMatrix(users=[1, 2], values=np.array([[1, 0.5], [0.5, 1]]), packed=False)
+        
+        user_similarities = matrix.as_dict()
+        
+        self.assertEqual({(1, 1): 1, (1, 2): 0.5, (2, 1): 0.5, (2, 2): 1}, dict(user_similarities))
+        self.assertRaises(KeyError, lambda: user_similarities[(1, 3)])
+    
+    def test_wrong_number_of_values(self) -> None:
+        self.assertRaises(ValueError, lambda: SimilarityMatrix(users=[1, 2], values=np.zeros(4), packed=True))
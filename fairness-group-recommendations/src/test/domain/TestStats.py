@@ -1,9 +1,10 @@
+import random
 from typing import Dict, Tuple
 from unittest import TestCase
 from unittest.mock import Mock
 
 from app.domain.dataset import Dataset, UserId
-from app.domain.similarity.pearson import PearsonCorrelation
+from app.domain.similarity.pearson import PearsonCorrelation, VectorizedPearsonCorrelation
 from app.domain.similarity.similarity import Similarity
 from app.domain.similarity.stats import Stats
 
@@ -90,4 +91,28 @@ class TestStats(TestCase):
         self.assertEqual(0, user_similarities[(1, 3)])
         
         self.assertEqual(0.5, user_similarities[(2, 1)])
-        
\ No newline at end of file
+        
+        self.assertEqual(6, similarity.get_similarity.call_count) # Only the upper triangle is computed
+    
+    def test_get_similarity_matrix(self) -> None:
+        rng = random.Random(0)
+        dataset = Dataset(data=[
+            (user, item, rng.randint(1, 10) / 2)
+            for user in range(150)
+            for item in range(40)
+            if rng.random() < 0.3
+        ])
+        pearson = PearsonCorrelation(dataset)
+        users = dataset.get_all_users()
+        
+        dense = Stats(dataset, VectorizedPearsonCorrelation(dataset)).get_similarity_matrix()
+        packed = Stats(dataset, VectorizedPearsonCorrelation(dataset), workers=2).get_similarity_matrix(packed=True)
+        
+        self.assertEqual((len(users), len(users)), dense.values.shape)
+        self.assertEqual(len(users) * (len(users) + 1) // 2, packed.values.size)
+        for user_a in users[::7]:
+            for user_b in users[::5]:
+                expected_similarity = pearson.get_similarity(user_a, user_b)
+                self.assertAlmostEqual(expected_similarity, dense.get_similarity(user_a, user_b), 12)
+                self.assertAlmostEqual(expected_similarity, packed.get_similarity(user_a, user_b), 12)
+        self.assertTrue((dense.values == packed.to_dense()).all())
@@ -0,0 +1,64 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock
+
+from app.domain.dataset import Dataset
+from app.domain.similarity.pearson import PearsonCorrelation, VectorizedPearsonCorrelation
+from app.domain.similarity.similarity import Similarity
+from app.domain.similarity.stored import StoredSimilarity
+from app.similarity_store.mmap_similarity_store import MmapSimilarityStore
+
+
+class TestStoredSimilarity(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = MmapSimilarityStore(Path(self.directory.name))
+        self.dataset = Dataset([
+            (0, 1, 5),
+            (0, 2, 3),
+            (0, 3, 4),
+            (0, 4, 4),
+            
+            (1, 1, 3),
+            (1, 2, 1),
+            (1, 3, 2),
+            (1, 4, 3),
+            (1, 5, 3),
+            
+            (2, 1, 4),
+            (2, 2, 3),
+            (2, 3, 4),
+            (2, 5, 5),
+        ])
+    
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+    
+    def test_same_results_as_wrapped_similarity(self) -> None:
+        pearson = PearsonCorrelation(self.dataset)
+        stored = StoredSimilarity(self.dataset, VectorizedPearsonCorrelation(self.dataset), self.store)
+        
+        for user_a in self.dataset.get_all_users():
+            for user_b in self.dataset.get_all_users():
+                self.assertAlmostEqual(pearson.get_similarity(user_a, user_b), stored.get_similarity(user_a, user_b), 12)
+        self.assertEqual(PearsonCorrelation.__name__, stored.name)
+    
+    def test_matrix_is_reused_by_later_instances(self) -> None:
+        StoredSimilarity(self.dataset, VectorizedPearsonCorrelation(self.dataset), self.store).get_similarity(0, 1)
+        similarity = Mock(spec=Similarity)
+        similarity.name = PearsonCorrelation.__name__
+        
+        stored = StoredSimilarity(self.dataset, similarity, self.store)
+        
+        self.assertAlmostEqual(0.839, stored.get_similarity(0, 1), 3)
+        similarity.get_similarity.assert_not_called()
+    
+    def test_matrix_is_recomputed_when_dataset_changes(self) -> None:
+        StoredSimilarity(self.dataset, VectorizedPearsonCorrelation(self.dataset), self.store).get_similarity(0, 1)
+        changed_dataset = Dataset([(0, 1, 5), (0, 2, 3), (1, 1, 3), (1, 2, 4)])
+        
+        stored = StoredSimilarity(changed_dataset, VectorizedPearsonCorrelation(changed_dataset), self.store)
+        
+        self.assertNotEqual(self.dataset.fingerprint, changed_dataset.fingerprint)
+        self.assertAlmostEqual(-1, stored.get_similarity(0, 1), 12)
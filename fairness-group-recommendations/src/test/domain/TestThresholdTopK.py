@@ -0,0 +1,39 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.domain.dataset import Dataset
+from app.domain.group_prediction.average_aggregation import AverageAggregation
+from app.domain.group_prediction.least_misery_aggregation import LeastMiseryAggregation
+from app.domain.group_prediction.threshold_top_k import select_top_k_by_threshold
+from app.domain.prediction.materialized import MaterializedPrediction
+from app.domain.prediction.prediction import Prediction
+from app.domain.relevance import RelevanceProvider
+
+
+class TestThresholdTopK(TestCase):
+    def setUp(self) -> None:
+        num_users, num_items = 6, 50
+        self.dataset = Dataset([(user, item, 1) for user in range(num_users) for item in range(num_items) if (user + item) % 5 == 0])
+        # Predictions rounded to make ties frequent
+        predictions = np.round(np.random.default_rng(42).uniform(0.5, 5, size=(num_users, num_items)), 1)
+        self.relevance = RelevanceProvider(self.dataset, MaterializedPrediction(self.dataset, predictions))
+    
+    def test_select_top_k_by_threshold(self) -> None:
+        group = [0, 2, 3, 5]
+        items = [item for item in self.dataset.get_all_items() if item % 3 != 0]
+        for aggregation in [AverageAggregation(self.dataset, Mock(spec=Prediction), self.relevance), LeastMiseryAggregation(self.dataset, Mock(spec=Prediction), self.relevance)]:
+            for limit in [1, 5, 20, 100]:
+                # Same items, same order among ties, as scoring every item
+                predictions = aggregation.get_predictions(group, items)
+                order = sorted(range(len(items)), key=lambda position: -predictions[position])[:limit]
+                expected = [(items[position], predictions[position]) for position in order]
+                
+                self.assertEqual(expected, select_top_k_by_threshold(self.dataset, aggregation, group, items, limit, block_size=2))
+    
+    def test_select_top_k_by_threshold_without_relevance(self) -> None:
+        aggregation = AverageAggregation(self.dataset, Mock(spec=Prediction))
+        
+        with self.assertRaises(ValueError):
+            select_top_k_by_threshold(self.dataset, aggregation, [0, 1], [1, 2], 1)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from app.domain.top_k import select_top_k, select_top_k_bounded, select_top_k_indices
+
+
+class TestTopK(TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(0)
+        # Few distinct scores, so that there are many ties
+        self.scores = [rng.randint(0, 20) / 4 for _ in range(500)]
+        self.candidates = [(f"item{index}", score) for index, score in enumerate(self.scores)]
+    
+    def get_expected_top_k(self, limit: int):
+        return sorted(self.candidates, key=lambda x: x[1], reverse=True)[:limit]
+    
+    def test_select_top_k(self) -> None:
+        for limit in [0, 1, 10, 499, 500, 600]:
+            self.assertEqual(self.get_expected_top_k(limit), select_top_k(self.candidates, limit))
+    
+    def test_select_top_k_indices(self) -> None:
+        for limit in [0, 1, 10, 499, 500, 600]:
+            top_indices = select_top_k_indices(np.array(self.scores), limit)
+            self.assertEqual(self.get_expected_top_k(limit), [self.candidates[index] for index in top_indices])
+    
+    def test_select_top_k_bounded(self) -> None:
+        scores = dict(self.candidates)
+        scored_candidates = []
+        def score(candidate: str) -> float:
+            scored_candidates.append(candidate)
+            return scores[candidate]
+        # The bound is the score rounded up to the next integer
+        bounded_candidates = [(candidate, float(np.ceil(candidate_score))) for candidate, candidate_score in self.candidates]
+        
+        for limit in [1, 10, 500]:
+            scored_candidates.clear()
+            self.assertEqual(self.get_expected_top_k(limit), select_top_k_bounded(bounded_candidates, score, limit))
+        self.assertEqual(500, len(scored_candidates))
+        
+        scored_candidates.clear()
+        select_top_k_bounded(bounded_candidates, score, 10)
+        # Only the candidates whose bound reaches the 10th highest score are scored
+        self.assertEqual(sum(1 for _, bound in bounded_candidates if bound >= self.get_expected_top_k(10)[-1][1]), len(scored_candidates))
+        self.assertLess(len(scored_candidates), 100)
@@ -2,9 +2,12 @@ from typing import List, Tuple
 from unittest import TestCase
 from unittest.mock import ANY, Mock
 
+import numpy as np
+
 from app.domain.dataset import Dataset, ItemId
 from app.domain.prediction.prediction import Prediction
 from app.domain.recommender import Recommender
+from app.domain.relevance import RelevanceProvider
 from app.domain.user_satisfaction import UserSatisfaction
 
 
@@ -20,9 +23,9 @@ class TestUserSatisfaction(TestCase):
         user_actual_ratings: List[float] = [0, 0, 0, 0]
         
         user_recommender = Mock(spec=Recommender)
-        user_recommender.get_recommendations.return_value = user_recommendation
+        user_recommender.get_all_recommendations.return_value = user_recommendation
         user_predictor = Mock(spec=Prediction)
-        user_predictor.get_prediction.side_effect = ratings_user_recommendation
+        user_predictor.get_predictions.return_value = ratings_user_recommendation
         dataset = Mock(spec=Dataset)
         dataset.get_rating.side_effect = user_actual_ratings
         satisfaction = UserSatisfaction(user_recommender, user_predictor, dataset)
@@ -42,9 +45,9 @@ class TestUserSatisfaction(TestCase):
         user_predicted_ratings: List[float] = [1, 1, 1, 1]
         
         user_recommender = Mock(spec=Recommender)
-        user_recommender.get_recommendations.return_value = user_recommendation
+        user_recommender.get_all_recommendations.return_value = user_recommendation
         user_predictor = Mock(spec=Prediction)
-        user_predictor.get_prediction.side_effect = user_predicted_ratings
+        user_predictor.get_predictions.return_value = user_predicted_ratings
         dataset = Mock(spec=Dataset)
         dataset.get_rating.side_effect = user_actual_ratings
         satisfaction = UserSatisfaction(user_recommender, user_predictor, dataset)
@@ -62,7 +65,7 @@ class TestUserSatisfaction(TestCase):
         user_actual_ratings: List[float] = [1, 1, 1, 1]
         
         user_recommender = Mock(spec=Recommender)
-        user_recommender.get_recommendations.return_value = user_recommendation
+        user_recommender.get_all_recommendations.return_value = user_recommendation
         user_predictor = Mock(spec=Prediction)
         dataset = Mock(spec=Dataset)
         dataset.get_rating.side_effect = user_actual_ratings
@@ -70,4 +73,32 @@ class TestUserSatisfaction(TestCase):
         
         sat = satisfaction.get_satisfaction(1, group_recommendation)
         
-        self.assertEqual(4 / 20, sat)
\ No newline at end of file
+        self.assertEqual(4 / 20, sat)
+    
+    def test_get_satisfaction_compares_with_as_many_user_recommendations(self) -> None:
+        user_recommender = Mock(spec=Recommender)
+        user_recommender.get_all_recommendations.return_value = [(7, 5), (81, 4), (666, 3), (12, 2)]
+        dataset = Mock(spec=Dataset)
+        dataset.get_rating.return_value = 2
+        satisfaction = UserSatisfaction(user_recommender, Mock(spec=Prediction), dataset)
+        
+        self.assertEqual(4 / 9, satisfaction.get_satisfaction(1, [42, 1]))
+        self.assertEqual(2 / 5, satisfaction.get_satisfaction(1, [42]))
+        self.assertEqual(8 / 14, satisfaction.get_satisfaction(1, [42, 1, 3, 100]))
+        self.assertEqual(10 / 14, satisfaction.get_satisfaction(1, [42, 1, 3, 100, 4])) # fewer user recommendations than items
+        # The user recommendations are computed once
+        user_recommender.get_all_recommendations.assert_called_once_with(1)
+    
+    def test_get_satisfactions(self) -> None:
+        user_recommender = Mock(spec=Recommender)
+        user_recommender.get_all_recommendations.side_effect = lambda user: [(7, 5), (81, 5)] if user == 1 else [(7, 4), (81, 1)]
+        relevance = Mock(spec=RelevanceProvider)
+        relevance.get_relevance_matrix.side_effect = [
+            np.array([[5, 5], [1, 2]]), # first group recommendation
+            np.array([[1], [4]]), # second group recommendation
+        ]
+        satisfaction = UserSatisfaction(user_recommender, Mock(spec=Prediction), Mock(spec=Dataset), relevance)
+        
+        satisfactions = satisfaction.get_satisfactions([1, 2], [[10, 20], [30]])
+        
+        np.testing.assert_array_equal([[1, 3 / 5], [1 / 5, 1]], satisfactions)
\ No newline at end of file
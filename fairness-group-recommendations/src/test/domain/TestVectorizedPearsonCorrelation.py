@@ -0,0 +1,61 @@
+import random
+from unittest import TestCase
+from unittest.mock import Mock
+
+from app.domain.dataset import Dataset
+from app.domain.similarity.pearson import PearsonCorrelation, VectorizedPearsonCorrelation
+
+
+class TestVectorizedPearsonCorrelation(TestCase):
+    def test_same_results_as_scalar_implementation(self) -> None:
+        rng = random.Random(0)
+        dataset = Dataset(data=[
+            (user, item, rng.randint(1, 10) / 2)
+            for user in range(20)
+            for item in range(30)
+            if rng.random() < 0.3
+        ])
+        scalar = PearsonCorrelation(dataset)
+        vectorized = VectorizedPearsonCorrelation(dataset)
+        
+        matrix = vectorized.get_similarity_matrix()
+        
+        users = dataset.get_all_users()
+        self.assertEqual((len(users), len(users)), matrix.shape)
+        for index_a, user_a in enumerate(users):
+            for index_b, user_b in enumerate(users):
+                expected_similarity = scalar.get_similarity(user_a, user_b)
+                self.assertAlmostEqual(expected_similarity, matrix[index_a, index_b], 12)
+                self.assertAlmostEqual(expected_similarity, vectorized.get_similarity(user_a, user_b), 12)
+    
+    def test_get_similarity_row(self) -> None:
+        dataset = Dataset(data=[
+            # ratings for Alice
+            (0, 1, 5),
+            (0, 2, 3),
+            (0, 3, 4),
+            (0, 4, 4),
+            
+            # ratings for User1
+            (1, 1, 3),
+            (1, 2, 1),
+            (1, 3, 2),
+            (1, 4, 3),
+            (1, 5, 3),
+            
+            # User2 rated all the items with the same score (zero variance)
+            (2, 1, 3),
+            (2, 2, 3),
+            (2, 5, 3),
+        ])
+        vectorized = VectorizedPearsonCorrelation(dataset)
+        
+        row = vectorized.get_similarity_row(0)
+        
+        self.assertEqual(1, row[0]) # Similarity between a user and itself
+        self.assertAlmostEqual(0.839, row[1], 3)
+        self.assertEqual(0, row[2]) # Zero variance on the commonly rated items
+    
+    def test_name(self) -> None:
+        pearson = VectorizedPearsonCorrelation(dataset=Mock())
+        self.assertEqual(PearsonCorrelation.__name__, pearson.name)
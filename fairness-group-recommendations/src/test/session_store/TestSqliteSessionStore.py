@@ -0,0 +1,96 @@
+import pickle
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from app.session_store.sqlite_session_store import SqliteSessionStore
+
+
+class TestSqliteSessionStore(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "sessions.sqlite"
+        self.store = SqliteSessionStore(self.path)
+    
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+    
+    def test_get_added_recommendations(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3])
+        self.store.add_recommendation("average", frozenset([1, 2]), 1, [7])
+        self.store.add_recommendation("average", frozenset([1, 3]), 0, [9])
+        self.store.add_recommendation("least_misery", frozenset([1, 2]), 0, [4])
+        
+        self.assertEqual([[5, 3], [7]], self.store.get_recommendations("average", frozenset([2, 1])))
+        self.assertEqual([[4]], self.store.get_recommendations("least_misery", frozenset([1, 2])))
+        self.assertEqual([], self.store.get_recommendations("average", frozenset([2, 3])))
+    
+    def test_get_added_satisfactions(self) -> None:
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5, 2: 1})
+        self.store.add_satisfactions("average", frozenset([1, 2]), 1, {1: 0.25, 2: 0.75})
+        
+        self.assertEqual({0: {1: 0.5, 2: 1}, 1: {1: 0.25, 2: 0.75}}, self.store.get_satisfactions("average", frozenset([1, 2])))
+        self.assertEqual({}, self.store.get_satisfactions("average", frozenset([1, 3])))
+    
+    def test_round_written_again_is_replaced(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3, 8])
+        self.store.flush()
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [6])
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5, 2: 1})
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.75, 2: 1})
+        
+        self.assertEqual([[6]], self.store.get_recommendations("average", frozenset([1, 2])))
+        self.assertEqual({0: {1: 0.75, 2: 1}}, self.store.get_satisfactions("average", frozenset([1, 2])))
+    
+    def test_round_written_again_before_flush_is_replaced(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3, 8])
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5, 2: 1})
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [6])
+        
+        self.assertEqual([[6]], self.store.get_recommendations("average", frozenset([1, 2])))
+        self.assertEqual({}, self.store.get_satisfactions("average", frozenset([1, 2])))
+    
+    def test_round_written_again_drops_saved_satisfactions(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3])
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5, 2: 1})
+        self.store.add_recommendation("average", frozenset([1, 2]), 1, [7])
+        self.store.add_satisfactions("average", frozenset([1, 2]), 1, {1: 0.25, 2: 0.75})
+        self.store.flush()
+        
+        self.store.add_recommendation("average", frozenset([1, 2]), 1, [9])
+        
+        self.assertEqual([[5, 3], [9]], self.store.get_recommendations("average", frozenset([1, 2])))
+        self.assertEqual({0: {1: 0.5, 2: 1}}, self.store.get_satisfactions("average", frozenset([1, 2])))
+    
+    def test_writes_are_batched(self) -> None:
+        store = SqliteSessionStore(self.path, batch_size=3)
+        other_store = SqliteSessionStore(self.path)
+        
+        store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3])
+        self.assertEqual([], other_store.get_recommendations("average", frozenset([1, 2])))
+        
+        store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5})
+        self.assertEqual([[5, 3]], other_store.get_recommendations("average", frozenset([1, 2])))
+        self.assertEqual({0: {1: 0.5}}, other_store.get_satisfactions("average", frozenset([1, 2])))
+        store.close()
+        other_store.close()
+    
+    def test_sessions_survive_the_store(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3])
+        self.store.add_satisfactions("average", frozenset([1, 2]), 0, {1: 0.5, 2: 1})
+        self.store.close()
+        
+        self.store = SqliteSessionStore(self.path)
+        self.assertEqual([[5, 3]], self.store.get_recommendations("average", frozenset([1, 2])))
+        self.assertEqual({0: {1: 0.5, 2: 1}}, self.store.get_satisfactions("average", frozenset([1, 2])))
+    
+    def test_pickled_store_opens_its_own_connection(self) -> None:
+        self.store.add_recommendation("average", frozenset([1, 2]), 0, [5, 3])
+        self.assertEqual([[5, 3]], self.store.get_recommendations("average", frozenset([1, 2])))
+        
+        # Pending writes are flushed before the store is copied
+        self.store.add_recommendation("average", frozenset([1, 2]), 1, [7])
+        copied_store: SqliteSessionStore = pickle.loads(pickle.dumps(self.store))
+        self.assertEqual([[5, 3], [7]], copied_store.get_recommendations("average", frozenset([1, 2])))
+        copied_store.close()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from app.domain.similarity.matrix import SimilarityMatrix
+from app.similarity_store.mmap_similarity_store import MmapSimilarityStore
+
+
+def save_matrix(path: Path, values: np.ndarray) -> None:
+    MmapSimilarityStore(path).save("Pearson", "fingerprint", SimilarityMatrix(users=list(range(len(values))), values=values, packed=False))
+
+
+class TestMmapSimilarityStore(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = MmapSimilarityStore(Path(self.directory.name))
+    
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+    
+    def test_load_saved_matrix(self) -> None:
+        matrix = SimilarityMatrix(users=[1, 2, 3], values=np.array([1, 0.5, 0, 1, -1, 1]), packed=True)
+        
+        self.store.save("Pearson", "fingerprint", matrix)
+        loaded_matrix = self.store.load("Pearson", "fingerprint")
+        
+        assert loaded_matrix is not None
+        self.assertIsInstance(loaded_matrix.values, np.memmap)
+        self.assertEqual([1, 2, 3], loaded_matrix.users)
+        self.assertEqual(-1, loaded_matrix.get_similarity(3, 2))
+        self.assertEqual(matrix.to_dense().tolist(), loaded_matrix.to_dense().tolist())
+    
+    def test_missing_matrix(self) -> None:
+        self.store.save("Pearson", "fingerprint", SimilarityMatrix(users=[1], values=np.array([[1.0]]), packed=False))
+        
+        self.assertIsNone(self.store.load("Pearson", "other fingerprint"))
+        self.assertIsNone(self.store.load("Jaccard", "fingerprint"))
+    
+    def test_concurrent_saves_of_same_matrix(self) -> None:
+        values = np.arange(400.0).reshape(20, 20)
+        
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(save_matrix, [Path(self.directory.name)] * 16, [values] * 16))
+        loaded_matrix = self.store.load("Pearson", "fingerprint")
+        
+        assert loaded_matrix is not None
+        self.assertEqual(values.tolist(), loaded_matrix.to_dense().tolist())
+        # The temporary files of every writer have been moved in place
+        self.assertEqual(["matrix.json", "users.npy", "values.npy"], sorted(path.name for path in Path(self.directory.name).glob("*/*")))
\ No newline at end of file